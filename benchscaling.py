@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""Benchmarks how scan and comment parsing times grow with input size.
+
+Scans every adversarial script from genadversarialjs.py at two sizes, and
+parses comments with growing numbers of flags, reporting how much slower the
+larger input was than linear growth predicts. Each time is the best of three.
+
+Usage:
+
+$ benchscaling.py
+
+Reports growth, exiting with status 1 if any input grew more than 3 times
+faster than linearly.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Callable
+
+import genadversarialjs
+from jsdoctor import jsdoc, scanner
+
+# Growth beyond this many times linear is reported as superlinear.
+_MAX_GROWTH = 3
+
+_SMALL_SIZE = 50_000
+_LARGE_SIZE = 400_000
+
+_SCANS: dict[str, Callable[[str], object]] = {
+    "SweepScript": scanner.SweepScript,
+    "ExtractDocumentedSymbols": lambda script: list(
+        scanner.ExtractDocumentedSymbols(script)
+    ),
+    "YieldProvides": lambda script: list(scanner.YieldProvides(script)),
+}
+
+
+def _time(function: Callable[[], object]) -> float:
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        try:
+            function()
+        except scanner.NoIdentifierFoundError:
+            pass
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _make_flag_comment(flag_count: int) -> str:
+    lines = ["Description of a generated API."]
+    lines.extend(
+        f"@param {{string}} arg{index} Argument." for index in range(flag_count)
+    )
+    return "\n".join(lines)
+
+
+def _report(label: str, small_time: float, large_time: float, scale: float) -> bool:
+    growth = large_time / max(small_time, 1e-9) / scale
+    print(f"{label:<56} {growth:>6.2f}x linear")
+    return large_time <= _MAX_GROWTH * scale * small_time + 0.01
+
+
+def main() -> None:
+    """Main entry point for benchmarking scaling."""
+    linear = True
+    for name, generator in sorted(genadversarialjs.GENERATORS.items()):
+        small_script = generator(_SMALL_SIZE)
+        large_script = generator(_LARGE_SIZE)
+        scale = len(large_script) / len(small_script)
+        for scan_name, scan in _SCANS.items():
+            small_time = _time(lambda scan=scan, script=small_script: scan(script))
+            large_time = _time(lambda scan=scan, script=large_script: scan(script))
+            linear &= _report(f"{scan_name} {name}", small_time, large_time, scale)
+
+    small_comment = _make_flag_comment(50)
+    large_comment = _make_flag_comment(500)
+    small_time = _time(lambda: [jsdoc.ProcessComment(small_comment) for _ in range(10)])
+    large_time = _time(lambda: [jsdoc.ProcessComment(large_comment) for _ in range(10)])
+    linear &= _report("ProcessComment 50 to 500 flags", small_time, large_time, 10)
+
+    if not linear:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""Benchmarks jsdoctor start-up: imports and a scan pool's first file.
+
+Each measurement runs in a fresh interpreter and is repeated, reporting the
+median. Measured are:
+
+  * importing the jsdoctor package, the scan worker module and the CLI;
+  * running `python -m jsdoctor --help`;
+  * for each multiprocessing start method, starting a scan pool and getting
+    back the scan of its first file.
+
+Usage:
+
+$ benchstartup.py
+
+Runs each measurement 5 times with 4 workers per pool.
+
+$ benchstartup.py --repeats 10 --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+
+_REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORTS = {
+    "import jsdoctor": "import jsdoctor",
+    "import jsdoctor.scanworker": "import jsdoctor.scanworker",
+    "import jsdoctor.cli": "import jsdoctor.cli",
+}
+
+# Prints the seconds from starting a pool to the first file's scan record.
+_POOL_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from jsdoctor import scanpool, scanworker
+pool_config = scanpool.PoolConfig(start_method=sys.argv[1])
+with pool_config.make_pool(int(sys.argv[2])) as pool:
+    pool.apply(scanworker.ScanContent, ((sys.argv[3], None, None),))
+    print(time.perf_counter() - start)
+"""
+
+_SCRIPT = """goog.provide('goog.bench');
+
+/**
+ * Does a thing.
+ * @param {string} name The name.
+ */
+goog.bench.doThing = function(name) {};
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(  # nosec B603
+        [sys.executable, *args],
+        cwd=_REPO_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def _time_command(args: list[str], repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _run(args)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def _time_first_scan(start_method: str, jobs: int, path: str, repeats: int) -> float:
+    return statistics.median(
+        float(_run(["-c", _POOL_SCRIPT, start_method, str(jobs), path]).stdout)
+        for _ in range(repeats)
+    )
+
+
+def main() -> None:
+    """Main entry point for benchmarking start-up."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    baseline = _time_command(["-c", "pass"], args.repeats)
+    print(f"{'interpreter start-up':<36} {baseline * 1000:>8.1f} ms")
+    for name, code in _IMPORTS.items():
+        seconds = _time_command(["-c", code], args.repeats) - baseline
+        print(f"{name:<36} {seconds * 1000:>8.1f} ms")
+
+    seconds = _time_command(["-m", "jsdoctor", "--help"], args.repeats) - baseline
+    print(f"{'python -m jsdoctor --help':<36} {seconds * 1000:>8.1f} ms")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".js", encoding="utf-8") as f:
+        f.write(_SCRIPT)
+        f.flush()
+        for start_method in multiprocessing.get_all_start_methods():
+            seconds = _time_first_scan(start_method, args.jobs, f.name, args.repeats)
+            label = f"first scan, {start_method} pool"
+            print(f"{label:<36} {seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+"""Generates adversarial JavaScript inputs for the jsdoctor scanner.
+
+Each generator builds a script of roughly the requested size that once made a
+scanner pattern backtrack or rescan far more than the size of the input.
+
+Output is written to the given directory, one file per generator.
+
+Usage:
+
+$ genadversarialjs.py path/to/dir
+
+Writes 1 MB inputs to the given directory.
+
+$ genadversarialjs.py path/to/dir 4000000
+
+Writes inputs of the given size in characters.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from collections.abc import Callable
+
+_HEADER = "goog.provide('goog.adversarial');\n\n"
+
+
+def _repeat_to_size(unit: str, size: int) -> str:
+    return unit * max(1, size // len(unit))
+
+
+def _unterminated_comments(size: int) -> str:
+    # Every "/**" used to scan to the end of the file looking for a "*/".
+    return _HEADER + _repeat_to_size("/** ", size)
+
+
+def _openers_in_string(size: int) -> str:
+    # A generated bundle with comment openers inside one string literal.
+    return _HEADER + 'var s = "' + _repeat_to_size("/**", size) + '";\n'
+
+
+def _long_dotted_chain(size: int) -> str:
+    # One target identifier spanning the whole file.
+    chain = _repeat_to_size("a.", size)
+    return _HEADER + "/** Chain. */\ngoog.adversarial." + chain + "(\n"
+
+
+def _long_spaced_chain(size: int) -> str:
+    chain = _repeat_to_size("a \n . ", size)
+    return _HEADER + "/** Chain. */\ngoog.adversarial." + chain + "b;\n"
+
+
+def _wordless_comments(size: int) -> str:
+    # Comments with no identifier between them all share the final target.
+    return _HEADER + _repeat_to_size("/***/ ", size) + "goog.adversarial.x;\n"
+
+
+def _quoted_namespace_line(size: int) -> str:
+    return _HEADER + "goog.provide('" + _repeat_to_size("' \t ", size) + "\n"
+
+
+def _indented_namespace_calls(size: int) -> str:
+    return _HEADER + _repeat_to_size("    goog.require(x)", size) + "\n"
+
+
+GENERATORS: dict[str, Callable[[int], str]] = {
+    "unterminated_comments": _unterminated_comments,
+    "openers_in_string": _openers_in_string,
+    "long_dotted_chain": _long_dotted_chain,
+    "long_spaced_chain": _long_spaced_chain,
+    "wordless_comments": _wordless_comments,
+    "quoted_namespace_line": _quoted_namespace_line,
+    "indented_namespace_calls": _indented_namespace_calls,
+}
+
+
+# pylint: disable-next=invalid-name
+def GenerateAdversarialScripts(size: int) -> dict[str, str]:
+    """Generates every adversarial script at the given size.
+
+    Args:
+        size: Approximate size of each script in characters.
+
+    Returns:
+        A dictionary mapping generator names to script text.
+    """
+    return {name: generator(size) for name, generator in GENERATORS.items()}
+
+
+def main() -> None:
+    """Main entry point for writing adversarial scripts to a directory."""
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) == 2:
+        size = 1_000_000
+
+    elif len(sys.argv) == 3:
+        size = int(sys.argv[2])
+
+    else:
+        sys.exit(__doc__)
+
+    out_dir = sys.argv[1]
+    os.makedirs(out_dir, exist_ok=True)
+
+    for name, script in GenerateAdversarialScripts(size).items():
+        path = os.path.join(out_dir, f"{name}.js")
+        logging.info("Writing %s", path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(script)
+
+
+if __name__ == "__main__":
+    main()
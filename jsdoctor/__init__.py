@@ -1,25 +1,76 @@
-"""Core JSDoc extraction and HTML documentation generation library."""
-
-from . import (
-    esprima,
-    flags,
-    generator,
-    jsdoc,
-    linkify,
-    namespace,
-    scanner,
-    source,
-    symboltypes,
-)
+"""Core JSDoc extraction and HTML documentation generation library.
+
+Submodules, and the classes exported from them, are imported on first use, so
+that processes that only scan, such as scan workers, do not pay for generator
+and its html5lib dependency.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import (
+        corpus,
+        daemon,
+        esprima,
+        flags,
+        generator,
+        jsdoc,
+        linkify,
+        manifest,
+        namespace,
+        scancache,
+        scanner,
+        scanpool,
+        scanworker,
+        schedule,
+        session,
+        source,
+        symbolindex,
+        symboltable,
+        symboltypes,
+        transport,
+    )
+    from .session import Session
 
 __all__ = [
+    "Session",
+    "corpus",
+    "daemon",
     "esprima",
     "flags",
     "generator",
     "jsdoc",
     "linkify",
+    "manifest",
     "namespace",
+    "scancache",
     "scanner",
+    "scanpool",
+    "scanworker",
+    "schedule",
+    "session",
     "source",
+    "symbolindex",
+    "symboltable",
     "symboltypes",
+    "transport",
 ]
+
+
+# Classes exported from submodules, by name, with the submodule they live in.
+_CLASS_MODULES = {"Session": "session"}
+
+
+def __getattr__(name: str) -> object:
+    if name in _CLASS_MODULES:
+        module = importlib.import_module(f".{_CLASS_MODULES[name]}", __name__)
+        return getattr(module, name)
+    if name in __all__:
+        # import_module sets the attribute, so this only runs once per module.
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
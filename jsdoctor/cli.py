@@ -4,15 +4,33 @@
 from __future__ import annotations
 
 import argparse
-import collections
+import contextlib
+import functools
 import io
 import logging
 import multiprocessing
+import multiprocessing.pool
 import os
+import resource
+import sys
 import tarfile
-from collections.abc import Iterable, Iterator, Mapping
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field, replace
 
-from jsdoctor import generator, source
+from jsdoctor import (
+    corpus,
+    daemon,
+    manifest,
+    scancache,
+    scanner,
+    scanpool,
+    scanworker,
+    schedule,
+    source,
+    symbolindex,
+    symboltable,
+)
 
 
 def _should_scan_path(path: str) -> bool:
@@ -27,128 +45,336 @@ def _should_scan_path(path: str) -> bool:
     return not filename.endswith("_test.js")
 
 
-_IGNORED_IDENTIFIERS = frozenset(["goog.provide", "goog.require", "goog.setTestOnly"])
+class JsDoctorError(Exception):
+    """Base exception class for jsdoctor errors."""
 
 
-def _get_symbols_from_sources(
-    sources: Iterable[source.Source],
-) -> Iterator[source.Symbol]:
-    for s in sources:
-        yield from s.symbols
+# Inputs with fewer files than this, and no large files, are scanned serially;
+# starting a pool would take longer than the scan.
+_MIN_PARALLEL_SCAN_FILES = 16
 
+# Work is dispatched in about this many chunks per worker.
+_CHUNKS_PER_JOB = 4
 
-# TODO(nanaze): Make this a flag
-_DUPLICATE_SYMBOL_IS_ERROR = False
 
+def _get_content_size(path: str, content: str | None) -> int:
+    return os.path.getsize(path) if content is None else len(content)
 
-def _make_symbol_map(symbols: Iterable[source.Symbol]) -> dict[str, source.Symbol]:
-    symbol_map: dict[str, source.Symbol] = {}
 
-    for symbol in symbols:
-        identifier = symbol.identifier
+def _get_chunksize(item_count: int, jobs: int) -> int:
+    return max(1, -(-item_count // (jobs * _CHUNKS_PER_JOB)))
 
-        if identifier in _IGNORED_IDENTIFIERS:
-            continue
 
-        if identifier.startswith("this."):
-            logging.info('Skipping "this" identifier %s', identifier)
-            continue
+# pylint: disable-next=too-many-arguments,too-many-locals
+def _scan_in_pool(
+    scan_items: list[scanworker.ScanItem],
+    sizes: list[int],
+    jobs: int,
+    use_mmap: bool,
+    recorded_costs: Mapping[str, float],
+    pool_config: scanpool.PoolConfig,
+    cache: scancache.ScanCache | None,
+) -> list[scanworker.TimedRecord]:
+    large_items = []
+    small_items = []
+    small_sizes = []
+    for scan_item, size in zip(scan_items, sizes, strict=True):
+        if size >= source.PARALLEL_SCAN_THRESHOLD:
+            large_items.append(scan_item)
+        else:
+            small_items.append(scan_item)
+            small_sizes.append(size)
 
-        if identifier in symbol_map:
-            duplicate_symbol = symbol_map[identifier]
-            msg = f"Symbol duplicated\n{symbol}\n{duplicate_symbol}"
+    # Costly files go first, alone; cheap ones are batched to save dispatches.
+    costs = schedule.EstimateCosts(
+        [path for path, _, _ in small_items], small_sizes, recorded_costs
+    )
+    batches = [
+        [small_items[index] for index in batch]
+        for batch in schedule.MakeBatches(costs, jobs * _CHUNKS_PER_JOB)
+    ]
 
-            if _DUPLICATE_SYMBOL_IS_ERROR:
-                raise DuplicateSymbolError(msg)
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(pool_config.make_pool(jobs))
+        batch_results = pool.imap_unordered(
+            functools.partial(scanworker.ScanBatch, use_mmap=use_mmap, cache=cache),
+            batches,
+        )
 
-            logging.warning(msg)
-            continue
+        # Pool workers cannot start pools of their own, so very large files are
+        # scanned here, first, and split across the same pool.
+        timed_records = []
+        for scan_item in large_items:
+            start = time.perf_counter()
+            record, from_cache = scanworker.ScanCachedContent(
+                scan_item, use_mmap, cache, pool
+            )
+            timed_records.append(
+                (scan_item[0], record, time.perf_counter() - start, from_cache)
+            )
 
-        symbol_map[identifier] = symbol
+        for batch_result in batch_results:
+            timed_records.extend(batch_result)
 
-    return symbol_map
+    return timed_records
 
 
-class JsDoctorError(Exception):
-    """Base exception class for jsdoctor errors."""
+# pylint: disable-next=too-many-arguments
+def _scan_content_in_parallel(
+    content_map: Mapping[str, str | None],
+    delimiters: Mapping[str, corpus.FileDelimiters | None] | None = None,
+    jobs: int | None = None,
+    use_mmap: bool = False,
+    recorded_costs: Mapping[str, float] | None = None,
+    pool_config: scanpool.PoolConfig | None = None,
+    cache: scancache.ScanCache | None = None,
+    cache_stats: scancache.CacheStats | None = None,
+) -> tuple[list[source.SourceRecord], schedule.ScanTiming]:
+    if delimiters is None:
+        delimiters = {}
+    if recorded_costs is None:
+        recorded_costs = {}
+    if pool_config is None:
+        pool_config = scanpool.PoolConfig()
 
+    jobs = scanpool.GetJobs(jobs)
+    scan_items = [
+        (path, content, delimiters.get(path)) for path, content in content_map.items()
+    ]
+    sizes = [_get_content_size(path, content) for path, content, _ in scan_items]
+    has_large_items = any(size >= source.PARALLEL_SCAN_THRESHOLD for size in sizes)
 
-class DuplicateSymbolError(JsDoctorError):
-    """Exception raised when a duplicate symbol identifier is encountered."""
+    start = time.perf_counter()
+    if (
+        pool_config.executor == "serial"
+        or jobs == 1
+        or (len(scan_items) < _MIN_PARALLEL_SCAN_FILES and not has_large_items)
+    ):
+        logging.info("Scanning %s files serially.", len(scan_items))
+        jobs = 1
+        timed_records = scanworker.ScanBatch(scan_items, use_mmap, cache)
+    else:
+        logging.info(
+            "Scanning %s files with %s %s jobs.",
+            len(scan_items),
+            jobs,
+            pool_config.executor,
+        )
+        timed_records = _scan_in_pool(
+            scan_items,
+            sizes,
+            jobs,
+            use_mmap,
+            recorded_costs,
+            pool_config,
+            cache,
+        )
+    wall_seconds = time.perf_counter() - start
 
+    if cache_stats is not None:
+        for _, _, _, from_cache in timed_records:
+            cache_stats.add(from_cache)
 
-def _make_namespace_map(
-    symbols: Iterable[source.Symbol],
-) -> dict[str, set[source.Symbol]]:
-    namespace_map: dict[str, set[source.Symbol]] = collections.defaultdict(set)
-    for symbol in symbols:
-        assert symbol.namespace is not None
-        namespace_map[symbol.namespace].add(symbol)
-    return namespace_map
+    record_map = {path: record for path, record, _, _ in timed_records}
+    # Loading from the cache says nothing of what a scan would cost.
+    costs = {
+        path: seconds
+        for path, _, seconds, from_cache in timed_records
+        if not from_cache
+    }
+    timing = schedule.ScanTiming(jobs, wall_seconds, costs)
+    return [record_map[path] for path in content_map], timing
 
 
-def _scan_content(content_pair: tuple[str, str]) -> source.Source:
-    path, content = content_pair
-    return source.ScanScript(content, path)
+def _check_content_in_parallel(
+    content_map: Mapping[str, str | None],
+    jobs: int | None,
+    use_mmap: bool,
+    recorded_costs: Mapping[str, float],
+    pool_config: scanpool.PoolConfig,
+) -> None:
+    jobs = scanpool.GetJobs(jobs)
+    scan_items = [(path, content, None) for path, content in content_map.items()]
+    check = functools.partial(scanworker.CheckBatch, use_mmap=use_mmap)
+    if (
+        pool_config.executor == "serial"
+        or jobs == 1
+        or len(scan_items) < _MIN_PARALLEL_SCAN_FILES
+    ):
+        logging.info("Checking %s files serially.", len(scan_items))
+        check(scan_items)
+        return
 
+    sizes = [_get_content_size(path, content) for path, content, _ in scan_items]
+    costs = schedule.EstimateCosts(list(content_map), sizes, recorded_costs)
+    batches = [
+        [scan_items[index] for index in batch]
+        for batch in schedule.MakeBatches(costs, jobs * _CHUNKS_PER_JOB)
+    ]
 
-def _scan_content_in_parallel(
-    content_map: Mapping[str, str],
-) -> list[source.Source]:
-    with multiprocessing.Pool(20 * multiprocessing.cpu_count()) as pool:
-        return list(pool.imap(_scan_content, content_map.items()))
+    logging.info(
+        "Checking %s files with %s %s jobs.",
+        len(scan_items),
+        jobs,
+        pool_config.executor,
+    )
+    with pool_config.make_pool(jobs) as pool:
+        # Batches are consumed as they finish, so the first error is raised as
+        # soon as any worker finds it. Leaving the block then terminates the
+        # pool, cancelling the remaining work.
+        for _ in pool.imap_unordered(check, batches):
+            pass
 
 
-def _make_content_map(paths: Iterable[str]) -> dict[str, str]:
-    content_map = {}
+def _log_scan_timing(timing: schedule.ScanTiming) -> None:
+    slowest = timing.get_slowest()
+    if slowest is None:
+        return
+
+    slowest_path, slowest_seconds = slowest
+    logging.info(
+        "Scanned in %.2fs, %.2fs of it waiting on uneven work. "
+        "Slowest file: %s (%.2fs)",
+        timing.wall_seconds,
+        timing.lost_seconds,
+        slowest_path,
+        slowest_seconds,
+    )
+
+
+def _make_content_map(
+    paths: Iterable[str], read_content: bool = True
+) -> dict[str, str | None]:
+    content_map: dict[str, str | None] = {}
     for path in paths:
         if path in content_map:
             raise JsDoctorError(f"Path already added: {path}")
 
-        with open(path, encoding="utf-8") as f:
-            content = f.read()
+        content = None
+        if read_content:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
 
         content_map[path] = content
 
     return content_map
 
 
-def _parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Generates HTML docs for JsDoc")
-    parser.add_argument("--tar", help="Path to tar file", required=True)
-    parser.add_argument("files", help="Paths to files", nargs="*")
-    return parser.parse_args()
+def _scan_paths_streaming(
+    paths: list[str],
+    jobs: int | None,
+    use_mmap: bool,
+    pool_config: scanpool.PoolConfig,
+    cache: scancache.ScanCache | None,
+    cache_stats: scancache.CacheStats,
+) -> Iterator[source.SourceRecord]:
+    # Workers read each file themselves, so no content passes through here.
+    jobs = scanpool.GetJobs(jobs)
+    scan = functools.partial(
+        scanworker.ScanCachedContent, use_mmap=use_mmap, cache=cache
+    )
+    scan_items = [(path, None, None) for path in paths]
+    with contextlib.ExitStack() as stack:
+        if (
+            pool_config.executor == "serial"
+            or jobs == 1
+            or len(scan_items) < _MIN_PARALLEL_SCAN_FILES
+        ):
+            results = map(scan, scan_items)
+        else:
+            # Results are folded in path order as they arrive, so they are not
+            # reordered by cost here.
+            pool = stack.enter_context(pool_config.make_pool(jobs))
+            results = pool.imap(scan, scan_items, _get_chunksize(len(scan_items), jobs))
 
+        for record, from_cache in results:
+            if cache is not None:
+                cache_stats.add(from_cache)
+            yield record
 
-def main() -> None:
-    """Parses command-line arguments and generates the documentation tar archive."""
-    logging.basicConfig(
-        level=logging.INFO, format="%(levelname)s:%(module)s:%(lineno)d: %(message)s"
+
+def _generate_html_docs(
+    namespace_map: Mapping[str, Iterable[source.SymbolView]],
+) -> Iterator[tuple[str, bytes]]:
+    # generator imports html5lib, which --help and scanning never need.
+    from jsdoctor import generator  # pylint: disable=import-outside-toplevel
+
+    return generator.GenerateHtmlDocs(namespace_map)
+
+
+def _yield_streaming_docs(
+    table: symboltable.SymbolTable,
+    symbol_map: dict[str, source.SymbolView],
+) -> Iterator[tuple[str, bytes]]:
+    # Pages are rendered in the same order as by a build that is not streamed.
+    namespace_map = symbolindex.MakeNamespaceMap(symbol_map.values())
+    kept_rows = set(symbol_map.values())
+    symbol_map.clear()
+    for row in table:
+        if row not in kept_rows:
+            table.release_comment(row)
+    del kept_rows
+
+    # Each page's comments are released once the page has been rendered.
+    for namespace in list(namespace_map):
+        rows = namespace_map.pop(namespace)
+        yield from _generate_html_docs({namespace: rows})
+        for row in rows:
+            table.release_comment(row)
+
+
+def _log_peak_rss() -> None:
+    # ru_maxrss is in kilobytes on Linux.
+    parent_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    logging.info(
+        "Peak RSS: %s KiB (largest scan worker: %s KiB)", parent_rss, worker_rss
     )
 
-    result = _parse_args()
-    tar_path = result.tar
 
-    paths = result.files
-    paths = [path for path in paths if _should_scan_path(path)]
+def _build_streaming(
+    paths: list[str],
+    tar_path: str,
+    jobs: int | None,
+    use_mmap: bool,
+    pool_config: scanpool.PoolConfig,
+    cache: scancache.ScanCache | None,
+    cache_stats: scancache.CacheStats,
+) -> None:
+    seen_paths = set()
+    for path in paths:
+        if path in seen_paths:
+            raise JsDoctorError(f"Path already added: {path}")
+        seen_paths.add(path)
 
-    logging.info("Found %s paths.", len(paths))
-    logging.info("Reading file contents.")
-    content_map = _make_content_map(paths)
+    logging.info("Scanning files one at a time.")
+    table = symboltable.MakeSymbolTable(
+        _scan_paths_streaming(paths, jobs, use_mmap, pool_config, cache, cache_stats)
+    )
+    symbol_map = symbolindex.MakeSymbolMap(table, paths)
+    _write_tar(tar_path, _yield_streaming_docs(table, symbol_map))
+    _log_peak_rss()
 
-    sources = _scan_content_in_parallel(content_map)
-    symbols = _get_symbols_from_sources(sources)
 
-    # This could instead be just a dupe check
-    symbol_map = _make_symbol_map(symbols)
+def _finish_cache(
+    cache: scancache.ScanCache | None, cache_stats: scancache.CacheStats
+) -> None:
+    if cache is None:
+        return
 
-    symbols = symbol_map.values()
+    evicted = cache.evict()
+    logging.info(
+        "Scan cache: %s hits, %s misses, %s entries evicted.",
+        cache_stats.hits,
+        cache_stats.misses,
+        evicted,
+    )
 
-    namespace_map = _make_namespace_map(symbols)
 
+def _write_tar(tar_path: str, docs: Iterable[tuple[str, bytes]]) -> None:
     logging.info("Writing to tar: %s", tar_path)
     with tarfile.open(name=tar_path, mode="w") as tar:
-        for path, content in generator.GenerateHtmlDocs(namespace_map):
+        for path, content in docs:
             logging.info("Writing doc to tar: %s", path)
             # Add each path to the tar
             info = tarfile.TarInfo(name=path)
@@ -158,5 +384,823 @@ def main() -> None:
     logging.info("Tar written to %s", tar_path)
 
 
+# Manifest of an --out-dir build, kept with its pages.
+_DEFAULT_MANIFEST_FILENAME = ".jsdoctor-manifest.json"
+
+
+def _yield_changed_pages(
+    namespace_map: Mapping[str, Iterable[source.SymbolView]],
+    previous_hashes: Mapping[str, str],
+    page_hashes: dict[str, str],
+    has_page: Callable[[str], bool],
+    page_cache: dict[str, tuple[str, bytes]] | None = None,
+    changed_namespaces: Collection[str] | None = None,
+) -> Iterator[tuple[str, bytes | None]]:
+    """Renders the pages whose inputs changed since the previous build.
+
+    Args:
+        namespace_map: Mapping from namespace string to its symbols.
+        previous_hashes: Page hashes from the previous build's manifest.
+        page_hashes: Filled with this build's page hashes.
+        has_page: Whether a page is in the previous build's output.
+        page_cache: Optional pages rendered by earlier builds, by filename,
+            with their hashes. Pages found here are not rendered again, and
+            rendered pages are added.
+        changed_namespaces: Namespaces whose symbols may have changed since
+            the previous build, or None if any may have. The pages of the
+            others keep their previous hashes without being hashed again.
+
+    Yields:
+        Tuples of (filename, html_bytes), with None for the bytes of pages
+        to reuse from the previous output.
+    """
+    from jsdoctor import generator  # pylint: disable=import-outside-toplevel
+
+    generator_version = manifest.GetGeneratorVersion()
+    rendered = 0
+    for namespace, symbols in namespace_map.items():
+        filename = generator.GetPageFilename(namespace)
+        previous_hash = previous_hashes.get(filename)
+        if (
+            changed_namespaces is not None
+            and namespace not in changed_namespaces
+            and previous_hash is not None
+            and has_page(filename)
+        ):
+            page_hashes[filename] = previous_hash
+            yield filename, None
+            continue
+
+        page_hash = manifest.GetPageHash(namespace, symbols, generator_version)
+        page_hashes[filename] = page_hash
+        if previous_hash == page_hash and has_page(filename):
+            yield filename, None
+            continue
+
+        cached_page = None if page_cache is None else page_cache.get(filename)
+        if cached_page is not None and cached_page[0] == page_hash:
+            yield filename, cached_page[1]
+            continue
+
+        rendered += 1
+        for filename, content in generator.GenerateHtmlDocs({namespace: symbols}):
+            if page_cache is not None:
+                page_cache[filename] = (page_hash, content)
+            yield filename, content
+
+    logging.info(
+        "Rendered %s of %s pages; reused the rest.", rendered, len(page_hashes)
+    )
+
+
+def _reuse_tar_pages(
+    pages: Iterable[tuple[str, bytes | None]], previous_tar: tarfile.TarFile | None
+) -> Iterator[tuple[str, bytes]]:
+    for filename, content in pages:
+        if content is None:
+            assert previous_tar is not None
+            member = previous_tar.extractfile(filename)
+            assert member is not None, f"Not a file: {filename}"
+            content = member.read()
+        yield filename, content
+
+
+def _append_tar(tar_path: str, docs: Iterable[tuple[str, bytes | None]]) -> None:
+    # Like tar --update: a page appended again supersedes its earlier copies
+    # when the tar is extracted.
+    with tarfile.open(name=tar_path, mode="a") as tar:
+        for path, content in docs:
+            if content is None:
+                continue
+            logging.info("Appending doc to tar: %s", path)
+            info = tarfile.TarInfo(name=path)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+
+def _write_tar_incremental(
+    tar_path: str,
+    namespace_map: Mapping[str, Iterable[source.SymbolView]],
+    previous_hashes: Mapping[str, str],
+    page_cache: dict[str, tuple[str, bytes]] | None = None,
+    changed_namespaces: Collection[str] | None = None,
+) -> dict[str, str]:
+    page_hashes: dict[str, str] = {}
+    if changed_namespaces is not None:
+        # Every page of the previous build is still in the tar.
+        _append_tar(
+            tar_path,
+            _yield_changed_pages(
+                namespace_map,
+                previous_hashes,
+                page_hashes,
+                previous_hashes.__contains__,
+                page_cache,
+                changed_namespaces,
+            ),
+        )
+        return page_hashes
+
+    with contextlib.ExitStack() as stack:
+        previous_tar = None
+        previous_names: set[str] = set()
+        if os.path.exists(tar_path):
+            previous_tar = stack.enter_context(tarfile.open(tar_path))
+            previous_names = set(previous_tar.getnames())
+
+        pages = _yield_changed_pages(
+            namespace_map,
+            previous_hashes,
+            page_hashes,
+            previous_names.__contains__,
+            page_cache,
+        )
+        # The previous tar is read while the new one is written, so the new
+        # one replaces it only once it is whole.
+        temp_path = f"{tar_path}.tmp"
+        _write_tar(temp_path, _reuse_tar_pages(pages, previous_tar))
+        os.replace(temp_path, tar_path)
+
+    return page_hashes
+
+
+def _write_file(path: str, content: bytes) -> None:
+    # Written aside and renamed, so a page is never left half written.
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def _write_dir_incremental(
+    out_dir: str,
+    namespace_map: Mapping[str, Iterable[source.SymbolView]],
+    previous_hashes: Mapping[str, str],
+    page_cache: dict[str, tuple[str, bytes]] | None = None,
+    changed_namespaces: Collection[str] | None = None,
+) -> dict[str, str]:
+    logging.info("Writing to directory: %s", out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    page_hashes: dict[str, str] = {}
+    pages = _yield_changed_pages(
+        namespace_map,
+        previous_hashes,
+        page_hashes,
+        lambda filename: os.path.exists(os.path.join(out_dir, filename)),
+        page_cache,
+        changed_namespaces,
+    )
+    for filename, content in pages:
+        # Unchanged pages are left untouched, keeping their mtimes.
+        if content is not None:
+            logging.info("Writing doc to directory: %s", filename)
+            _write_file(os.path.join(out_dir, filename), content)
+
+    # Removes the pages of namespaces that no longer exist.
+    for filename in previous_hashes.keys() - page_hashes.keys():
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(out_dir, filename))
+
+    logging.info("Directory written to %s", out_dir)
+    return page_hashes
+
+
+@dataclass
+class _Output:
+    """Where a build writes its pages.
+
+    Attributes:
+        tar_path: Path of the tar to write, unless out_dir is given.
+        out_dir: Directory to write pages to instead of a tar.
+        manifest_path: Path of the manifest of page hashes, or None to keep
+            them only in memory.
+        page_cache: Optional pages rendered by earlier builds, by filename,
+            with their hashes, to reuse and add to.
+    """
+
+    tar_path: str | None = None
+    out_dir: str | None = None
+    manifest_path: str | None = None
+    page_cache: dict[str, tuple[str, bytes]] | None = None
+    # Superseded page copies appended to the tar since this output last wrote
+    # it whole, or None if it did not write it.
+    _superseded_pages: int | None = field(default=None, init=False, repr=False)
+
+    def read_manifest(self) -> dict[str, str]:
+        """Returns the page hashes of the previous build, if recorded."""
+        if self.manifest_path is None:
+            return {}
+        return manifest.ReadManifest(self.manifest_path)
+
+    def write(
+        self,
+        namespace_map: Mapping[str, Iterable[source.SymbolView]],
+        previous_hashes: Mapping[str, str],
+        changed_namespaces: Collection[str] | None = None,
+    ) -> dict[str, str]:
+        """Writes the pages whose hashes changed, and the manifest.
+
+        Changed pages of a tar this output wrote are appended to it, until
+        pages are removed or the superseded copies outnumber the pages; then
+        the tar is written whole again.
+
+        Args:
+            namespace_map: Mapping from namespace string to its symbols.
+            previous_hashes: Page hashes of the previous build, which this
+                output wrote.
+            changed_namespaces: Namespaces whose symbols may have changed
+                since the previous build, or None if any may have.
+
+        Returns:
+            This build's page hashes.
+        """
+        if self.out_dir is not None:
+            page_hashes = _write_dir_incremental(
+                self.out_dir,
+                namespace_map,
+                previous_hashes,
+                self.page_cache,
+                changed_namespaces,
+            )
+        else:
+            assert self.tar_path is not None
+            if not self._can_append(namespace_map, previous_hashes, changed_namespaces):
+                changed_namespaces = None
+            page_hashes = _write_tar_incremental(
+                self.tar_path,
+                namespace_map,
+                previous_hashes,
+                self.page_cache,
+                changed_namespaces,
+            )
+            if changed_namespaces is None:
+                self._superseded_pages = 0
+            else:
+                assert self._superseded_pages is not None
+                self._superseded_pages += sum(
+                    previous_hashes.get(filename, page_hash) != page_hash
+                    for filename, page_hash in page_hashes.items()
+                )
+
+        if self.manifest_path is not None:
+            manifest.WriteManifest(self.manifest_path, page_hashes)
+        return page_hashes
+
+    def _can_append(
+        self,
+        namespace_map: Mapping[str, Iterable[source.SymbolView]],
+        previous_hashes: Mapping[str, str],
+        changed_namespaces: Collection[str] | None,
+    ) -> bool:
+        assert self.tar_path is not None
+        if changed_namespaces is None or self._superseded_pages is None:
+            return False
+        if self._superseded_pages >= len(previous_hashes):
+            return False
+        # Pages cannot be removed from a tar without writing it again.
+        return all(
+            namespace in namespace_map for namespace in changed_namespaces
+        ) and os.path.exists(self.tar_path)
+
+
+def _stat_paths(paths: Iterable[str]) -> list[tuple[int, int] | None]:
+    stats: list[tuple[int, int] | None] = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stats.append(None)
+        else:
+            stats.append((stat.st_mtime_ns, stat.st_size))
+    return stats
+
+
+def _rescan(
+    path: str, use_mmap: bool, cache: scancache.ScanCache | None
+) -> source.SourceRecord | None:
+    try:
+        record, _ = scanworker.ScanCachedContent((path, None, None), use_mmap, cache)
+    except FileNotFoundError:
+        return None
+    return record
+
+
+def _watch(
+    paths: list[str],
+    index: symbolindex.SymbolIndex,
+    output: _Output,
+    page_hashes: dict[str, str],
+    interval: float,
+    use_mmap: bool,
+    cache: scancache.ScanCache | None,
+) -> None:
+    logging.info("Watching %s files for changes. Press Ctrl-C to stop.", len(paths))
+    stats = _stat_paths(paths)
+    try:
+        while True:
+            time.sleep(interval)
+            new_stats = _stat_paths(paths)
+            changed_paths = [
+                path
+                for path, stat, new_stat in zip(paths, stats, new_stats, strict=True)
+                if stat != new_stat
+            ]
+            stats = new_stats
+            if not changed_paths:
+                continue
+
+            start = time.perf_counter()
+            records: dict[str, source.SourceRecord | None] = {}
+            for path in changed_paths:
+                try:
+                    records[path] = _rescan(path, use_mmap, cache)
+                except (
+                    scanner.NoIdentifierFoundError,
+                    source.NamespaceNotFoundError,
+                    UnicodeDecodeError,
+                    OSError,
+                ) as error:
+                    # Files are often saved mid-edit; the next save retries.
+                    logging.error("Keeping previous docs of %s: %s", path, error)
+
+            changed_namespaces = index.update(records)
+            page_hashes = output.write(
+                index.namespace_map, page_hashes, changed_namespaces
+            )
+            logging.info(
+                "Rebuilt %s changed files (%s namespaces) in %.2fs.",
+                len(records),
+                len(changed_namespaces),
+                time.perf_counter() - start,
+            )
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+
+
+@dataclass
+class _WarmState:
+    """What a build daemon keeps between builds.
+
+    Attributes:
+        pool_config: How builds get the daemon's running scan pool.
+        jobs: Number of workers in the scan pool.
+        records: Scan record of each file of the latest build, by absolute
+            path, with the file's (mtime, size) when it was scanned.
+        page_cache: Pages of the latest build, by filename, with their
+            hashes.
+
+    Only the latest build's files and pages are kept, so the daemon's memory
+    follows the size of its builds rather than growing with every file and
+    namespace it has ever seen.
+    """
+
+    pool_config: scanpool.PoolConfig
+    jobs: int
+    records: dict[str, tuple[tuple[int, int], source.SourceRecord]] = field(
+        default_factory=dict
+    )
+    page_cache: dict[str, tuple[str, bytes]] = field(default_factory=dict)
+
+
+def _scan_changed_content(
+    warm: _WarmState,
+    content_map: Mapping[str, str | None],
+    use_mmap: bool,
+    recorded_costs: Mapping[str, float],
+    cache: scancache.ScanCache | None,
+    cache_stats: scancache.CacheStats,
+) -> tuple[list[source.SourceRecord], schedule.ScanTiming]:
+    # Files are stated before they are scanned, so a file changed during the
+    # scan is scanned again by the next build.
+    stats = dict(zip(content_map, _stat_paths(content_map), strict=True))
+    reused_records = {}
+    records = {}
+    for path, stat in stats.items():
+        entry = warm.records.get(os.path.abspath(path))
+        if entry is not None and entry[0] == stat:
+            reused_records[path] = entry[1]
+            records[os.path.abspath(path)] = entry
+
+    changed_map = {
+        path: content
+        for path, content in content_map.items()
+        if path not in reused_records
+    }
+    logging.info("Reusing scans of %s unchanged files.", len(reused_records))
+    changed_records, timing = _scan_content_in_parallel(
+        changed_map,
+        jobs=warm.jobs,
+        use_mmap=use_mmap,
+        recorded_costs=recorded_costs,
+        pool_config=warm.pool_config,
+        cache=cache,
+        cache_stats=cache_stats,
+    )
+
+    record_map = dict(zip(changed_map, changed_records, strict=True))
+    for path, record in record_map.items():
+        stat = stats[path]
+        if stat is not None:
+            records[os.path.abspath(path)] = (stat, record)
+    # Files that this build does not include are forgotten.
+    warm.records = records
+
+    record_map.update(reused_records)
+    return [record_map[path] for path in content_map], timing
+
+
+def _can_build_on_daemon(args: argparse.Namespace) -> bool:
+    # Daemons keep no state for these modes, and scan with their own pool.
+    return not (args.check or args.watch or args.streaming or args.engine == "batch")
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generates HTML docs for JsDoc")
+    parser.add_argument(
+        "--tar", help="Path to tar file. Required unless --check or --out-dir"
+    )
+    parser.add_argument(
+        "--out-dir",
+        help=(
+            "Directory to write pages to instead of a tar. Only pages whose "
+            "inputs changed since the last build are rewritten"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        help=(
+            "Path to a manifest of each page's input hash. Only pages whose "
+            "hash changed are rendered; the rest are copied from the previous "
+            "output. Defaults to a file in --out-dir"
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        help=(
+            "Only check that the docs would build: scan every file and parse "
+            "every @param and @return description, stopping at the first "
+            "problem, without rendering or writing anything"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--engine",
+        help=(
+            "Scan engine. 'sweep' scans each file on its own; 'batch' indexes "
+            "comment and namespace delimiters across all files at once first"
+        ),
+        choices=["sweep", "batch"],
+        default="sweep",
+    )
+    parser.add_argument(
+        "--mmap",
+        help=(
+            "Memory-map files in the scan workers and scan their bytes, "
+            "decoding only comments and identifiers"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of scan processes. Defaults to the number of CPUs",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-tasks-per-child",
+        help=(
+            "Replace each scan process after this many batches of files, "
+            "returning the memory it used to the system"
+        ),
+        type=int,
+    )
+    parser.add_argument(
+        "--scan-costs",
+        help=(
+            "Path to a file of per-file scan times. Read to schedule the "
+            "slowest files first, then updated with this build's times"
+        ),
+    )
+    parser.add_argument(
+        "--streaming",
+        help=(
+            "Read, scan and release files one at a time, keeping only the "
+            "symbol data needed for rendering, and report peak RSS"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--executor",
+        help=(
+            "How files are scanned in parallel: 'serial' in this process, "
+            "'thread' on a thread pool or 'process' on a process pool. "
+            "Defaults to 'thread' when the GIL is disabled, else 'process'"
+        ),
+        choices=["serial", "thread", "process"],
+    )
+    parser.add_argument(
+        "--start-method",
+        help=(
+            "multiprocessing start method of scan processes. 'forkserver' "
+            "imports the scan modules once in a server process that forks "
+            "each worker. Defaults to the platform default"
+        ),
+        choices=multiprocessing.get_all_start_methods(),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            "Directory of cached scan records, keyed by file content and "
+            "jsdoctor version. Unchanged files are loaded instead of scanned. "
+            "Builds on one host may share it"
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        help=(
+            "Size cap of --cache-dir in MiB. The least recently used records "
+            "beyond it are evicted at the end of each build"
+        ),
+        type=int,
+        default=1024,
+    )
+    parser.add_argument(
+        "--watch",
+        help=(
+            "After building, keep polling the files for changes, rescanning "
+            "only the changed files and rewriting only the pages they affect"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        help="Seconds between polls of the files in --watch mode",
+        type=float,
+        default=0.5,
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        help=(
+            "Unix socket of a build daemon. Builds are sent to the daemon if "
+            "one is listening there, and run in this process otherwise. "
+            "Defaults to $JSDOCTOR_DAEMON_SOCKET"
+        ),
+        default=os.environ.get("JSDOCTOR_DAEMON_SOCKET"),
+    )
+    parser.add_argument(
+        "--serve-daemon",
+        help=(
+            "Run a build daemon on --daemon-socket. It keeps a pool of --jobs "
+            "scan workers, the scan records of files and the rendered pages "
+            "of its past builds, rescanning only changed files and rendering "
+            "only changed pages"
+        ),
+        action="store_true",
+    )
+    parser.add_argument("files", help="Paths to files", nargs="*")
+    args = parser.parse_args(argv)
+    if args.serve_daemon and not args.daemon_socket:
+        parser.error("--serve-daemon requires --daemon-socket")
+    if (
+        args.tar is None
+        and args.out_dir is None
+        and not args.check
+        and not args.serve_daemon
+    ):
+        parser.error("--tar or --out-dir is required unless --check is given")
+    if args.tar is not None and args.out_dir is not None:
+        parser.error("--tar cannot be used with --out-dir")
+    if args.streaming and (args.out_dir or args.manifest):
+        parser.error("--streaming cannot be used with --out-dir or --manifest")
+    if args.watch and (args.check or args.streaming):
+        parser.error("--watch cannot be used with --check or --streaming")
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval must be positive")
+    if args.out_dir is not None and args.manifest is None:
+        args.manifest = os.path.join(args.out_dir, _DEFAULT_MANIFEST_FILENAME)
+    if args.check and (args.engine == "batch" or args.streaming):
+        parser.error("--check cannot be used with --engine=batch or --streaming")
+    if args.mmap and args.engine == "batch":
+        parser.error("--mmap cannot be used with --engine=batch")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_tasks_per_child is not None and args.max_tasks_per_child < 1:
+        parser.error("--max-tasks-per-child must be at least 1")
+    if args.streaming and args.engine == "batch":
+        parser.error("--streaming cannot be used with --engine=batch")
+    if args.executor is None:
+        args.executor = scanpool.GetDefaultExecutor()
+    if args.max_tasks_per_child is not None and args.executor != "process":
+        parser.error("--max-tasks-per-child requires --executor=process")
+    if args.cache_max_mb < 0:
+        parser.error("--cache-max-mb cannot be negative")
+    if args.start_method is not None and args.executor != "process":
+        parser.error("--start-method requires --executor=process")
+    return args
+
+
+def _build(result: argparse.Namespace, warm: _WarmState | None = None) -> None:
+    tar_path = result.tar
+
+    paths = result.files
+    paths = [path for path in paths if _should_scan_path(path)]
+
+    logging.info("Found %s paths.", len(paths))
+    pool_config = scanpool.PoolConfig(
+        result.executor, result.max_tasks_per_child, result.start_method
+    )
+    if result.check:
+        recorded_costs = {}
+        if result.scan_costs:
+            recorded_costs = schedule.ReadCosts(result.scan_costs)
+
+        try:
+            _check_content_in_parallel(
+                _make_content_map(paths, read_content=False),
+                result.jobs,
+                result.mmap,
+                recorded_costs,
+                pool_config,
+            )
+        except scanworker.CheckError as error:
+            logging.error("%s", error)
+            sys.exit(1)
+
+        logging.info("Checked %s files; the docs would build.", len(paths))
+        return
+
+    cache = None
+    if result.cache_dir:
+        cache = scancache.MakeScanCache(
+            result.cache_dir, result.cache_max_mb * 1024 * 1024
+        )
+    cache_stats = scancache.CacheStats()
+
+    if result.streaming:
+        _build_streaming(
+            paths, tar_path, result.jobs, result.mmap, pool_config, cache, cache_stats
+        )
+        _finish_cache(cache, cache_stats)
+        return
+
+    # Scan workers read their own files, except for the batch engine, which
+    # needs every file's content up front.
+    read_content = result.engine == "batch"
+    if read_content:
+        logging.info("Reading file contents.")
+    content_map = _make_content_map(paths, read_content=read_content)
+
+    delimiters = None
+    if result.engine == "batch":
+        logging.info("Indexing delimiters across all files.")
+        delimiters = corpus.IndexCorpus(
+            {
+                path: content
+                for path, content in content_map.items()
+                if content is not None
+            }
+        )
+
+    recorded_costs = {}
+    if result.scan_costs:
+        recorded_costs = schedule.ReadCosts(result.scan_costs)
+
+    if warm is None:
+        records, timing = _scan_content_in_parallel(
+            content_map,
+            delimiters,
+            result.jobs,
+            result.mmap,
+            recorded_costs,
+            pool_config,
+            cache,
+            cache_stats,
+        )
+    else:
+        records, timing = _scan_changed_content(
+            warm, content_map, result.mmap, recorded_costs, cache, cache_stats
+        )
+    _log_scan_timing(timing)
+    if result.scan_costs:
+        schedule.WriteCosts(result.scan_costs, {**recorded_costs, **timing.costs})
+
+    index = None
+    if result.watch:
+        # Rows are also indexed by file, to patch the maps as files change.
+        index = symbolindex.SymbolIndex()
+        index.update(dict(zip(content_map, records, strict=True)))
+        namespace_map = index.namespace_map
+    else:
+        # Symbols are kept in columns and refer to their source by path index.
+        table = symboltable.MakeSymbolTable(records)
+
+        # This could instead be just a dupe check
+        symbol_map = symbolindex.MakeSymbolMap(table, list(content_map))
+
+        symbols = symbol_map.values()
+
+        namespace_map = symbolindex.MakeNamespaceMap(symbols)
+
+    output = _Output(
+        tar_path,
+        result.out_dir,
+        result.manifest,
+        None if warm is None else warm.page_cache,
+    )
+    if result.manifest or result.watch or warm is not None:
+        page_hashes = output.write(namespace_map, output.read_manifest())
+        if warm is not None:
+            # Pages that this build does not include are forgotten.
+            for filename in warm.page_cache.keys() - page_hashes.keys():
+                del warm.page_cache[filename]
+    else:
+        _write_tar(tar_path, _generate_html_docs(namespace_map))
+
+    if index is not None:
+        _watch(
+            list(content_map),
+            index,
+            output,
+            page_hashes,
+            result.watch_interval,
+            result.mmap,
+            cache,
+        )
+    _finish_cache(cache, cache_stats)
+
+
+# Arguments holding paths, which the client gives relative to its directory.
+_PATH_ARGS = ("tar", "out_dir", "manifest", "scan_costs", "cache_dir")
+
+
+def _build_on_daemon(warm: _WarmState, argv: list[str]) -> int:
+    # argparse writes usage errors to stderr, which is the daemon's; they are
+    # logged instead, which sends them to the client.
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            result = _parse_args(argv)
+    except SystemExit:
+        logging.error("%s", stderr.getvalue().rstrip())
+        raise
+
+    # The daemon runs in the client's directory, but its pool workers do not,
+    # so every path is made absolute before they see it.
+    result.files = [os.path.abspath(path) for path in result.files]
+    for name in _PATH_ARGS:
+        path = getattr(result, name)
+        if path is not None:
+            setattr(result, name, os.path.abspath(path))
+
+    _build(result, warm)
+    return 0
+
+
+def _serve_daemon(result: argparse.Namespace) -> None:
+    jobs = scanpool.GetJobs(result.jobs)
+    pool_config = scanpool.PoolConfig(
+        result.executor, result.max_tasks_per_child, result.start_method
+    )
+    with contextlib.ExitStack() as stack:
+        if pool_config.executor != "serial":
+            pool = stack.enter_context(pool_config.make_pool(jobs))
+            pool_config = replace(pool_config, pool=pool)
+
+        warm = _WarmState(pool_config, jobs)
+        try:
+            daemon.Serve(
+                result.daemon_socket, functools.partial(_build_on_daemon, warm)
+            )
+        except daemon.DaemonError as error:
+            logging.error("%s", error)
+            sys.exit(1)
+
+
+def main() -> None:
+    """Parses command-line arguments and generates the documentation."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(levelname)s:%(module)s:%(lineno)d: %(message)s"
+    )
+
+    result = _parse_args()
+    if result.serve_daemon:
+        _serve_daemon(result)
+        return
+
+    if result.daemon_socket and _can_build_on_daemon(result):
+        try:
+            status = daemon.RunOnDaemon(result.daemon_socket, sys.argv[1:])
+        except daemon.DaemonDisconnectedError as error:
+            # Building again here could race with the daemon's half-done build.
+            logging.error("%s", error)
+            sys.exit(1)
+        if status is not None:
+            sys.exit(status)
+        logging.info(
+            "No build daemon on %s; building in this process.", result.daemon_socket
+        )
+
+    _build(result)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,193 @@
+"""Batch delimiter indexing over a whole corpus packed into one buffer.
+
+For full rebuilds of large trees, every source is packed into one contiguous
+UTF-8 buffer with an offset table. Each delimiter the scanner cares about is
+then located across the whole buffer in one re.finditer pass, which searches
+in C and steps through Python once per occurrence rather than per byte. The
+resulting offset arrays are used to pair comments and find namespace
+declarations per file without searching each file again. Scan workers then
+find each file's comment targets from its delimiters.
+"""
+
+from __future__ import annotations
+
+import array
+import bisect
+import heapq
+import itertools
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from . import scanner
+
+_COMMENT_OPENER = b"/**"
+_COMMENT_CLOSER = b"*/"
+_PROVIDE_CALL = b"goog.provide("
+_REQUIRE_CALL = b"goog.require("
+
+
+@dataclass
+class PackedCorpus:
+    """Sources packed into one buffer.
+
+    Attributes:
+        buffer: UTF-8 encoded sources, concatenated.
+        offsets: Offset table. Source i spans offsets[i]:offsets[i + 1].
+    """
+
+    buffer: bytes
+    offsets: array.array
+
+
+@dataclass
+class DelimiterIndex:
+    """Sorted buffer offsets of every occurrence of each scanner delimiter.
+
+    Attributes:
+        comment_openers: Offsets of "/**".
+        comment_closers: Offsets of "*/".
+        provide_calls: Offsets of "goog.provide(".
+        require_calls: Offsets of "goog.require(".
+    """
+
+    comment_openers: array.array
+    comment_closers: array.array
+    provide_calls: array.array
+    require_calls: array.array
+
+
+# pylint: disable-next=invalid-name
+def PackCorpus(contents: Iterable[str]) -> PackedCorpus:
+    """Packs source texts into one buffer with an offset table.
+
+    Args:
+        contents: Source texts, in corpus order.
+
+    Returns:
+        A PackedCorpus for the sources.
+    """
+    encoded = [content.encode("utf-8") for content in contents]
+    offsets = array.array("q", itertools.accumulate(map(len, encoded), initial=0))
+    return PackedCorpus(b"".join(encoded), offsets)
+
+
+def _find_all(buffer: bytes, delimiter: bytes) -> array.array:
+    # The regex engine scans the buffer in C; Python only steps once per
+    # occurrence. Matches do not overlap, and no delimiter overlaps itself.
+    pattern = re.compile(re.escape(delimiter))
+    return array.array("q", [match.start() for match in pattern.finditer(buffer)])
+
+
+# pylint: disable-next=invalid-name
+def IndexDelimiters(buffer: bytes) -> DelimiterIndex:
+    """Finds every scanner delimiter in a packed buffer.
+
+    Args:
+        buffer: Packed corpus buffer.
+
+    Returns:
+        A DelimiterIndex for the buffer.
+    """
+    return DelimiterIndex(
+        _find_all(buffer, _COMMENT_OPENER),
+        _find_all(buffer, _COMMENT_CLOSER),
+        _find_all(buffer, _PROVIDE_CALL),
+        _find_all(buffer, _REQUIRE_CALL),
+    )
+
+
+def _get_positions_in_range(
+    positions: array.array, delimiter: bytes, start: int, end: int
+) -> list[int]:
+    # Occurrences straddling a file boundary belong to neither file.
+    first = bisect.bisect_left(positions, start)
+    last = bisect.bisect_right(positions, end - len(delimiter), first)
+    return [position - start for position in positions[first:last]]
+
+
+def _pair_comments(
+    index: DelimiterIndex, start: int, end: int
+) -> list[tuple[int, int]]:
+    openers = index.comment_openers
+    closers = index.comment_closers
+    spans = []
+
+    opener_index = bisect.bisect_left(openers, start)
+    while opener_index < len(openers):
+        opener = openers[opener_index]
+        closer_index = bisect.bisect_left(closers, opener + len(_COMMENT_OPENER))
+        if closer_index == len(closers):
+            break
+
+        comment_end = closers[closer_index] + len(_COMMENT_CLOSER)
+        if comment_end > end:
+            # No later opener in this file can be terminated either.
+            break
+
+        spans.append((opener - start, comment_end - start))
+        opener_index = bisect.bisect_left(openers, comment_end, opener_index)
+
+    return spans
+
+
+@dataclass
+class FileDelimiters:
+    """Delimiters of one file, located by a batch index of its corpus.
+
+    Attributes:
+        comment_spans: (start, end) of every JSDoc comment, in source order.
+        namespace_call_starts: Position of every "goog.provide(" and
+            "goog.require(" in the file, in source order.
+    """
+
+    comment_spans: list[tuple[int, int]]
+    namespace_call_starts: list[int]
+
+    def sweep(self, script: scanner.ScriptBuffer) -> scanner.ScanResult:
+        """Returns the SweepScript result for the file's script.
+
+        Raises:
+            NoIdentifierFoundError: If a comment block has no target
+                identifier.
+        """
+        return scanner.ScanDelimitedScript(
+            script, self.comment_spans, self.namespace_call_starts
+        )
+
+
+# pylint: disable-next=invalid-name
+def IndexCorpus(
+    content_map: Mapping[str, str],
+) -> dict[str, FileDelimiters | None]:
+    """Locates the delimiters of every source in a corpus in one batch.
+
+    Byte offsets in the buffer are only character offsets for ASCII sources.
+    Other sources map to None and should be swept individually.
+
+    Args:
+        content_map: Mapping from path to source text.
+
+    Returns:
+        A dictionary mapping each path to its FileDelimiters, or None.
+    """
+    corpus = PackCorpus(content_map.values())
+    index = IndexDelimiters(corpus.buffer)
+
+    results: dict[str, FileDelimiters | None] = {}
+    for file_index, (path, content) in enumerate(content_map.items()):
+        if not content.isascii():
+            results[path] = None
+            continue
+
+        start = corpus.offsets[file_index]
+        end = corpus.offsets[file_index + 1]
+        namespace_call_starts = heapq.merge(
+            _get_positions_in_range(index.provide_calls, _PROVIDE_CALL, start, end),
+            _get_positions_in_range(index.require_calls, _REQUIRE_CALL, start, end),
+        )
+        results[path] = FileDelimiters(
+            _pair_comments(index, start, end), list(namespace_call_starts)
+        )
+
+    return results
@@ -0,0 +1,189 @@
+"""A local build daemon serving builds over a Unix socket, and its client.
+
+Each connection carries one build. The client sends a JSON line holding the
+command-line arguments and working directory of the build; the daemon runs it
+and streams back the build's log lines as JSON lines, followed by a line
+holding its exit status.
+
+This module only moves builds between processes. What a build does, and what
+the daemon keeps warm between builds, is up to the build function given to
+Serve.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+from collections.abc import Callable
+
+# Runs a build from its command-line arguments, returning its exit status.
+BuildFunction = Callable[[list[str]], int]
+
+
+class _ClientLogHandler(logging.Handler):
+    """Sends log lines to a client, for as long as it is connected."""
+
+    def __init__(self, wfile: io.BufferedIOBase) -> None:
+        super().__init__()
+        self._wfile = wfile
+        self._connected = True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self._connected:
+            return
+        try:
+            _write_message(self._wfile, {"log": self.format(record)})
+        except OSError:
+            # The build carries on if the client goes away.
+            self._connected = False
+
+
+def _write_message(wfile: io.BufferedIOBase, message: dict) -> None:
+    wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+def _make_handler(
+    build: BuildFunction, formatter: logging.Formatter | None
+) -> type[socketserver.StreamRequestHandler]:
+    class Handler(socketserver.StreamRequestHandler):
+        """Runs the build requested on one connection."""
+
+        def handle(self) -> None:
+            line = self.rfile.readline()
+            if not line:
+                # A connection that only checked whether a daemon is listening.
+                return
+
+            request = json.loads(line)
+            log_handler = _ClientLogHandler(self.wfile)
+            log_handler.setFormatter(formatter)
+            root_logger = logging.getLogger()
+            root_logger.addHandler(log_handler)
+
+            # Builds run one at a time, so each may change directory.
+            previous_cwd = os.getcwd()
+            try:
+                os.chdir(request["cwd"])
+                status = build(request["args"])
+            except SystemExit as error:
+                status = error.code if isinstance(error.code, int) else 1
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Build failed")
+                status = 1
+            finally:
+                os.chdir(previous_cwd)
+                root_logger.removeHandler(log_handler)
+
+            try:
+                _write_message(self.wfile, {"status": status})
+            except OSError:
+                pass
+
+    return Handler
+
+
+def _is_listening(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+class DaemonError(Exception):
+    """Exception raised when a daemon cannot be started."""
+
+
+class DaemonDisconnectedError(Exception):
+    """Exception raised when a daemon goes away before finishing a build."""
+
+
+# pylint: disable-next=invalid-name
+def Serve(socket_path: str, build: BuildFunction) -> None:
+    """Serves builds on a Unix socket, one at a time, until interrupted.
+
+    Log lines of each build are sent to its client in the format of the root
+    logger's first handler.
+
+    Args:
+        socket_path: Path of the socket. Only the current user may connect.
+        build: Runs a build from its command-line arguments.
+
+    Raises:
+        DaemonError: If another daemon is listening on socket_path.
+    """
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            raise DaemonError(f"A daemon is already listening on {socket_path}")
+        # Left behind by a daemon that did not exit cleanly.
+        os.remove(socket_path)
+
+    root_handlers = logging.getLogger().handlers
+    formatter = root_handlers[0].formatter if root_handlers else None
+
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(
+            socket_path, _make_handler(build, formatter)
+        )
+    finally:
+        os.umask(previous_umask)
+
+    # Stops on SIGTERM as on Ctrl-C, removing the socket.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    logging.info("Serving builds on %s. Press Ctrl-C to stop.", socket_path)
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Stopped serving builds.")
+    finally:
+        os.remove(socket_path)
+
+
+# pylint: disable-next=invalid-name
+def RunOnDaemon(socket_path: str, args: list[str]) -> int | None:
+    """Runs a build on a daemon, copying its log lines to stderr.
+
+    Args:
+        socket_path: Path of the daemon's socket.
+        args: The build's command-line arguments.
+
+    Returns:
+        The build's exit status, or None if no daemon is listening.
+
+    Raises:
+        DaemonDisconnectedError: If the daemon went away before finishing the
+            build. The build may have written some of its output.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+
+        try:
+            with sock.makefile("rwb") as stream:
+                _write_message(stream, {"args": args, "cwd": os.getcwd()})
+                for line in stream:
+                    message = json.loads(line)
+                    if "status" in message:
+                        return message["status"]
+                    sys.stderr.write(message["log"] + "\n")
+        except (OSError, ValueError) as error:
+            # E.g. a reset connection, or a line cut short.
+            raise DaemonDisconnectedError(
+                f"The daemon on {socket_path} went away: {error}"
+            ) from error
+
+    raise DaemonDisconnectedError(
+        f"The daemon on {socket_path} went away before finishing the build"
+    )
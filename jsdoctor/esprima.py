@@ -2,6 +2,7 @@
 
 import codecs
 import logging
+import mmap
 import multiprocessing
 import os
 import subprocess  # nosec B404
@@ -20,11 +21,11 @@ def GetParseInputPath() -> str:
 
 
 # pylint: disable-next=invalid-name
-def MultiParse(sources: Iterable[str]) -> list[bytes]:
+def MultiParse(sources: Iterable[str | bytes]) -> list[bytes]:
     """Parses multiple JavaScript source strings concurrently using Node/Esprima.
 
     Args:
-        sources: Collection of JavaScript source strings.
+        sources: Collection of JavaScript source strings or UTF-8 bytes.
 
     Returns:
         List of parsed JSON bytes results.
@@ -34,11 +35,12 @@ def MultiParse(sources: Iterable[str]) -> list[bytes]:
         return results
 
 
-def parse(source: str) -> bytes:
+def parse(source: str | bytes | mmap.mmap) -> bytes:
     """Parses a single JavaScript source string via Node/Esprima subprocess.
 
     Args:
-        source: JavaScript source code text.
+        source: JavaScript source code text, or a UTF-8 bytes-like buffer that is
+            passed to the subprocess as is.
 
     Returns:
         Parsed AST JSON output as bytes.
@@ -49,8 +51,9 @@ def parse(source: str) -> bytes:
         stderr=subprocess.PIPE,
         stdout=subprocess.PIPE,
     ) as proc:
-        encoded_source, _unused_length = codecs.getencoder("utf8")(source)
-        out, err = proc.communicate(encoded_source)
+        if isinstance(source, str):
+            source, _unused_length = codecs.getencoder("utf8")(source)
+        out, err = proc.communicate(source)
 
         if proc.returncode != 0:
             logging.error("Error while parsing.")
@@ -58,3 +61,24 @@ def parse(source: str) -> bytes:
             raise RuntimeError("Esprima parsing failed.")
 
         return out
+
+
+# pylint: disable-next=invalid-name
+def ParseFile(path: str) -> bytes:
+    """Parses a JavaScript file via Node/Esprima without decoding it.
+
+    The file is memory-mapped and its bytes are handed to the subprocess.
+
+    Args:
+        path: Path of the UTF-8 JavaScript file.
+
+    Returns:
+        Parsed AST JSON output as bytes.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            # Empty files cannot be mapped.
+            return parse(b"")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse(mapped)
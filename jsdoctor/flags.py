@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import functools
 import re
+import sys
 from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -80,6 +83,27 @@ all_flags: frozenset[str] = frozenset(
 
 ALL_FLAGS = frozenset(all_flags)
 
+# A bit for each flag, so a comment's set of flags fits in one int.
+FLAG_BITS: dict[str, int] = {
+    name: 1 << index for index, name in enumerate(sorted(ALL_FLAGS))
+}
+
+
+# pylint: disable-next=invalid-name
+def GetFlagMask(flag_names: Iterable[str]) -> int:
+    """Returns the bitmask of FLAG_BITS for a collection of flag names.
+
+    Args:
+        flag_names: Flag names, e.g. '@param'.
+
+    Returns:
+        The bitwise OR of each name's bit.
+    """
+    flag_mask = 0
+    for flag_name in flag_names:
+        flag_mask |= FLAG_BITS[flag_name]
+    return flag_mask
+
 
 # pylint: disable-next=invalid-name
 def ParseParameterDescription(desc: str) -> tuple[str, str, str]:
@@ -129,6 +153,127 @@ def ParseReturnDescription(desc: str) -> tuple[str, str]:
     return (match.group("type").strip(), match.group("desc").strip())
 
 
+@dataclass(frozen=True)
+class Type:
+    """A JSDoc type expression, shared by every flag that declares it.
+
+    Attributes:
+        expression: Type expression without the enclosing braces.
+        text: Display text of the type, in braces.
+    """
+
+    expression: str
+    text: str
+
+    def __reduce__(self) -> tuple:
+        # Types unpickled from a worker are shared with identical loaded ones.
+        return (GetType, (self.expression,))
+
+
+@dataclass(frozen=True)
+class Param:
+    """A parsed JSDoc @param flag.
+
+    Attributes:
+        name: Parameter name.
+        type: Declared parameter type.
+        text: Parameter description.
+    """
+
+    name: str
+    type: Type
+    text: str
+
+
+@dataclass(frozen=True)
+class Return:
+    """A parsed JSDoc @return flag.
+
+    Attributes:
+        type: Declared return type.
+        text: Return description.
+    """
+
+    type: Type
+    text: str
+
+
+# Shared by scan threads. Types are only added with setdefault, which is atomic
+# even without the GIL, so racing threads still end up with one instance.
+_TYPES: dict[str, Type] = {}
+
+
+# pylint: disable-next=invalid-name
+def GetType(expression: str) -> Type:
+    """Returns the shared Type for a type expression.
+
+    Args:
+        expression: Type expression without the enclosing braces.
+
+    Returns:
+        The one Type instance for the expression in this process.
+    """
+    type_ = _TYPES.get(expression)
+    if type_ is None:
+        expression = sys.intern(expression)
+        type_ = _TYPES.setdefault(expression, Type(expression, f"{{{expression}}}"))
+    return type_
+
+
+# pylint: disable-next=invalid-name
+@functools.lru_cache(maxsize=4096)
+def ParseParam(desc: str) -> Param:
+    """Parses a JSDoc @param flag description into a Param.
+
+    Args:
+        desc: The raw text following @param.
+
+    Returns:
+        The parsed Param.
+
+    Raises:
+        ValueError: If the description cannot be parsed into a parameter.
+    """
+    name, type_str, text = ParseParameterDescription(desc)
+    return Param(name, GetType(type_str), text)
+
+
+# pylint: disable-next=invalid-name
+@functools.lru_cache(maxsize=4096)
+def ParseReturn(desc: str) -> Return:
+    """Parses a JSDoc @return flag description into a Return.
+
+    Args:
+        desc: The raw text following @return.
+
+    Returns:
+        The parsed Return.
+
+    Raises:
+        ValueError: If the description cannot be parsed into a return declaration.
+    """
+    type_str, text = ParseReturnDescription(desc)
+    return Return(GetType(type_str), text)
+
+
+# pylint: disable-next=invalid-name
+def MaybeParseParam(desc: str) -> Param | None:
+    """Like ParseParam, but returns None if the description cannot be parsed."""
+    try:
+        return ParseParam(desc)
+    except ValueError:
+        return None
+
+
+# pylint: disable-next=invalid-name
+def MaybeParseReturn(desc: str) -> Return | None:
+    """Like ParseReturn, but returns None if the description cannot be parsed."""
+    try:
+        return ParseReturn(desc)
+    except ValueError:
+        return None
+
+
 PUBLIC = "public"
 PROTECTED = "protected"
 PRIVATE = "private"
@@ -137,12 +282,16 @@ PRIVATE = "private"
 # pylint: disable-next=invalid-name
 def GetVisibility(flags: Iterable[Flag]) -> str:
     """Returns one of PUBLIC, PROTECTED, or PRIVATE."""
+    return GetVisibilityFromMask(GetFlagMask(flag.name for flag in flags))
 
-    flag_names = [flag.name for flag in flags]
-    if "@private" in flag_names:
+
+# pylint: disable-next=invalid-name
+def GetVisibilityFromMask(flag_mask: int) -> str:
+    """Returns one of PUBLIC, PROTECTED, or PRIVATE for a GetFlagMask bitmask."""
+    if flag_mask & FLAG_BITS["@private"]:
         return PRIVATE
 
-    if "@protected" in flag_names:
+    if flag_mask & FLAG_BITS["@protected"]:
         return PROTECTED
 
     return PUBLIC
@@ -11,12 +11,18 @@ import html5lib
 from . import flags, linkify, symboltypes
 
 if TYPE_CHECKING:
-    from .source import Flag, Symbol
+    from .source import Flag, SymbolView
+
+
+# pylint: disable-next=invalid-name
+def GetPageFilename(namespace: str) -> str:
+    """Returns the filename of a namespace's page."""
+    return f"{namespace}.html"
 
 
 # pylint: disable-next=invalid-name
 def GenerateHtmlDocs(
-    namespace_map: Mapping[str, Iterable[Symbol]],
+    namespace_map: Mapping[str, Iterable[SymbolView]],
 ) -> Iterator[tuple[str, bytes]]:
     """Generates HTML document filename and bytes pairs for each namespace.
 
@@ -34,7 +40,7 @@ def GenerateHtmlDocs(
 
 # pylint: disable-next=invalid-name
 def GenerateDocuments(
-    namespace_map: Mapping[str, Iterable[Symbol]],
+    namespace_map: Mapping[str, Iterable[SymbolView]],
 ) -> Iterator[tuple[str, minidom.Document]]:
     """Generates DOM documents for each namespace in namespace_map.
 
@@ -45,8 +51,7 @@ def GenerateDocuments(
         Tuples of (filename, minidom.Document).
     """
     for namespace, symbols in namespace_map.items():
-        filename = f"{namespace}.html"
-        yield filename, _generate_document(namespace, symbols)
+        yield GetPageFilename(namespace), _generate_document(namespace, symbols)
 
 
 def _process_string(content: str) -> minidom.DocumentFragment:
@@ -73,19 +78,23 @@ def _make_element(tagname: str, content: str | None = None) -> minidom.Element:
     return element
 
 
-def _is_static(symbol: Symbol) -> bool:
+def _is_static(symbol: SymbolView) -> bool:
     return bool(symbol.static)
 
 
-def _is_not_static(symbol: Symbol) -> bool:
+def _is_not_static(symbol: SymbolView) -> bool:
     return not _is_static(symbol)
 
 
-def _get_symbols_of_type(symbols: Iterable[Symbol], symbol_type: str) -> list[Symbol]:
+def _get_symbols_of_type(
+    symbols: Iterable[SymbolView], symbol_type: str
+) -> list[SymbolView]:
     return [symbol for symbol in symbols if symbol.type == symbol_type]
 
 
-def _generate_document(namespace: str, symbols: Iterable[Symbol]) -> minidom.Document:
+def _generate_document(
+    namespace: str, symbols: Iterable[SymbolView]
+) -> minidom.Document:
     dom = minidom.getDOMImplementation()
     assert dom is not None  # For pytype.
     doc = dom.createDocument(None, "html", None)
@@ -100,7 +109,7 @@ def _generate_document(namespace: str, symbols: Iterable[Symbol]) -> minidom.Doc
     return doc
 
 
-def _add_symbol_description(node_list: minidom.NodeList, symbol: Symbol) -> None:
+def _add_symbol_description(node_list: minidom.NodeList, symbol: SymbolView) -> None:
     assert symbol.comment is not None
     node_list.append(_make_element("h3", symbol.identifier))
     for section in symbol.comment.description_sections:
@@ -122,10 +131,15 @@ def _yield_param_flags(comment_flags: Iterable[Flag]) -> Iterator[Flag]:
             yield flag
 
 
-def _get_param_string(flag: Flag) -> str:
+def _get_param(flag: Flag) -> flags.Param:
     assert flag.name == "@param"
-    name, type_str, _ = flags.ParseParameterDescription(flag.text)
-    return f"{{{type_str}}} {name}"
+    # Flags that could not be parsed at scan time raise the parse error here.
+    return flag.param or flags.ParseParam(flag.text)
+
+
+def _get_param_string(flag: Flag) -> str:
+    param = _get_param(flag)
+    return f"{param.type.text} {param.name}"
 
 
 def _get_return_flag(comment_flags: Iterable[Flag]) -> Flag | None:
@@ -138,32 +152,35 @@ def _get_return_flag(comment_flags: Iterable[Flag]) -> Flag | None:
     return return_flags[0]
 
 
-def _get_return_string(flag: Flag) -> str:
+def _get_return(flag: Flag) -> flags.Return:
     assert flag.name == "@return"
-    type_str, _ = flags.ParseReturnDescription(flag.text)
-    return f"{{{type_str}}}"
+    return flag.returns or flags.ParseReturn(flag.text)
+
+
+def _get_return_string(flag: Flag) -> str:
+    return _get_return(flag).type.text
 
 
-def _make_function_code_element(name: str, function: Symbol) -> minidom.Element:
+def _make_function_code_element(name: str, function: SymbolView) -> minidom.Element:
     assert function.comment is not None
     code = _make_element("code")
     code.appendChild(_make_link(name, "#" + name))
 
-    param_flags = list(_yield_param_flags(function.comment.flags))
+    param_flags = list(_yield_param_flags(function.comment.get_flags("@param")))
     param_strings = [_get_param_string(flag) for flag in param_flags]
     param_line = ", ".join(param_strings)
 
     text_node = _make_text_node(f"({param_line})")
     code.appendChild(text_node)
 
-    return_flag = _get_return_flag(function.comment.flags)
+    return_flag = _get_return_flag(function.comment.get_flags("@return"))
     if return_flag:
         code.appendChild(_make_text_node(" : "))
         code.appendChild(_make_text_node(_get_return_string(return_flag)))
     return code
 
 
-def _make_function_summary_list(functions: Iterable[Symbol]) -> minidom.Element:
+def _make_function_summary_list(functions: Iterable[SymbolView]) -> minidom.Element:
     summary_list = _make_element("dl")
 
     for function in functions:
@@ -191,17 +208,19 @@ def _make_function_summary_list(functions: Iterable[Symbol]) -> minidom.Element:
 
 
 # pylint: disable=too-many-locals
-def _add_function_description(node_list: minidom.NodeList, function: Symbol) -> None:
+def _add_function_description(
+    node_list: minidom.NodeList, function: SymbolView
+) -> None:
     assert function.comment is not None
     header = _make_element("h3", function.identifier)
     header.setAttribute("id", function.identifier)
     node_list.append(header)
 
     # Draw function signature.
-    param_flags = list(_yield_param_flags(function.comment.flags))
+    param_flags = list(_yield_param_flags(function.comment.get_flags("@param")))
 
     function_interface = ""
-    function_interface += flags.GetVisibility(function.comment.flags) + " "
+    function_interface += flags.GetVisibilityFromMask(function.comment.flag_mask) + " "
     function_interface += f"{function.identifier}("
 
     # Draw parameters.
@@ -218,7 +237,7 @@ def _add_function_description(node_list: minidom.NodeList, function: Symbol) ->
     function_interface += ")"
 
     # Draw return.
-    return_flag = _get_return_flag(function.comment.flags)
+    return_flag = _get_return_flag(function.comment.get_flags("@return"))
     if return_flag:
         function_interface += " : " + _get_return_string(return_flag)
 
@@ -231,16 +250,16 @@ def _add_function_description(node_list: minidom.NodeList, function: Symbol) ->
         param_list = _make_element("dl")
         node_list.append(param_list)
         for flag in param_flags:
-            name, type_str, desc = flags.ParseParameterDescription(flag.text)
-            term = _make_element("dt", name)
+            param = _get_param(flag)
+            term = _make_element("dt", param.name)
             param_list.appendChild(term)
 
             definition = _make_element("dd")
 
-            code_type = _make_element("code", f"{{{type_str}}}")
+            code_type = _make_element("code", param.type.text)
             definition.appendChild(code_type)
             definition.appendChild(_make_text_node(" "))
-            definition.appendChild(_process_string(desc))
+            definition.appendChild(_process_string(param.text))
             term.appendChild(definition)
 
     if return_flag:
@@ -248,11 +267,11 @@ def _add_function_description(node_list: minidom.NodeList, function: Symbol) ->
         return_paragraph = _make_element("p")
         node_list.append(return_paragraph)
 
-        type_str, desc = flags.ParseReturnDescription(return_flag.text)
-        code_type = _make_element("code", f"{{{type_str}}}")
+        return_ = _get_return(return_flag)
+        code_type = _make_element("code", return_.type.text)
         return_paragraph.appendChild(code_type)
         return_paragraph.appendChild(_make_text_node(" "))
-        return_paragraph.appendChild(_process_string(desc))
+        return_paragraph.appendChild(_process_string(return_.text))
 
     # Add description paragraphs.
     for section in function.comment.description_sections:
@@ -265,7 +284,9 @@ def _add_function_description(node_list: minidom.NodeList, function: Symbol) ->
 
 
 # pylint: disable=too-many-branches,too-many-locals
-def _generate_content(namespace: str, symbols: Iterable[Symbol]) -> minidom.NodeList:
+def _generate_content(
+    namespace: str, symbols: Iterable[SymbolView]
+) -> minidom.NodeList:
     node_list = minidom.NodeList()
 
     node_list.append(_make_element("h1", namespace))
@@ -306,7 +327,7 @@ def _generate_content(namespace: str, symbols: Iterable[Symbol]) -> minidom.Node
 
     public_instance_methods = list(
         filter(
-            lambda m: flags.GetVisibility(m.comment.flags) == flags.PUBLIC,
+            lambda m: flags.GetVisibilityFromMask(m.comment.flag_mask) == flags.PUBLIC,
             instance_methods,
         )
     )
@@ -316,7 +337,7 @@ def _generate_content(namespace: str, symbols: Iterable[Symbol]) -> minidom.Node
 
     public_static_methods = list(
         filter(
-            lambda m: flags.GetVisibility(m.comment.flags) == flags.PUBLIC,
+            lambda m: flags.GetVisibilityFromMask(m.comment.flag_mask) == flags.PUBLIC,
             static_functions,
         )
     )
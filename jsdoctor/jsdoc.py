@@ -28,25 +28,43 @@ def ProcessComment(comment_text: str) -> tuple[list[str], list[tuple[str, str]]]
     return descriptions, flags
 
 
+# pylint: disable-next=invalid-name
+def YieldFlagNames(comment_text: str) -> Iterator[str]:
+    """Yields the name of every flag in a JSDoc comment text, in order.
+
+    Finds the same flags as ProcessComment without sectioning the text or
+    collecting flag descriptions.
+
+    Args:
+        comment_text: Raw JSDoc comment text block.
+
+    Yields:
+        Flag names such as '@param'.
+    """
+    for flag_match in _match_flags(comment_text):
+        yield flag_match.group("flag")
+
+
 def _process_comment_section(section_text: str) -> tuple[str, list[tuple[str, str]]]:
-    remaining_text = section_text
     flags: list[tuple[str, str]] = []
 
-    matches = list(_match_flags(section_text))
-    matches.reverse()
+    matches = _match_flags(section_text)
+    flag_match = next(matches, None)
+    if not flag_match:
+        return section_text, flags
+
+    # The description is whatever wasn't part of a flag.
+    description = section_text[0 : flag_match.start()]
 
     # A flag is itself and whatever text appears behind it (until the next flag
     # or the end of a section).
-    for flag_match in matches:
-        flag_name = flag_match.group("flag")
-        flag_text = remaining_text[flag_match.end() :].strip()
+    for next_flag_match in matches:
+        flag_text = section_text[flag_match.end() : next_flag_match.start()]
+        flags.append((flag_match.group("flag"), flag_text.strip()))
+        flag_match = next_flag_match
 
-        flags.insert(0, (flag_name, flag_text))
-
-        remaining_text = remaining_text[0 : flag_match.start()]
-
-    # The description is whatever wasn't part of a flag.
-    description = remaining_text
+    flag_text = section_text[flag_match.end() :]
+    flags.append((flag_match.group("flag"), flag_text.strip()))
 
     return description, flags
 
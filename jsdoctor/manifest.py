@@ -0,0 +1,131 @@
+"""Output manifests for incremental rendering.
+
+A manifest maps each page of a build's output to a hash of everything the
+page was rendered from: its namespace, the symbols in it and their comments,
+and the version of the code that renders them. A later build renders only
+the pages whose hash changed and reuses the rest from the previous output.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import os
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .source import SymbolView
+
+# Bump when the manifest layout or the page hash changes.
+_FORMAT_VERSION = 1
+
+# Modules whose code determines a page's content, from comment text to HTML.
+_RENDER_MODULES = (
+    "flags.py",
+    "generator.py",
+    "jsdoc.py",
+    "linkify.py",
+    "scanner.py",
+    "source.py",
+    "symboltypes.py",
+)
+
+
+# pylint: disable-next=invalid-name
+def GetGeneratorVersion() -> str:
+    """Returns a digest of the code and dependencies that render pages.
+
+    Returns:
+        The version string.
+    """
+    digest = hashlib.sha256(str(_FORMAT_VERSION).encode("utf-8"))
+    try:
+        digest.update(importlib.metadata.version("html5lib").encode("utf-8"))
+    except importlib.metadata.PackageNotFoundError:
+        pass
+
+    module_dir = os.path.dirname(__file__)
+    for filename in _RENDER_MODULES:
+        with open(os.path.join(module_dir, filename), "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def _update_str(digest: hashlib._Hash, value: object) -> None:
+    # Values are length-prefixed so that adjacent fields cannot run together.
+    encoded = repr(value).encode("utf-8")
+    digest.update(len(encoded).to_bytes(8, "little"))
+    digest.update(encoded)
+
+
+# pylint: disable-next=invalid-name
+def GetPageHash(
+    namespace: str, symbols: Iterable[SymbolView], generator_version: str
+) -> str:
+    """Hashes everything a namespace's page is rendered from.
+
+    Args:
+        namespace: The page's namespace.
+        symbols: The namespace's symbols, in any order.
+        generator_version: Result of GetGeneratorVersion.
+
+    Returns:
+        A hex digest that changes whenever the page would.
+    """
+    digest = hashlib.sha256()
+    _update_str(digest, generator_version)
+    _update_str(digest, namespace)
+    for symbol in sorted(symbols, key=lambda symbol: symbol.identifier):
+        _update_str(digest, symbol.identifier)
+        _update_str(digest, symbol.type)
+        _update_str(digest, symbol.static)
+        _update_str(digest, symbol.property)
+        comment = symbol.comment
+        if comment is None:
+            _update_str(digest, None)
+        else:
+            _update_str(digest, comment.text if comment.raw is None else comment.raw)
+    return digest.hexdigest()
+
+
+# pylint: disable-next=invalid-name
+def ReadManifest(path: str) -> dict[str, str]:
+    """Reads the page hashes written by WriteManifest.
+
+    Args:
+        path: Path of the manifest.
+
+    Returns:
+        Page hashes by page filename. Empty if there is no manifest, or it
+        was written in another format.
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != _FORMAT_VERSION:
+        return {}
+    return manifest["pages"]
+
+
+# pylint: disable-next=invalid-name
+def WriteManifest(path: str, page_hashes: Mapping[str, str]) -> None:
+    """Writes page hashes, by page filename, for the next build to compare.
+
+    The manifest is written aside and renamed into place, so an interrupted
+    build leaves the previous manifest whole.
+
+    Args:
+        path: Path of the manifest.
+        page_hashes: Page hashes by page filename.
+    """
+    manifest = {"format": _FORMAT_VERSION, "pages": dict(page_hashes)}
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(temp_path, path)
@@ -81,17 +81,21 @@ def _get_symbol_parts_in_namespace(
 
 # pylint: disable-next=invalid-name
 def GetClosestNamespaceForSymbol(
-    symbol: str, candidate_namespaces: Iterable[str]
+    symbol: str, candidate_namespaces: "Iterable[str] | NamespaceIndex"
 ) -> str | None:
     """Finds the most specific candidate namespace that contains the symbol.
 
     Args:
         symbol: Dot-separated symbol identifier string.
-        candidate_namespaces: Collection of namespace strings to check against.
+        candidate_namespaces: Collection of namespace strings to check against,
+            or a NamespaceIndex of them.
 
     Returns:
         The closest matching namespace string, or None if no candidate matches.
     """
+    if isinstance(candidate_namespaces, NamespaceIndex):
+        return candidate_namespaces.get_closest_namespace(symbol)
+
     closest_namespace = None
     symbol_parts = GetNamespaceParts(symbol)
 
@@ -110,3 +114,57 @@ def GetClosestNamespaceForSymbol(
             max_count = count
 
     return closest_namespace
+
+
+class _TrieNode:
+    __slots__ = ("children", "namespace")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.namespace: str | None = None
+
+
+class NamespaceIndex:
+    """Prefix trie of namespaces, keyed on their dot-separated parts.
+
+    Answers membership and closest-namespace questions against every indexed
+    namespace in time proportional to the depth of the symbol, instead of the
+    number of namespaces.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, namespaces: Iterable[str] = ()) -> None:
+        self._root = _TrieNode()
+        self.update(namespaces)
+
+    def add(self, namespace: str) -> None:
+        """Adds a namespace to the index."""
+        node = self._root
+        for part in GetNamespaceParts(namespace):
+            node = node.children.setdefault(part, _TrieNode())
+        node.namespace = namespace
+
+    def update(self, namespaces: Iterable[str]) -> None:
+        """Adds several namespaces to the index."""
+        for namespace in namespaces:
+            self.add(namespace)
+
+    def get_closest_namespace(self, symbol: str) -> str | None:
+        """Returns the deepest indexed namespace containing symbol, if any."""
+        closest_namespace = None
+        node = self._root
+        for part in GetNamespaceParts(symbol):
+            child = node.children.get(part)
+            if child is None:
+                break
+
+            node = child
+            if node.namespace is not None:
+                closest_namespace = node.namespace
+
+        return closest_namespace
+
+    def is_symbol_part_of_namespaces(self, symbol: str) -> bool:
+        """Returns whether symbol belongs to any indexed namespace."""
+        return self.get_closest_namespace(symbol) is not None
@@ -0,0 +1,265 @@
+"""Content-addressed on-disk cache of scan records.
+
+Entries are keyed by a hash of a file's content and of the jsdoctor version,
+so unchanged files are loaded rather than scanned again, whatever their path,
+and a new jsdoctor never reads records made by an old one. Each entry holds
+one record in the transport result block layout.
+
+Several builds may share a cache directory. Entries are written to a
+temporary file and renamed into place, so readers see whole entries or none.
+Reading an entry marks it as recently used; eviction, which removes the least
+recently used entries once the cache is over its size cap, holds an exclusive
+lock so that only one build evicts at a time.
+
+The cache is best-effort: an entry that cannot be read or decoded is a miss,
+and one that cannot be written is not cached, so a damaged, read-only or full
+cache slows builds down rather than failing them.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import importlib.metadata
+import logging
+import os
+import secrets
+import struct
+import time
+from dataclasses import dataclass
+
+from . import source, transport
+
+# Bump when the entry layout or the meaning of a record changes.
+_FORMAT_VERSION = 1
+
+# Modules whose code determines scan records.
+_SCAN_MODULES = (
+    "flags.py",
+    "jsdoc.py",
+    "namespace.py",
+    "scanner.py",
+    "source.py",
+    "symboltypes.py",
+    "transport.py",
+)
+
+_LOCK_FILENAME = "lock"
+_TEMP_PREFIX = ".tmp"
+
+# Temporary files older than this were left by builds that died mid-write.
+_STALE_TEMP_SECONDS = 60 * 60
+
+
+# pylint: disable-next=invalid-name
+def GetVersion() -> str:
+    """Returns the jsdoctor version that cache keys include.
+
+    Source trees change without a new package version, so the version also
+    includes a digest of the code of the scan modules.
+
+    Returns:
+        The version string.
+    """
+    try:
+        package_version = importlib.metadata.version("jsdoctor")
+    except importlib.metadata.PackageNotFoundError:
+        package_version = "unknown"
+
+    digest = hashlib.sha256()
+    module_dir = os.path.dirname(__file__)
+    for filename in _SCAN_MODULES:
+        with open(os.path.join(module_dir, filename), "rb") as f:
+            digest.update(f.read())
+
+    return f"{package_version}+{_FORMAT_VERSION}.{digest.hexdigest()[:16]}"
+
+
+@dataclass(frozen=True)
+class ScanCache:
+    """An on-disk cache of scan records.
+
+    Attributes:
+        directory: Cache directory, created as needed.
+        max_bytes: Size cap of the cache. Evict removes the least recently
+            used entries beyond it.
+        version: The jsdoctor version, from GetVersion.
+    """
+
+    directory: str
+    max_bytes: int
+    version: str
+
+    def get_key(self, data: bytes) -> str:
+        """Returns the key of a file's content."""
+        digest = hashlib.sha256(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def load(self, key: str, path: str | None) -> source.SourceRecord | None:
+        """Loads a cached record.
+
+        Args:
+            key: The content's key.
+            path: Path to give the record.
+
+        Returns:
+            The record, or None if it is not cached.
+        """
+        entry_path = self._get_entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            logging.warning("Ignoring unreadable scan cache entry: %s", error)
+            return None
+
+        try:
+            # Marks the entry as recently used.
+            os.utime(entry_path)
+        except OSError:
+            # E.g. a read-only cache; the entry is still good.
+            pass
+
+        try:
+            (record,) = transport.DecodeRecords(data)
+        except (struct.error, ValueError, IndexError, KeyError):
+            logging.warning("Ignoring undecodable scan cache entry %s", entry_path)
+            return None
+
+        record.path = path
+        return record
+
+    def store(self, key: str, record: source.SourceRecord) -> None:
+        """Caches a record, if the cache can be written.
+
+        Args:
+            key: The content's key.
+            record: The content's scan record. Its path is not cached.
+        """
+        data = transport.EncodeRecords(
+            [
+                source.SourceRecord(
+                    None, record.provides, record.requires, record.symbols
+                )
+            ]
+        )
+
+        entry_path = self._get_entry_path(key)
+        entry_dir = os.path.dirname(entry_path)
+        temp_path = os.path.join(entry_dir, _TEMP_PREFIX + secrets.token_hex(8))
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            # Written aside and renamed, so no reader sees a partial entry. The
+            # mode is subject to the umask, as for any other file the build
+            # writes, so that builds of other users may share the cache.
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, entry_path)
+        except OSError as error:
+            logging.warning("Not caching scan record: %s", error)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def evict(self) -> int:
+        """Removes the least recently used entries beyond the size cap.
+
+        Also removes temporary files left by builds that died mid-write. Does
+        nothing if another build is already evicting, or if the cache cannot
+        be written.
+
+        Returns:
+            The number of entries removed.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            lock_file = open(  # pylint: disable=consider-using-with
+                os.path.join(self.directory, _LOCK_FILENAME), "ab"
+            )
+        except OSError as error:
+            logging.warning("Not evicting from the scan cache: %s", error)
+            return 0
+
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+
+            stale_time = time.time() - _STALE_TEMP_SECONDS
+            entries = []
+            for entry_dir in os.scandir(self.directory):
+                if not entry_dir.is_dir():
+                    continue
+                for entry in os.scandir(entry_dir.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    if not entry.name.startswith(_TEMP_PREFIX):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif stat.st_mtime < stale_time:
+                        _remove(entry.path)
+
+            size = sum(entry_size for _, entry_size, _ in entries)
+            removed = 0
+            for _, entry_size, entry_path in sorted(entries):
+                if size <= self.max_bytes:
+                    break
+
+                _remove(entry_path)
+                size -= entry_size
+                removed += 1
+
+            return removed
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# pylint: disable-next=invalid-name
+def MakeScanCache(directory: str, max_bytes: int) -> ScanCache:
+    """Makes a ScanCache for the running jsdoctor.
+
+    Args:
+        directory: Cache directory, created as needed.
+        max_bytes: Size cap of the cache.
+
+    Returns:
+        The ScanCache.
+    """
+    return ScanCache(directory, max_bytes, GetVersion())
+
+
+@dataclass
+class CacheStats:
+    """Counts of scan cache lookups.
+
+    Attributes:
+        hits: Records loaded from the cache.
+        misses: Records scanned and stored.
+    """
+
+    hits: int = 0
+    misses: int = 0
+
+    def add(self, from_cache: bool) -> None:
+        """Counts one lookup."""
+        if from_cache:
+            self.hits += 1
+        else:
+            self.misses += 1
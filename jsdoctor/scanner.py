@@ -1,16 +1,179 @@
-"""Regular expression scanners for JSDoc comments and Closure declarations."""
+"""Regular expression scanners for JSDoc comments and Closure declarations.
 
+Every scanner here runs in time linear in the size of the script: comment
+delimiters are located with str.find, and the identifier and declaration
+patterns use possessive quantifiers so the regex engine never backtracks into
+them.
+"""
+
+import mmap
 import re
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from re import Match
+from typing import Any
+
+from . import jsdoc
 
 _BASE_REGEX_STRING = "^\\s*goog\\.%s\\(\\s*['\"](.+)['\"]\\s*\\)"
 _PROVIDE_REGEX = re.compile(_BASE_REGEX_STRING % "provide")
 _REQUIRES_REGEX = re.compile(_BASE_REGEX_STRING % "require")
 
 
+# Scripts can be scanned as str, or as bytes-like buffers (bytes, mmap) of
+# ASCII text without decoding them first.
+ScriptBuffer = str | bytes | mmap.mmap
+
+# Characters str.splitlines() treats as line boundaries.
+_LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+_ASCII_LINE_BREAKS = b"\n\r\v\f\x1c\x1d\x1e"
+
+# What str patterns match with \s, restricted to ASCII. Byte patterns only
+# match " \t\n\r\v\f" with \s.
+_ASCII_WHITESPACE = b" \t\n\r\v\f\x1c\x1d\x1e\x1f"
+
+# Equivalent to _PROVIDE_REGEX and _REQUIRES_REGEX applied to each line of
+# splitlines(), but usable directly against the whole script.
+_NAMESPACE_CALL_REGEX = re.compile(r"goog\.(?:provide|require)\(")
+_LINE_SPACE = rf"[^\S{_LINE_BREAKS}]*+"
+_NAMESPACE_LINE_REGEX = re.compile(
+    rf"{_LINE_SPACE}goog\.(?P<kind>provide|require)\({_LINE_SPACE}['\"]"
+    rf"(?P<namespace>[^{_LINE_BREAKS}]+)['\"]{_LINE_SPACE}\)"
+)
+
+_FILEOVERVIEW_REGEX = re.compile(r"@fileoverview\b")
+_TARGET_START_REGEX = re.compile(r"[($\w]")
+# Matches the same text as the (?:[$\w]+\s*\.\s*)*[$\w]+ chain this scanner
+# historically used, without nested quantifiers that can be backtracked into.
+_IDENTIFIER_CHAIN_REGEX = re.compile(r"[$\w]++(?:\s*+\.\s*+[$\w]++)*+")
+_JSDOC_COMMENT_REGEX = re.compile(r"/\*\*.*?\*/", re.DOTALL)
+_NON_WHITESPACE_REGEX = re.compile(r"\S")
+
+_ASCII_SPACE = rb"[ \t\n\r\v\f\x1c-\x1f]"
+_ASCII_LINE_SPACE = rb"[ \t\x1f]*+"
+_ASCII_NAMESPACE_LINE_REGEX = re.compile(
+    _ASCII_LINE_SPACE
+    + rb"goog\.(?P<kind>provide|require)\("
+    + _ASCII_LINE_SPACE
+    + rb"['\"](?P<namespace>[^\n\r\v\f\x1c\x1d\x1e]+)['\"]"
+    + _ASCII_LINE_SPACE
+    + rb"\)"
+)
+_ASCII_IDENTIFIER_CHAIN_REGEX = re.compile(
+    rb"[$\w]++(?:" + _ASCII_SPACE + rb"*+\." + _ASCII_SPACE + rb"*+[$\w]++)*+"
+)
+
+
+@dataclass(frozen=True)
+class _Syntax:
+    """Delimiters and patterns for one kind of script buffer.
+
+    Delimiters are str for str scripts and bytes for bytes-like buffers.
+    """
+
+    comment_opener: Any
+    comment_closer: Any
+    line_breaks: Any
+    line_break: re.Pattern
+    is_space: Callable[[Any], bool]
+    namespace_call: re.Pattern
+    namespace_line: re.Pattern
+    fileoverview: re.Pattern
+    target_start: re.Pattern
+    identifier_chain: re.Pattern
+    non_whitespace: re.Pattern
+
+    def decode(self, text: str | bytes) -> str:
+        """Returns text as str."""
+        if isinstance(text, str):
+            return text
+        return text.decode("ascii")
+
+
+_STR_SYNTAX = _Syntax(
+    "/**",
+    "*/",
+    _LINE_BREAKS,
+    re.compile(f"[{_LINE_BREAKS}]"),
+    str.isspace,
+    _NAMESPACE_CALL_REGEX,
+    _NAMESPACE_LINE_REGEX,
+    _FILEOVERVIEW_REGEX,
+    _TARGET_START_REGEX,
+    _IDENTIFIER_CHAIN_REGEX,
+    _NON_WHITESPACE_REGEX,
+)
+
+_ASCII_SYNTAX = _Syntax(
+    b"/**",
+    b"*/",
+    _ASCII_LINE_BREAKS,
+    re.compile(rb"[\n\r\v\f\x1c\x1d\x1e]"),
+    _ASCII_WHITESPACE.__contains__,
+    re.compile(rb"goog\.(?:provide|require)\("),
+    _ASCII_NAMESPACE_LINE_REGEX,
+    re.compile(rb"@fileoverview\b"),
+    re.compile(rb"[($\w]"),
+    _ASCII_IDENTIFIER_CHAIN_REGEX,
+    re.compile(rb"[^ \t\n\r\v\f\x1c-\x1f]"),
+)
+
+
+def _get_syntax(script: ScriptBuffer) -> _Syntax:
+    return _STR_SYNTAX if isinstance(script, str) else _ASCII_SYNTAX
+
+
 class NoIdentifierFoundError(Exception):
-    """Exception raised when no identifier target is found following a comment."""
+    """Exception raised when no identifier target is found following a comment.
+
+    Attributes:
+        offset: Index of the comment in the script, if known.
+    """
+
+    def __init__(self, message: str, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.offset = offset
+
+    def __reduce__(self) -> tuple:
+        # Keeps the offset when raised in a pool worker.
+        return type(self), (str(self), self.offset)
+
+
+@dataclass
+class CommentTarget:
+    """A JSDoc comment span and the identifier it documents.
+
+    Attributes:
+        comment_start: Starting character index of the comment.
+        comment_end: Ending character index of the comment.
+        target: Identifier text as written (possibly spanning whitespace), "(" for
+            a parenthetical, or None for a @fileoverview comment.
+        target_start: Starting character index of the target, or -1.
+        target_end: Ending character index of the target, or -1.
+        next_char: First non-whitespace character after the target, if any.
+    """
+
+    comment_start: int
+    comment_end: int
+    target: str | None = None
+    target_start: int = -1
+    target_end: int = -1
+    next_char: str | None = None
+
+
+@dataclass
+class ScanResult:
+    """Everything the scanner extracts from a script in one sweep.
+
+    Attributes:
+        provides: Provided namespaces, in source order.
+        requires: Required namespaces, in source order.
+        comments: CommentTarget for every JSDoc comment, in source order.
+    """
+
+    provides: list[str] = field(default_factory=list)
+    requires: list[str] = field(default_factory=list)
+    comments: list[CommentTarget] = field(default_factory=list)
 
 
 # pylint: disable-next=invalid-name
@@ -45,6 +208,378 @@ def YieldRequires(source: str) -> Iterator[str]:
             yield match.group(1)
 
 
+def _get_indented_line_start(script: ScriptBuffer, pos: int, syntax: _Syntax) -> int:
+    """Returns the start of pos's line if only whitespace precedes pos, else -1."""
+    while pos > 0:
+        char = script[pos - 1 : pos]
+        if char in syntax.line_breaks:
+            break
+        if not syntax.is_space(char):
+            return -1
+        pos -= 1
+    return pos
+
+
+def _scan_namespace_call(
+    script: ScriptBuffer, call_start: int, result: ScanResult, syntax: _Syntax
+) -> None:
+    line_start = _get_indented_line_start(script, call_start, syntax)
+    if line_start == -1:
+        return
+
+    line_match = syntax.namespace_line.match(script, line_start)
+    if not line_match:
+        return
+
+    namespace = syntax.decode(line_match.group("namespace"))
+    if syntax.decode(line_match.group("kind")) == "provide":
+        result.provides.append(namespace)
+    else:
+        result.requires.append(namespace)
+
+
+class _TargetFinder:
+    """Finds comment targets in one script, reusing the previous search.
+
+    Comments are visited in order, and a run of comments with no identifier
+    between them (e.g. "/***/ /***/ ... foo") all document the same target.
+    Without reuse, every comment in such a run would rescan up to it.
+    """
+
+    def __init__(self, script: ScriptBuffer, syntax: _Syntax = _STR_SYNTAX) -> None:
+        self._script = script
+        self._syntax = syntax
+        self._search_pos = -1
+        self._target_match: Match | None = None
+        self._next_char_pos = -1
+        self._next_char: str | None = None
+
+    def find(self, pos: int) -> Match | None:
+        """Returns the FindCommentTarget match for pos."""
+        target_match = self._target_match
+        if (
+            self._search_pos == -1
+            or pos < self._search_pos
+            or (target_match and target_match.start() < pos)
+        ):
+            self._search_pos = pos
+            target_match = self._syntax.target_start.search(self._script, pos)
+            if target_match and self._syntax.decode(target_match.group()) != "(":
+                target_match = self._syntax.identifier_chain.match(
+                    self._script, target_match.start()
+                )
+            self._target_match = target_match
+
+        return target_match
+
+    def find_next_char(self, pos: int) -> str | None:
+        """Returns the first non-whitespace character at or after pos."""
+        if pos != self._next_char_pos:
+            self._next_char_pos = pos
+            next_match = self._syntax.non_whitespace.search(self._script, pos)
+            self._next_char = (
+                self._syntax.decode(next_match.group()) if next_match else None
+            )
+
+        return self._next_char
+
+
+def _scan_comment_target(
+    script: ScriptBuffer, start: int, end: int, finder: _TargetFinder, syntax: _Syntax
+) -> CommentTarget:
+    comment = CommentTarget(start, end)
+    if syntax.fileoverview.search(script, start, end):
+        return comment
+
+    target_match = finder.find(end)
+    if not target_match:
+        raise NoIdentifierFoundError(
+            "Found no identifier for comment: " + syntax.decode(script[start:end]),
+            start,
+        )
+
+    comment.target = syntax.decode(target_match.group())
+    comment.target_start, comment.target_end = target_match.span()
+    comment.next_char = finder.find_next_char(comment.target_end)
+
+    return comment
+
+
+# pylint: disable-next=invalid-name
+def SweepScript(script: ScriptBuffer) -> ScanResult:
+    """Scans a script once, left to right, for declarations and JSDoc targets.
+
+    Produces the same provides, requires, comment spans and targets as
+    YieldProvides, YieldRequires and ExtractDocumentedSymbols, without walking
+    the script once per question.
+
+    Args:
+        script: JavaScript source code text, or a bytes-like buffer of ASCII
+            JavaScript source, which is scanned without being decoded.
+
+    Returns:
+        A ScanResult for the script.
+
+    Raises:
+        NoIdentifierFoundError: If a comment block has no target identifier.
+    """
+    syntax = _get_syntax(script)
+    result = ScanResult()
+    finder = _TargetFinder(script, syntax)
+    call_iter = syntax.namespace_call.finditer(script)
+    next_call = next(call_iter, None)
+    comment_start = script.find(syntax.comment_opener)
+
+    while next_call or comment_start != -1:
+        if next_call and (comment_start == -1 or next_call.start() < comment_start):
+            _scan_namespace_call(script, next_call.start(), result, syntax)
+            next_call = next(call_iter, None)
+            continue
+
+        comment_end = script.find(syntax.comment_closer, comment_start + 3)
+        if comment_end == -1:
+            # No later opener can be terminated either.
+            comment_start = -1
+            continue
+
+        comment_end += 2
+        result.comments.append(
+            _scan_comment_target(script, comment_start, comment_end, finder, syntax)
+        )
+        comment_start = script.find(syntax.comment_opener, comment_end)
+
+    return result
+
+
+# pylint: disable-next=invalid-name
+def ScanDelimitedScript(
+    script: ScriptBuffer,
+    comment_spans: Iterable[tuple[int, int]],
+    namespace_call_starts: Iterable[int],
+) -> ScanResult:
+    """Builds the SweepScript result from delimiters that were located elsewhere.
+
+    Args:
+        script: JavaScript source code text, or a bytes-like buffer of ASCII
+            JavaScript source.
+        comment_spans: (start, end) of every JSDoc comment, in source order.
+        namespace_call_starts: Position of every "goog.provide(" and
+            "goog.require(" in the script, in source order.
+
+    Returns:
+        A ScanResult for the script.
+
+    Raises:
+        NoIdentifierFoundError: If a comment block has no target identifier.
+    """
+    syntax = _get_syntax(script)
+    result = ScanResult()
+    for call_start in namespace_call_starts:
+        _scan_namespace_call(script, call_start, result, syntax)
+
+    finder = _TargetFinder(script, syntax)
+    for comment_start, comment_end in comment_spans:
+        result.comments.append(
+            _scan_comment_target(script, comment_start, comment_end, finder, syntax)
+        )
+
+    return result
+
+
+@dataclass
+class ChunkSweep:
+    """What SweepChunk finds in one chunk of a script.
+
+    Attributes:
+        result: Declarations and comment targets found within the chunk, at
+            their offsets in the whole script.
+        deferred_calls: Offsets of the chunk's trailing namespace calls whose
+            lines run past the chunk, left for MergeChunkSweeps.
+        deferred_comments: (start, end) offsets of the chunk's trailing
+            comments whose targets may lie past the chunk, left for
+            MergeChunkSweeps.
+    """
+
+    result: ScanResult = field(default_factory=ScanResult)
+    deferred_calls: list[int] = field(default_factory=list)
+    deferred_comments: list[tuple[int, int]] = field(default_factory=list)
+
+
+def _find_chunk_boundary(script: ScriptBuffer, pos: int, syntax: _Syntax) -> int:
+    # Returns the position just past the first "*/" at or after pos that no
+    # comment opener overlaps, i.e. not in "/**/" or "*/**". The sweep is
+    # outside of any comment there: a comment opened before it is closed by
+    # that "*/" at the latest.
+    closer = script.find(syntax.comment_closer, pos)
+    while closer != -1:
+        boundary = closer + 2
+        if (
+            script[closer - 2 : closer] != syntax.comment_opener[:2]
+            and script[boundary : boundary + 1] != syntax.comment_opener[1:2]
+        ):
+            return boundary
+        closer = script.find(syntax.comment_closer, closer + 1)
+    return -1
+
+
+# pylint: disable-next=invalid-name
+def YieldSweepChunks(
+    script: ScriptBuffer, chunk_size: int
+) -> Iterator[tuple[ScriptBuffer, int]]:
+    """Splits a script into chunks that SweepChunk can sweep independently.
+
+    Chunks end just past a comment's "*/", so no comment spans two chunks.
+    Each chunk after the first also starts with the "/" before its boundary,
+    so that the chunk sweeps as if it were still part of the script.
+
+    Args:
+        script: JavaScript source code text, or a bytes-like buffer of ASCII
+            JavaScript source.
+        chunk_size: Approximate number of characters per chunk.
+
+    Yields:
+        (chunk, offset) pairs, where offset is the index of the chunk's first
+        character in script.
+    """
+    syntax = _get_syntax(script)
+    offset = 0
+    while True:
+        boundary = -1
+        if len(script) - offset > chunk_size:
+            boundary = _find_chunk_boundary(script, offset + chunk_size, syntax)
+        if boundary == -1:
+            yield script[offset:], offset
+            return
+
+        yield script[offset:boundary], offset
+        offset = boundary - 1
+
+
+def _sweep_chunk_comment(
+    chunk: ScriptBuffer, start: int, end: int, finder: _TargetFinder, syntax: _Syntax
+) -> CommentTarget | None:
+    # Returns None if the comment's target may continue past the chunk, or lie
+    # entirely beyond it.
+    comment = CommentTarget(start, end)
+    if syntax.fileoverview.search(chunk, start, end):
+        return comment
+
+    target_match = finder.find(end)
+    if not target_match:
+        return None
+
+    next_char = finder.find_next_char(target_match.end())
+    if next_char is None or next_char == ".":
+        # An identifier chain such as "a . " may continue in the next chunk.
+        return None
+
+    comment.target = syntax.decode(target_match.group())
+    comment.target_start, comment.target_end = target_match.span()
+    comment.next_char = next_char
+    return comment
+
+
+def _offset_comment_target(comment: CommentTarget, offset: int) -> CommentTarget:
+    comment.comment_start += offset
+    comment.comment_end += offset
+    if comment.target is not None:
+        comment.target_start += offset
+        comment.target_end += offset
+    return comment
+
+
+# pylint: disable-next=invalid-name
+def SweepChunk(chunk: ScriptBuffer, offset: int) -> ChunkSweep:
+    """Sweeps one chunk from YieldSweepChunks, as SweepScript sweeps a script.
+
+    Comment targets and namespace declarations that may depend on text past
+    the end of the chunk are deferred, along with everything after them in
+    the chunk, for MergeChunkSweeps to resolve against the whole script. No
+    NoIdentifierFoundError is raised here for the same reason.
+
+    Args:
+        chunk: The chunk's text or bytes.
+        offset: Index of the chunk's first character in the script.
+
+    Returns:
+        The chunk's ChunkSweep.
+    """
+    syntax = _get_syntax(chunk)
+    sweep = ChunkSweep()
+    finder = _TargetFinder(chunk, syntax)
+    call_iter = syntax.namespace_call.finditer(chunk)
+    next_call = next(call_iter, None)
+    comment_start = chunk.find(syntax.comment_opener)
+
+    while next_call or comment_start != -1:
+        if next_call and (comment_start == -1 or next_call.start() < comment_start):
+            call_start = next_call.start()
+            if sweep.deferred_calls or (
+                _get_indented_line_start(chunk, call_start, syntax) != -1
+                and not syntax.line_break.search(chunk, call_start)
+            ):
+                sweep.deferred_calls.append(offset + call_start)
+            else:
+                _scan_namespace_call(chunk, call_start, sweep.result, syntax)
+            next_call = next(call_iter, None)
+            continue
+
+        comment_end = chunk.find(syntax.comment_closer, comment_start + 3)
+        if comment_end == -1:
+            # Only the last chunk can end in an open comment; see
+            # _find_chunk_boundary.
+            comment_start = -1
+            continue
+
+        comment_end += 2
+        comment = None
+        if not sweep.deferred_comments:
+            comment = _sweep_chunk_comment(
+                chunk, comment_start, comment_end, finder, syntax
+            )
+        if comment is None:
+            sweep.deferred_comments.append(
+                (offset + comment_start, offset + comment_end)
+            )
+        else:
+            sweep.result.comments.append(_offset_comment_target(comment, offset))
+        comment_start = chunk.find(syntax.comment_opener, comment_end)
+
+    return sweep
+
+
+# pylint: disable-next=invalid-name
+def MergeChunkSweeps(script: ScriptBuffer, sweeps: Iterable[ChunkSweep]) -> ScanResult:
+    """Combines the SweepChunk results of a script's chunks, in order.
+
+    Args:
+        script: The whole script the chunks were split from.
+        sweeps: SweepChunk results for every chunk from YieldSweepChunks.
+
+    Returns:
+        The same ScanResult as SweepScript(script).
+
+    Raises:
+        NoIdentifierFoundError: If a comment block has no target identifier.
+    """
+    syntax = _get_syntax(script)
+    result = ScanResult()
+    finder = _TargetFinder(script, syntax)
+    for sweep in sweeps:
+        result.provides.extend(sweep.result.provides)
+        result.requires.extend(sweep.result.requires)
+        for call_start in sweep.deferred_calls:
+            _scan_namespace_call(script, call_start, result, syntax)
+
+        result.comments.extend(sweep.result.comments)
+        for comment_start, comment_end in sweep.deferred_comments:
+            result.comments.append(
+                _scan_comment_target(script, comment_start, comment_end, finder, syntax)
+            )
+
+    return result
+
+
 # pylint: disable-next=invalid-name
 def ExtractDocumentedSymbols(
     script: str,
@@ -60,18 +595,20 @@ def ExtractDocumentedSymbols(
     Raises:
         NoIdentifierFoundError: If a comment block has no target identifier.
     """
+    finder = _TargetFinder(script)
     for comment_match in FindJsDocComments(script):
         identifier_match = None
 
-        if re.search(r"@fileoverview\b", comment_match.group()):
+        if _FILEOVERVIEW_REGEX.search(script, *comment_match.span()):
             # This is a file overview comment.
             pass
 
         else:
-            identifier_match = FindCommentTarget(script, comment_match.end())
+            identifier_match = finder.find(comment_match.end())
             if not identifier_match:
                 raise NoIdentifierFoundError(
-                    "Found no identifier for comment: " + comment_match.group()
+                    "Found no identifier for comment: " + comment_match.group(),
+                    comment_match.start(),
                 )
 
         yield comment_match, identifier_match
@@ -84,10 +621,19 @@ def FindJsDocComments(script: str) -> Iterator[Match[str]]:
     Args:
         script: JavaScript source code text.
 
-    Returns:
-        An iterator of regex Match objects for JSDoc comments.
+    Yields:
+        Regex Match objects for JSDoc comments.
     """
-    return re.finditer(r"/\*\*.*?\*/", script, re.DOTALL)
+    start = script.find("/**")
+    while start != -1:
+        if script.find("*/", start + 3) == -1:
+            # No later opener can be terminated either.
+            return
+
+        comment_match = _JSDOC_COMMENT_REGEX.match(script, start)
+        assert comment_match
+        yield comment_match
+        start = script.find("/**", comment_match.end())
 
 
 # pylint: disable-next=invalid-name
@@ -103,8 +649,7 @@ def FindCommentTarget(script: str, pos: int = 0) -> Match[str] | None:
     """
     # Find an opening parenthesis or an identifier.
     # \w and $ should cover all valid identifiers.
-    identifier_regex = re.compile(r"\(|(?:[$\w]+\s*\.\s*)*[$\w]+")
-    return identifier_regex.search(script, pos=pos)
+    return _TargetFinder(script).find(pos)
 
 
 # pylint: disable-next=invalid-name
@@ -150,3 +695,52 @@ def ExtractTextFromJsDocComment(comment: str) -> str:
             output_lines.append(line)
 
     return "".join(output_lines)
+
+
+# Line breaks other than "\n", which str.splitlines also splits on.
+_OTHER_LINE_BREAK_REGEX = re.compile(f"[{_LINE_BREAKS[1:]}]")
+
+# A flag preceded by whitespace, or directly by what may be a line's "*" gutter.
+_RAW_FLAG_REGEX = re.compile(r"(?:[^\S\n]|(?P<gutter>\*))(?P<flag>@\w++)")
+_LINE_GUTTER_REGEX = re.compile(r"[^\S\n]*+\*")
+_LINE_INDENT_REGEX = re.compile(r"[^\S\n]*+")
+
+
+def _is_in_gutter_line(script: str, body_start: int, flag_match: Match[str]) -> bool:
+    line_start = script.rfind("\n", body_start, flag_match.start()) + 1
+    if not line_start:
+        line_start = body_start
+
+    if flag_match.group("gutter"):
+        # The "*" must be the first character on the line that is not space.
+        return bool(
+            _LINE_INDENT_REGEX.fullmatch(script, line_start, flag_match.start())
+        )
+    return bool(_LINE_GUTTER_REGEX.match(script, line_start, flag_match.start()))
+
+
+# pylint: disable-next=invalid-name
+def YieldJsDocFlagNames(script: str, start: int, end: int) -> Iterator[str]:
+    """Yields the flag names of a raw JSDoc comment without extracting its text.
+
+    Finds the same flags, in the same order, as jsdoc.YieldFlagNames finds in
+    the comment's ExtractTextFromJsDocComment text. Only lines with a "*"
+    gutter are part of that text.
+
+    Args:
+        script: Script containing the comment.
+        start: Index of the comment's "/**" in script.
+        end: Index just past the comment's "*/" in script.
+
+    Yields:
+        Flag names such as '@param'.
+    """
+    if _OTHER_LINE_BREAK_REGEX.search(script, start, end):
+        # Lines are split on more than "\n" here; extract the text instead.
+        yield from jsdoc.YieldFlagNames(ExtractTextFromJsDocComment(script[start:end]))
+        return
+
+    body_start = start + 3
+    for flag_match in _RAW_FLAG_REGEX.finditer(script, body_start, end - 2):
+        if _is_in_gutter_line(script, body_start, flag_match):
+            yield flag_match.group("flag")
@@ -0,0 +1,65 @@
+"""Worker pools that scan files in parallel."""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+from dataclasses import dataclass
+
+from . import scanworker
+
+
+# pylint: disable-next=invalid-name
+def GetDefaultExecutor() -> str:
+    """Returns the executor that scans in parallel on this interpreter."""
+    # Threads only scan in parallel on free-threaded builds.
+    # pylint: disable-next=protected-access
+    return "process" if sys._is_gil_enabled() else "thread"
+
+
+# pylint: disable-next=invalid-name
+def GetJobs(jobs: int | None) -> int:
+    """Returns the number of workers to use, by default one per CPU."""
+    return jobs or os.cpu_count() or 1
+
+
+@dataclass
+class PoolConfig:
+    """How scan pools are made.
+
+    Attributes:
+        executor: "serial", "thread" or "process".
+        max_tasks_per_child: Batches after which a process worker is replaced.
+        start_method: multiprocessing start method of process workers, or None
+            for the platform default.
+        pool: A running pool to use rather than making one. It is left
+            running, e.g. for a daemon's next build.
+    """
+
+    executor: str = "process"
+    max_tasks_per_child: int | None = None
+    start_method: str | None = None
+    pool: multiprocessing.pool.Pool | None = None
+
+    def make_pool(
+        self, jobs: int
+    ) -> contextlib.AbstractContextManager[multiprocessing.pool.Pool]:
+        """Makes a pool of the given number of workers, to use in a with block."""
+        if self.pool is not None:
+            return contextlib.nullcontext(self.pool)
+
+        if self.executor == "thread":
+            # Scan inputs are shared with the threads rather than pickled.
+            # Threads share the parent's memory, so there are no workers to
+            # recycle.
+            return multiprocessing.pool.ThreadPool(jobs)
+
+        context = multiprocessing.get_context(self.start_method)
+        if context.get_start_method() == "forkserver":
+            # The server imports the scan modules once; every worker forked
+            # from it starts with them loaded.
+            context.set_forkserver_preload(scanworker.PRELOAD_MODULES)
+        return context.Pool(jobs, maxtasksperchild=self.max_tasks_per_child)
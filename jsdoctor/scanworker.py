@@ -0,0 +1,244 @@
+"""Scan functions run in scan pool workers.
+
+Workers unpickle tasks by importing the module their function lives in. This
+module imports only what scanning needs, so workers started by forkserver or
+spawn do not import generator, html5lib or the command-line interface.
+"""
+
+from __future__ import annotations
+
+import time
+from multiprocessing.pool import Pool
+
+from . import corpus, scancache, scanner, source
+
+# (path, content, delimiters from a batch index). Content is None for files
+# that the worker reads itself.
+ScanItem = tuple[str, str | None, corpus.FileDelimiters | None]
+
+# (path, record, seconds spent scanning, whether the record was cached)
+TimedRecord = tuple[str, source.SourceRecord, float, bool]
+
+# Modules for a forkserver to import once, before forking workers.
+PRELOAD_MODULES = [__name__]
+
+
+class CheckError(Exception):
+    """Exception raised when a file's documentation would not build.
+
+    Attributes:
+        message: Description of the problem.
+        path: Path of the file.
+        offset: Index in the file where the problem was found, if known. It
+            counts characters, or bytes when the file was memory-mapped, as
+            with --mmap, or is not valid UTF-8; the two differ in files that
+            are not ASCII.
+    """
+
+    def __init__(self, message: str, path: str, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.path = path
+        self.offset = offset
+
+    def __reduce__(self) -> tuple:
+        # Keeps the path and offset when raised in a pool worker.
+        return type(self), (self.message, self.path, self.offset)
+
+    def __str__(self) -> str:
+        location = self.path if self.offset is None else f"{self.path}:{self.offset}"
+        return f"{location}: {self.message}"
+
+
+# pylint: disable-next=invalid-name
+def ReadAndScan(path: str, use_mmap: bool, pool: Pool | None = None) -> source.Source:
+    """Reads and scans a file.
+
+    Args:
+        path: Path of the file.
+        use_mmap: Whether to memory-map the file and scan its bytes.
+        pool: Optional worker pool used to scan very large files.
+
+    Returns:
+        The scanned Source.
+    """
+    if use_mmap:
+        return source.ScanFile(path, pool)
+
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    return source.ScanScript(content, path, pool)
+
+
+def _scan_script(
+    script: scanner.ScriptBuffer,
+    path: str,
+    delimiters: corpus.FileDelimiters | None,
+    pool: Pool | None = None,
+) -> source.Source:
+    scan_result = None if delimiters is None else delimiters.sweep(script)
+    return source.ScanScript(script, path, pool, scan_result)
+
+
+def _scan(
+    scan_item: ScanItem, use_mmap: bool, pool: Pool | None = None
+) -> source.Source:
+    path, content, delimiters = scan_item
+    if content is None:
+        return ReadAndScan(path, use_mmap, pool)
+    return _scan_script(content, path, delimiters, pool)
+
+
+# pylint: disable-next=invalid-name
+def ScanContent(scan_item: ScanItem, use_mmap: bool = False) -> source.SourceRecord:
+    """Scans one file, reading it first if its content is not given.
+
+    Args:
+        scan_item: The file to scan.
+        use_mmap: Whether to memory-map files that are read here.
+
+    Returns:
+        The file's scan record.
+    """
+    # The script is not sent back to the parent.
+    return source.MakeSourceRecord(_scan(scan_item, use_mmap))
+
+
+# pylint: disable-next=invalid-name
+def ScanCachedContent(
+    scan_item: ScanItem,
+    use_mmap: bool,
+    cache: scancache.ScanCache | None,
+    pool: Pool | None = None,
+) -> tuple[source.SourceRecord, bool]:
+    """Loads one file's record from a scan cache, or scans and caches it.
+
+    Args:
+        scan_item: The file to scan.
+        use_mmap: Whether to scan the bytes of files that are read here. With
+            a cache, whose keys need every byte, ASCII files are read rather
+            than mapped.
+        cache: Optional scan cache. Without one, the file is just scanned.
+        pool: Optional worker pool used to scan very large files.
+
+    Returns:
+        The file's scan record, and whether it was loaded from the cache.
+    """
+    if cache is None:
+        return source.MakeSourceRecord(_scan(scan_item, use_mmap, pool)), False
+
+    path, content, delimiters = scan_item
+    if content is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        data = content.encode("utf-8")
+
+    key = cache.get_key(data)
+    record = cache.load(key, path)
+    if record is not None:
+        return record, True
+
+    script: scanner.ScriptBuffer
+    if content is not None:
+        script = content
+    elif use_mmap and data.isascii():
+        script = data
+    else:
+        script = data.decode("utf-8")
+
+    record = source.MakeSourceRecord(_scan_script(script, path, delimiters, pool))
+    cache.store(key, record)
+    return record, False
+
+
+# pylint: disable-next=invalid-name
+def ScanBatch(
+    batch: list[ScanItem],
+    use_mmap: bool,
+    cache: scancache.ScanCache | None = None,
+) -> list[TimedRecord]:
+    """Scans a batch of files, timing each.
+
+    Args:
+        batch: The files to scan.
+        use_mmap: Whether to memory-map files that are read here.
+        cache: Optional scan cache to load records from and store them in.
+
+    Returns:
+        The scan record of each file, with its path, scan time and whether it
+        was loaded from the cache.
+    """
+    timed_records = []
+    for scan_item in batch:
+        start = time.perf_counter()
+        record, from_cache = ScanCachedContent(scan_item, use_mmap, cache)
+        timed_records.append(
+            (scan_item[0], record, time.perf_counter() - start, from_cache)
+        )
+    return timed_records
+
+
+def _check_flags(path: str, scanned_source: source.Source) -> None:
+    # Rendering asserts or raises for these; report them as check errors.
+    for symbol in scanned_source.symbols:
+        comment = symbol.comment
+        if comment is None:
+            continue
+
+        if "\r" in comment.text:
+            raise CheckError(
+                "Comments with carriage returns are not supported", path, comment.start
+            )
+
+        for flag in comment.flags:
+            if (flag.name == "@param" and flag.param is None) or (
+                flag.name == "@return" and flag.returns is None
+            ):
+                raise CheckError(
+                    f"Could not parse {flag.name} description: {flag.text}",
+                    path,
+                    comment.start,
+                )
+
+        if len(comment.get_flags("@return")) > 1:
+            raise CheckError("More than 1 @return flag", path, comment.start)
+
+
+# pylint: disable-next=invalid-name
+def CheckContent(scan_item: ScanItem, use_mmap: bool = False) -> None:
+    """Checks that one file scans and that its flags parse.
+
+    Args:
+        scan_item: The file to check.
+        use_mmap: Whether to memory-map files that are read here.
+
+    Raises:
+        CheckError: If the file's documentation would not build.
+    """
+    path = scan_item[0]
+    try:
+        scanned_source = _scan(scan_item, use_mmap)
+    except (scanner.NoIdentifierFoundError, source.NamespaceNotFoundError) as error:
+        raise CheckError(str(error), path, error.offset) from error
+    except UnicodeDecodeError as error:
+        raise CheckError(str(error), path, error.start) from error
+    except OSError as error:
+        raise CheckError(str(error), path) from error
+
+    _check_flags(path, scanned_source)
+
+
+# pylint: disable-next=invalid-name
+def CheckBatch(batch: list[ScanItem], use_mmap: bool) -> None:
+    """Checks a batch of files, stopping at the first problem.
+
+    Args:
+        batch: The files to check.
+        use_mmap: Whether to memory-map files that are read here.
+
+    Raises:
+        CheckError: If a file's documentation would not build.
+    """
+    for scan_item in batch:
+        CheckContent(scan_item, use_mmap)
@@ -0,0 +1,141 @@
+"""Cost-ordered scheduling of scan work across a worker pool.
+
+File sizes in a source tree are heavily skewed. Handing files out in path
+order can leave one huge file running on a single core at the end of the scan
+while every other core sits idle. Work is instead ordered by estimated cost,
+largest first, and grouped into batches of about equal cost so that small
+files still travel together.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+
+# pylint: disable-next=invalid-name
+def EstimateCosts(
+    paths: Sequence[str], sizes: Sequence[int], recorded_costs: Mapping[str, float]
+) -> list[float]:
+    """Estimates the scan cost of each path, in seconds.
+
+    Recorded costs, e.g. from a previous build, are used where available.
+    Other paths are estimated from their size at the mean rate of the recorded
+    paths, or by their size alone if nothing is recorded.
+
+    Args:
+        paths: Paths to estimate.
+        sizes: Size of each path, in characters or bytes.
+        recorded_costs: Measured scan costs, in seconds, by path.
+
+    Returns:
+        The estimated cost of each path.
+    """
+    recorded_seconds = 0.0
+    recorded_size = 0
+    for path, size in zip(paths, sizes, strict=True):
+        if path in recorded_costs:
+            recorded_seconds += recorded_costs[path]
+            recorded_size += size
+
+    seconds_per_size = recorded_seconds / recorded_size if recorded_size else 1.0
+    return [
+        recorded_costs.get(path, size * seconds_per_size)
+        for path, size in zip(paths, sizes, strict=True)
+    ]
+
+
+# pylint: disable-next=invalid-name
+def MakeBatches(costs: Sequence[float], batch_count: int) -> list[list[int]]:
+    """Groups work into batches of about equal cost, most costly first.
+
+    Any item costing at least a batch's share is a batch of its own.
+
+    Args:
+        costs: Estimated cost of each item.
+        batch_count: Target number of batches.
+
+    Returns:
+        Batches of item indices. Batches are in descending order of cost, as
+        are the items in each batch.
+    """
+    order = sorted(range(len(costs)), key=lambda index: costs[index], reverse=True)
+    budget = sum(costs) / max(1, batch_count)
+
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    batch_cost = 0.0
+    for index in order:
+        batch.append(index)
+        batch_cost += costs[index]
+        if batch_cost >= budget:
+            batches.append(batch)
+            batch = []
+            batch_cost = 0.0
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+@dataclass
+class ScanTiming:
+    """Timing of a scan across a worker pool.
+
+    Attributes:
+        jobs: Number of workers.
+        wall_seconds: Elapsed time of the whole scan.
+        costs: Measured scan time of each path scanned, in seconds. Paths
+            loaded from a scan cache are left out.
+    """
+
+    jobs: int
+    wall_seconds: float
+    costs: dict[str, float]
+
+    @property
+    def lost_seconds(self) -> float:
+        """Wall time beyond a perfect split of the work across the workers."""
+        return max(0.0, self.wall_seconds - sum(self.costs.values()) / self.jobs)
+
+    def get_slowest(self) -> tuple[str, float] | None:
+        """Returns the slowest path and its scan time, if anything was scanned."""
+        if not self.costs:
+            return None
+        return max(self.costs.items(), key=lambda item: item[1])
+
+
+# pylint: disable-next=invalid-name
+def ReadCosts(path: str) -> dict[str, float]:
+    """Reads costs recorded by WriteCosts, or nothing if path does not exist."""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# pylint: disable-next=invalid-name
+def WriteCosts(path: str, costs: Mapping[str, float]) -> None:
+    """Records measured scan costs, by path, for the next build to schedule by.
+
+    Costs of paths that no longer exist are dropped. The costs are written
+    aside and renamed into place, so an interrupted build leaves the previous
+    costs whole.
+
+    Args:
+        path: Path of the costs file.
+        costs: Measured scan costs, in seconds, by path.
+    """
+    existing_costs = {
+        cost_path: cost
+        for cost_path, cost in costs.items()
+        if os.path.exists(cost_path)
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(existing_costs, f, indent=0, sort_keys=True)
+    os.replace(temp_path, path)
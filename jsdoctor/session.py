@@ -0,0 +1,264 @@
+"""Warm build state for embedding jsdoctor in a long-running process."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import threading
+from collections.abc import Iterable, Mapping
+from types import TracebackType
+
+from . import (
+    manifest,
+    scancache,
+    scanner,
+    scanpool,
+    scanworker,
+    source,
+    symbolindex,
+)
+
+# Errors of one file that a batch reports after adding the others.
+_SCAN_ERRORS = (
+    scanner.NoIdentifierFoundError,
+    source.NamespaceNotFoundError,
+    OSError,
+    UnicodeDecodeError,
+)
+
+
+def _copy_symbol(symbol: source.SymbolView) -> source.Symbol:
+    # A copy keeps the comment that a later update would release from the row.
+    return source.Symbol(
+        symbol.identifier,
+        symbol.start,
+        symbol.end,
+        comment=symbol.comment,
+        namespace=symbol.namespace,
+        property=symbol.property,
+        type=symbol.type,
+        static=symbol.static,
+        path_id=symbol.path_id,
+    )
+
+
+def _scan_path(
+    path: str, cache: scancache.ScanCache | None
+) -> source.SourceRecord | Exception:
+    # Errors are returned, so that one file does not stop a batch.
+    try:
+        record, _ = scanworker.ScanCachedContent((path, None, None), False, cache)
+    except _SCAN_ERRORS as error:
+        return error
+    return record
+
+
+class Session:
+    """Scans files and renders their pages, keeping warm state across builds.
+
+    A session owns a scan pool, an optional on-disk scan cache, the index of
+    symbols by identifier and namespace, and the pages it has rendered. Files
+    are added, rescanned and removed one at a time or in batches, and pages
+    are rendered again only when their inputs changed.
+
+    Sessions are thread-safe. Files are scanned and pages rendered outside the
+    session's lock, so several requests may do so at once. When one file is
+    changed by several requests at once, the change started last wins.
+
+    Usage:
+
+        with jsdoctor.Session() as session:
+            session.add_or_update("goog/array/array.js")
+            pages = session.render(["goog.array"])
+    """
+
+    def __init__(
+        self,
+        jobs: int | None = None,
+        executor: str | None = None,
+        start_method: str | None = None,
+        cache_dir: str | None = None,
+        cache_max_bytes: int = 1 << 30,
+    ) -> None:
+        """Starts a session.
+
+        Args:
+            jobs: Number of scan workers. Defaults to the number of CPUs.
+            executor: "serial", "thread" or "process". Defaults to "thread"
+                when the GIL is disabled, else "process". Workers split very
+                large files between them.
+            start_method: multiprocessing start method of process workers, or
+                None for the platform default.
+            cache_dir: Optional directory of cached scan records.
+            cache_max_bytes: Size cap of cache_dir, applied on close.
+        """
+        if executor is None:
+            executor = scanpool.GetDefaultExecutor()
+
+        self._exit_stack = contextlib.ExitStack()
+        self._pool = None
+        if executor != "serial":
+            pool_config = scanpool.PoolConfig(executor, start_method=start_method)
+            self._pool = self._exit_stack.enter_context(
+                pool_config.make_pool(scanpool.GetJobs(jobs))
+            )
+
+        self._cache = None
+        if cache_dir is not None:
+            self._cache = scancache.MakeScanCache(cache_dir, cache_max_bytes)
+
+        self._generator_version = manifest.GetGeneratorVersion()
+        self._lock = threading.Lock()
+        self._index = symbolindex.SymbolIndex()
+        # Each change gets a generation; a file keeps its latest change's.
+        self._next_generation = 0
+        self._generations: dict[str, int] = {}
+        # Rendered page filename and content by namespace, with the page hash.
+        self._page_cache: dict[str, tuple[str, str, bytes]] = {}
+
+    def __enter__(self) -> Session:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the scan pool and evicts from the scan cache."""
+        self._exit_stack.close()
+        if self._cache is not None:
+            self._cache.evict()
+
+    def _start_change(self) -> int:
+        with self._lock:
+            generation = self._next_generation
+            self._next_generation += 1
+            return generation
+
+    def _apply_changes(
+        self, changes: Mapping[str, tuple[source.SourceRecord | None, int]]
+    ) -> None:
+        with self._lock:
+            records = {}
+            for path, (record, generation) in changes.items():
+                if self._generations.get(path, -1) > generation:
+                    # Superseded by a change that started later but finished
+                    # first.
+                    continue
+                self._generations[path] = generation
+
+                if record is not None or path in self._index:
+                    records[path] = record
+
+            for namespace in self._index.update(records):
+                if namespace not in self._index.namespace_map:
+                    self._page_cache.pop(namespace, None)
+
+    def add_or_update(self, path: str, content: str | None = None) -> None:
+        """Scans a file, adding its symbols or replacing its previous ones.
+
+        Args:
+            path: Path of the file.
+            content: The file's content, or None to read it from path.
+
+        Raises:
+            scanner.NoIdentifierFoundError: If the file does not scan. Its
+                previous symbols, if any, are kept.
+            source.NamespaceNotFoundError: Likewise.
+        """
+        generation = self._start_change()
+        record, _ = scanworker.ScanCachedContent(
+            (path, content, None), False, self._cache, self._pool
+        )
+        self._apply_changes({path: (record, generation)})
+
+    def add_or_update_many(self, paths: Iterable[str]) -> None:
+        """Scans files across the session's scan pool, as add_or_update does.
+
+        The files are added in order, in one update of the index.
+
+        Args:
+            paths: Paths of the files.
+
+        Raises:
+            scanner.NoIdentifierFoundError: If a file does not scan. The
+                other files are still added; the first error is raised
+                after. Files that fail keep their previous symbols, if any.
+            source.NamespaceNotFoundError: Likewise.
+            OSError: Likewise, if a file cannot be read.
+        """
+        paths = list(dict.fromkeys(paths))
+        generations = [self._start_change() for _ in paths]
+        scan = functools.partial(_scan_path, cache=self._cache)
+        if self._pool is None:
+            results = list(map(scan, paths))
+        else:
+            results = self._pool.map(scan, paths)
+
+        changes = {}
+        errors = []
+        for path, result, generation in zip(paths, results, generations, strict=True):
+            if isinstance(result, Exception):
+                errors.append(result)
+            else:
+                changes[path] = (result, generation)
+        self._apply_changes(changes)
+
+        if errors:
+            raise errors[0]
+
+    def remove(self, path: str) -> None:
+        """Removes a file's symbols, if it was added.
+
+        Args:
+            path: Path of the file.
+        """
+        self._apply_changes({path: (None, self._start_change())})
+
+    def render(self, namespaces: Iterable[str] | None = None) -> dict[str, bytes]:
+        """Renders namespace pages, reusing pages whose inputs did not change.
+
+        Args:
+            namespaces: Namespaces to render, or None for every namespace.
+
+        Returns:
+            HTML bytes by page filename.
+
+        Raises:
+            KeyError: If a namespace has no symbols.
+        """
+        # generator imports html5lib, which scanning never needs.
+        from . import generator  # pylint: disable=import-outside-toplevel
+
+        with self._lock:
+            namespace_map = self._index.namespace_map
+            if namespaces is None:
+                namespaces = list(namespace_map)
+            snapshot = {
+                namespace: [_copy_symbol(symbol) for symbol in namespace_map[namespace]]
+                for namespace in namespaces
+            }
+
+        pages = {}
+        for namespace, symbols in snapshot.items():
+            page_hash = manifest.GetPageHash(
+                namespace, symbols, self._generator_version
+            )
+            with self._lock:
+                cached_page = self._page_cache.get(namespace)
+
+            if cached_page is not None and cached_page[0] == page_hash:
+                _, filename, content = cached_page
+            else:
+                ((filename, content),) = generator.GenerateHtmlDocs(
+                    {namespace: symbols}
+                )
+                with self._lock:
+                    self._page_cache[namespace] = (page_hash, filename, content)
+
+            pages[filename] = content
+        return pages
@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+import functools
 import logging
+import mmap
+import os
 import re
+import sys
 from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
+from multiprocessing.pool import Pool
+from typing import Protocol
 
 from . import flags, jsdoc, namespace, scanner, symboltypes
 
@@ -15,7 +21,8 @@ class Source:
     """Represents a parsed JavaScript source file and its extracted symbols.
 
     Attributes:
-        script: Raw JavaScript source code text.
+        script: Raw JavaScript source code text, or None if the source was
+            scanned from a buffer without decoding it.
         path: Optional file path to the source file.
         provides: Set of provided namespace strings.
         requires: Set of required namespace strings.
@@ -23,7 +30,7 @@ class Source:
         filecomment: Optional top-level file JSDoc comment.
     """
 
-    script: str
+    script: str | None
     path: str | None = None
     provides: set[str] = field(default_factory=set)
     requires: set[str] = field(default_factory=set)
@@ -53,6 +60,8 @@ class Symbol:
         property: Optional property name.
         type: Optional symbol classification type.
         static: Optional flag indicating if symbol is static.
+        path_id: Optional index of the symbol's path among the scanned paths,
+            for symbols rebuilt from a SourceRecord without their Source.
     """
 
     identifier: str
@@ -64,6 +73,7 @@ class Symbol:
     property: str | None = None
     type: str | None = None
     static: bool | None = None
+    path_id: int | None = None
 
     def __str__(self) -> str:
         symbol_string = super().__str__()
@@ -76,28 +86,192 @@ class Symbol:
         return symbol_string
 
 
-@dataclass(eq=False)
+class SymbolView(Protocol):
+    """The attributes of a symbol that indexing and rendering read.
+
+    Symbol has them, and so do symboltable.SymbolRow views of table rows.
+    """
+
+    @property
+    def identifier(self) -> str: ...
+
+    @property
+    def start(self) -> int: ...
+
+    @property
+    def end(self) -> int: ...
+
+    @property
+    def source(self) -> Source | None: ...
+
+    @property
+    def comment(self) -> Comment | None: ...
+
+    @property
+    def namespace(self) -> str | None: ...
+
+    @property
+    def type(self) -> str | None: ...
+
+    @property
+    def static(self) -> bool | None: ...
+
+    @property
+    def path_id(self) -> int | None: ...
+
+    # Last, as it hides the builtin in the class body.
+    @property
+    def property(self) -> str | None: ...
+
+
+def _get_flag_mask(flag_names: Iterable[str]) -> int:
+    flag_names = set(flag_names)
+    for flag_name in flag_names:
+        assert flag_name in flags.ALL_FLAGS, f"Unrecognized flag: {flag_name}"
+    return flags.GetFlagMask(flag_names)
+
+
+@dataclass(eq=False, init=False)
 class Comment:
-    """Represents a parsed JSDoc comment block with description and flags.
+    """Represents a JSDoc comment block with description and flags.
+
+    A comment is made from its text, or from the span of its raw block in the
+    script it was scanned from. Nothing is copied out of the script then: the
+    block is only stripped into text, and the text only parsed into flags and
+    description sections, when they are first read. flag_mask is found from
+    the raw block, so symbols can be classified without either.
 
     Attributes:
-        text: Raw JSDoc comment block text.
         start: Starting character index of comment in source.
         end: Ending character index of comment in source.
-        flags: List of parsed Flag objects.
-        description_sections: List of parsed description text sections.
+        script: Script containing the raw JSDoc comment block, or None if the
+            comment was made from its text.
+        script_offset: Index in source of the first character of script, if
+            script is only part of the source.
+        flag_mask: flags.GetFlagMask bitmask of the comment's flag names.
     """
 
-    text: str
     start: int
     end: int
-    flags: list[Flag] = field(default_factory=list, init=False)
-    description_sections: list[str] = field(default_factory=list, init=False)
+    script: str | None = field(default=None, repr=False)
+    script_offset: int = field(default=0, repr=False)
+    flag_mask: int = 0
+
+    def __init__(
+        self,
+        text: str | None,
+        start: int,
+        end: int,
+        *,
+        script: str | None = None,
+        script_offset: int = 0,
+        flag_mask: int | None = None,
+    ) -> None:
+        """Makes a comment from its text or from its span in a script.
+
+        Args:
+            text: Comment block text, without the comment markers and gutters,
+                or None to read the block from script.
+            start: Starting character index of comment in source.
+            end: Ending character index of comment in source.
+            script: Script containing the raw block, if text is None.
+            script_offset: Index in source of the first character of script.
+            flag_mask: The comment's flag_mask, if already known, e.g. from a
+                stored record. Found from the comment if None.
+        """
+        self.start = start
+        self.end = end
+        self.script = script
+        self.script_offset = script_offset
+        if text is not None:
+            self.text = text
+
+        if flag_mask is not None:
+            self.flag_mask = flag_mask
+        elif text is not None:
+            self.flag_mask = _get_flag_mask(jsdoc.YieldFlagNames(text))
+        else:
+            assert script is not None, "A comment needs its text or its script."
+            self.flag_mask = _get_flag_mask(
+                scanner.YieldJsDocFlagNames(
+                    script, start - script_offset, end - script_offset
+                )
+            )
 
-    def __post_init__(self) -> None:
-        description_sections, parsed_flags = _get_description_and_flags(self.text)
-        self.description_sections = description_sections
-        self.flags = parsed_flags
+    def __getstate__(self) -> dict:
+        # Pickle the comment's own block rather than the whole script.
+        state = self.__dict__.copy()
+        state["script"] = self.raw
+        state["script_offset"] = self.start
+        return state
+
+    def detach(self) -> None:
+        """Copies the raw block out of the script, so as not to keep it alive.
+
+        Comments that outlive the scan of their script, such as those in a
+        SourceRecord, are detached.
+        """
+        if self.script is not None:
+            self.script = self.raw
+            self.script_offset = self.start
+
+    def parse(self) -> None:
+        """Parses the description and flags now rather than when first read.
+
+        Comments parsed in a scan worker are pickled back to the parent with
+        their parsed flags. Comments with carriage returns are left to raise
+        when they are read.
+        """
+        if "\r" not in self.text:
+            # Reading the cached property stores it.
+            _ = self._parsed
+
+    @property
+    def raw(self) -> str | None:
+        """Raw JSDoc comment block text, including "/**" and "*/", if known."""
+        if self.script is None:
+            return None
+        return self.script[
+            self.start - self.script_offset : self.end - self.script_offset
+        ]
+
+    @functools.cached_property
+    def text(self) -> str:
+        """Comment block text, without the comment markers and gutters."""
+        assert self.raw is not None
+        return scanner.ExtractTextFromJsDocComment(self.raw)
+
+    @functools.cached_property
+    def _parsed(self) -> tuple[list[str], list[Flag]]:
+        return _get_description_and_flags(self.text)
+
+    @property
+    def description_sections(self) -> list[str]:
+        """List of parsed description text sections."""
+        return self._parsed[0]
+
+    @property
+    def flags(self) -> list[Flag]:
+        """List of parsed Flag objects."""
+        return self._parsed[1]
+
+    @functools.cached_property
+    def flags_by_name(self) -> dict[str, list[Flag]]:
+        """Flags grouped by name, in comment order."""
+        flags_by_name: dict[str, list[Flag]] = {}
+        for flag in self.flags:
+            flags_by_name.setdefault(flag.name, []).append(flag)
+        return flags_by_name
+
+    def has_flag(self, flag_name: str) -> bool:
+        """Returns whether the comment has at least one flag_name flag."""
+        return bool(self.flag_mask & flags.FLAG_BITS.get(flag_name, 0))
+
+    def get_flags(self, flag_name: str) -> list[Flag]:
+        """Returns the comment's flag_name flags, in comment order."""
+        if not self.has_flag(flag_name):
+            return []
+        return self.flags_by_name.get(flag_name, [])
 
 
 @dataclass
@@ -107,13 +281,30 @@ class Flag:
     Attributes:
         name: Flag tag name (e.g. '@param', '@return').
         text: Associated text for the flag tag.
+        param: Parsed text of a @param flag, or None if it is not a @param
+            flag or its text cannot be parsed.
+        returns: Parsed text of a @return flag, or None if it is not a
+            @return flag or its text cannot be parsed.
     """
 
     name: str
     text: str
+    param: flags.Param | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
+    returns: flags.Return | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
         assert self.name in flags.ALL_FLAGS, f"Unrecognized flag: {self.name}"
+        self.name = sys.intern(self.name)
+
+        # Parsed leniently here; rendering raises for unparsable flags.
+        if self.name == "@param":
+            self.param = flags.MaybeParseParam(self.text)
+        elif self.name == "@return":
+            self.returns = flags.MaybeParseReturn(self.text)
 
 
 def _get_description_and_flags(text: str) -> tuple[list[str], list[Flag]]:
@@ -123,12 +314,14 @@ def _get_description_and_flags(text: str) -> tuple[list[str], list[Flag]]:
 
 
 def _is_symbol_part_of_provided_namespaces(
-    symbol: str, provided_namespaces: set[str]
+    symbol: str, provided_namespaces: namespace.NamespaceIndex
 ) -> bool:
-    for ns in provided_namespaces:
-        if namespace.IsSymbolPartOfNamespace(symbol, ns):
-            return True
-    return False
+    return provided_namespaces.is_symbol_part_of_namespaces(symbol)
+
+
+def _is_ignorable_next_character(next_character: str | None) -> bool:
+    # A method call or a bracket-notation property access.
+    return next_character in ["(", "["]
 
 
 def _is_ignorable_identifier(identifier_match: re.Match) -> bool:
@@ -136,16 +329,25 @@ def _is_ignorable_identifier(identifier_match: re.Match) -> bool:
     regex = re.compile(r"[\S]")
     match = regex.search(identifier_match.string, pos=identifier_match.end())
     if match:
-        first_character = match.group()
-        if first_character in ["(", "["]:
-            # This is a method call or a bracket-notation property access. Ignore.
-            return True
+        return _is_ignorable_next_character(match.group())
 
     return False
 
 
 class NamespaceNotFoundError(Exception):
-    """Exception raised when a symbol does not belong to any provided namespace."""
+    """Exception raised when a symbol does not belong to any provided namespace.
+
+    Attributes:
+        offset: Index of the symbol's identifier in the source, if known.
+    """
+
+    def __init__(self, message: str, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.offset = offset
+
+    def __reduce__(self) -> tuple:
+        # Keeps the offset when raised in a pool worker.
+        return type(self), (str(self), self.offset)
 
 
 # TODO(nanaze): In the future this could farm out to a formal parser like
@@ -154,11 +356,10 @@ def _yield_symbols(
     match_pairs: Iterable[tuple[re.Match[str], re.Match[str] | None]],
     provided_namespaces: set[str],
 ) -> Iterator[Symbol]:
+    namespace_index = namespace.NamespaceIndex(provided_namespaces)
     for comment_match, identifier_match in match_pairs:
         if not identifier_match:
             continue
-        comment_text = scanner.ExtractTextFromJsDocComment(comment_match.group())
-        comment = Comment(comment_text, comment_match.start(), comment_match.end())
 
         # TODO(schwehr): What was this supposed to do?
         # if not identifier_match:
@@ -171,73 +372,363 @@ def _yield_symbols(
             # Ignore.
             continue
 
-        if identifier_match.group() == "(":
-            # This comment targeted a parenthetical and can be ignored.
+        identifier = _get_documented_identifier(
+            identifier_match.group(), namespace_index
+        )
+        if identifier is None:
             continue
 
-        # TODO(nanaze): Identify scoped variables and expand identifiers.
-        identifier = scanner.StripWhitespace(identifier_match.group())
+        comment = Comment(
+            None,
+            comment_match.start(),
+            comment_match.end(),
+            script=comment_match.string,
+        )
+        yield _make_symbol(
+            comment,
+            identifier,
+            identifier_match.start(),
+            identifier_match.end(),
+            namespace_index,
+        )
 
-        # TODO(nanaze): catch this. properties, make sure not static
-        if identifier.startswith("this."):
-            logging.info(
-                'Skipping identifier. Ignoring "this." properties for now. %s',
-                identifier,
-            )
+
+def _make_comment(
+    script: scanner.ScriptBuffer, start: int, end: int, script_offset: int
+) -> Comment:
+    if isinstance(script, str):
+        return Comment(None, start, end, script=script, script_offset=script_offset)
+
+    # Byte buffers may be unmapped once scanned, so their comments are copied.
+    raw = script[start - script_offset : end - script_offset].decode("utf-8")
+    return Comment(None, start, end, script=raw, script_offset=start)
+
+
+def _yield_scanned_symbols(
+    script: scanner.ScriptBuffer,
+    comment_targets: Iterable[scanner.CommentTarget],
+    provided_namespaces: namespace.NamespaceIndex,
+    script_offset: int = 0,
+) -> Iterator[Symbol]:
+    # script may be a slice of the full script starting at script_offset. Target
+    # offsets, and the offsets recorded on symbols, are always absolute.
+    for target in comment_targets:
+        if target.target is None:
             continue
 
-        # Ignore symbols that are not part of the provided namespace.
-        if not _is_symbol_part_of_provided_namespaces(identifier, provided_namespaces):
-            logging.info(
-                "Skipping identifier. Not part of provided namespace. %s",
-                identifier,
-            )
+        if _is_ignorable_next_character(target.next_char):
+            # This is JsDoc on a method call, most likely a type cast of a return value.
+            # Ignore.
+            continue
+
+        identifier = _get_documented_identifier(target.target, provided_namespaces)
+        if identifier is None:
             continue
 
-        symbol = Symbol(identifier, identifier_match.start(), identifier_match.end())
-        symbol.comment = comment
+        comment = _make_comment(
+            script, target.comment_start, target.comment_end, script_offset
+        )
+        yield _make_symbol(
+            comment,
+            identifier,
+            target.target_start,
+            target.target_end,
+            provided_namespaces,
+        )
+
 
-        # Determine symbol type
-        symbol.type = symboltypes.DetermineSymbolType(symbol)
+def _get_documented_identifier(
+    target: str, provided_namespaces: namespace.NamespaceIndex
+) -> str | None:
+    if target == "(":
+        # This comment targeted a parenthetical and can be ignored.
+        return None
 
-        # Identify the namespace for this symbol.
-        closest_namespace = namespace.GetClosestNamespaceForSymbol(
-            identifier, provided_namespaces
+    # TODO(nanaze): Identify scoped variables and expand identifiers.
+    identifier = scanner.StripWhitespace(target)
+
+    # TODO(nanaze): catch this. properties, make sure not static
+    if identifier.startswith("this."):
+        logging.info(
+            'Skipping identifier. Ignoring "this." properties for now. %s',
+            identifier,
+        )
+        return None
+
+    # Ignore symbols that are not part of the provided namespace.
+    if not _is_symbol_part_of_provided_namespaces(identifier, provided_namespaces):
+        logging.info(
+            "Skipping identifier. Not part of provided namespace. %s",
+            identifier,
         )
+        return None
 
-        if not closest_namespace:
-            raise NamespaceNotFoundError("No namespace found " + identifier)
+    return identifier
 
-        symbol.namespace = closest_namespace
 
-        # Note the property name
-        if namespace.IsPrototypeProperty(identifier):
-            symbol.property = namespace.GetPrototypeProperty(identifier)
-            symbol.static = False
-        else:
-            symbol.static = True
+def _make_symbol(
+    comment: Comment,
+    identifier: str,
+    start: int,
+    end: int,
+    provided_namespaces: namespace.NamespaceIndex,
+) -> Symbol:
+    symbol = Symbol(identifier, start, end)
+    symbol.comment = comment
+
+    # Determine symbol type
+    symbol.type = symboltypes.DetermineSymbolType(symbol)
+
+    # Identify the namespace for this symbol.
+    closest_namespace = namespace.GetClosestNamespaceForSymbol(
+        identifier, provided_namespaces
+    )
+
+    if not closest_namespace:
+        raise NamespaceNotFoundError("No namespace found " + identifier, start)
+
+    symbol.namespace = closest_namespace
+
+    # Note the property name
+    if namespace.IsPrototypeProperty(identifier):
+        symbol.property = namespace.GetPrototypeProperty(identifier)
+        symbol.static = False
+    else:
+        symbol.static = True
+
+    return symbol
+
 
-        yield symbol
+# Scripts at least this many characters long are split across a pool, if
+# ScanScript is given one.
+PARALLEL_SCAN_THRESHOLD = 4 * 1024 * 1024
+
+# Approximate number of characters handed to each worker for a split script.
+_PARALLEL_SCAN_CHUNK_SIZE = 1024 * 1024
+
+_ScanChunk = tuple[
+    scanner.ScriptBuffer, int, list[scanner.CommentTarget], namespace.NamespaceIndex
+]
+
+
+def _get_chunk_end(chunk_targets: list[scanner.CommentTarget]) -> int:
+    last_target = chunk_targets[-1]
+    return max(last_target.comment_end, last_target.target_end)
+
+
+def _yield_scan_chunks(
+    script: scanner.ScriptBuffer,
+    comment_targets: list[scanner.CommentTarget],
+    provided_namespaces: namespace.NamespaceIndex,
+) -> Iterator[_ScanChunk]:
+    # Chunks start at comment boundaries, and each carries only the slice of
+    # the script its comments and targets cover.
+    chunk_targets: list[scanner.CommentTarget] = []
+    for target in comment_targets:
+        if target.target is None:
+            continue
+
+        chunk_targets.append(target)
+        chunk_start = chunk_targets[0].comment_start
+        if _get_chunk_end(chunk_targets) - chunk_start < _PARALLEL_SCAN_CHUNK_SIZE:
+            continue
+
+        chunk_script = script[chunk_start : _get_chunk_end(chunk_targets)]
+        yield chunk_script, chunk_start, chunk_targets, provided_namespaces
+        chunk_targets = []
+
+    if chunk_targets:
+        chunk_start = chunk_targets[0].comment_start
+        chunk_script = script[chunk_start : _get_chunk_end(chunk_targets)]
+        yield chunk_script, chunk_start, chunk_targets, provided_namespaces
+
+
+def _sweep_chunk(chunk: tuple[scanner.ScriptBuffer, int]) -> scanner.ChunkSweep:
+    return scanner.SweepChunk(*chunk)
+
+
+def _sweep_script(
+    script: scanner.ScriptBuffer, pool: Pool | None
+) -> scanner.ScanResult:
+    if not pool or len(script) < PARALLEL_SCAN_THRESHOLD:
+        return scanner.SweepScript(script)
+
+    chunks = scanner.YieldSweepChunks(script, _PARALLEL_SCAN_CHUNK_SIZE)
+    return scanner.MergeChunkSweeps(script, pool.imap(_sweep_chunk, chunks))
+
+
+def _scan_chunk(chunk: _ScanChunk) -> list[Symbol]:
+    script, script_offset, comment_targets, provided_namespaces = chunk
+    return list(
+        _yield_scanned_symbols(
+            script, comment_targets, provided_namespaces, script_offset
+        )
+    )
 
 
 # pylint: disable-next=invalid-name
-def ScanScript(script: str, path: str | None = None) -> Source:
+def ScanScript(
+    script: scanner.ScriptBuffer,
+    path: str | None = None,
+    pool: Pool | None = None,
+    scan_result: scanner.ScanResult | None = None,
+) -> Source:
     """Parses JavaScript script text and returns a populated Source instance.
 
+    Scripts of at least PARALLEL_SCAN_THRESHOLD characters are split at comment
+    boundaries, and the pieces are swept and their comments parsed on the
+    given pool. The result is the same as a serial scan.
+
     Args:
-        script: JavaScript source code text.
+        script: JavaScript source code text, or a bytes-like buffer of ASCII
+            JavaScript source. Buffers are not decoded; only the comments and
+            identifiers that become Comment and Symbol objects are.
         path: Optional file path of the source file.
+        pool: Optional worker pool used to scan very large scripts.
+        scan_result: Optional scanner result for script, e.g. from a batch scan.
+            Swept from script if not given.
 
     Returns:
         A Source instance with populated provides, requires, and symbols.
     """
-    source = Source(script, path)
-    source.provides.update(set(scanner.YieldProvides(script)))
-    source.requires.update(set(scanner.YieldRequires(script)))
+    source = Source(script if isinstance(script, str) else None, path)
+    if scan_result is None:
+        scan_result = _sweep_script(script, pool)
+    source.provides.update(scan_result.provides)
+    source.requires.update(scan_result.requires)
+
+    comment_targets = scan_result.comments
+    namespace_index = namespace.NamespaceIndex(source.provides)
+    if pool and len(script) >= PARALLEL_SCAN_THRESHOLD:
+        chunks = _yield_scan_chunks(script, comment_targets, namespace_index)
+        symbols: Iterable[Symbol] = (
+            symbol
+            for chunk_symbols in pool.imap(_scan_chunk, chunks)
+            for symbol in chunk_symbols
+        )
+    else:
+        symbols = _yield_scanned_symbols(script, comment_targets, namespace_index)
 
-    match_pairs = scanner.ExtractDocumentedSymbols(script)
-    for symbol in _yield_symbols(match_pairs, source.provides):
+    for symbol in symbols:
         symbol.source = source
         source.symbols.add(symbol)
 
     return source
+
+
+_NON_ASCII_REGEX = re.compile(rb"[^\x00-\x7f]")
+
+
+# pylint: disable-next=invalid-name
+def ScanFile(path: str, pool: Pool | None = None) -> Source:
+    """Memory-maps a JavaScript file and scans its bytes without decoding them.
+
+    Files that are not ASCII are decoded and scanned as text instead.
+
+    Args:
+        path: Path of the source file.
+        pool: Optional worker pool used to scan very large files.
+
+    Returns:
+        A Source instance with populated provides, requires, and symbols.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            # Empty files cannot be mapped.
+            return ScanScript("", path, pool)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if _NON_ASCII_REGEX.search(mapped):
+                return ScanScript(mapped[:].decode("utf-8"), path, pool)
+
+            return ScanScript(mapped, path, pool)
+
+
+# (identifier, start, end, comment, namespace, property, type, static)
+_SymbolRecord = tuple[
+    str, int, int, Comment | None, str | None, str | None, str | None, bool | None
+]
+
+
+@dataclass
+class SourceRecord:
+    """Compact scan result for a source, without its script or back-references.
+
+    This is what scan workers send back to the parent process.
+
+    Attributes:
+        path: Optional file path to the source file.
+        provides: Set of provided namespace strings.
+        requires: Set of required namespace strings.
+        symbols: One tuple of Symbol fields per symbol, without the Source.
+    """
+
+    path: str | None
+    provides: set[str]
+    requires: set[str]
+    symbols: list[_SymbolRecord]
+
+    def make_symbols(self, path_id: int) -> list[Symbol]:
+        """Rebuilds the source's symbols, referring to it by path_id."""
+        return [
+            Symbol(
+                identifier,
+                start,
+                end,
+                comment=comment,
+                namespace=symbol_namespace,
+                property=symbol_property,
+                type=symbol_type,
+                static=static,
+                path_id=path_id,
+            )
+            for (
+                identifier,
+                start,
+                end,
+                comment,
+                symbol_namespace,
+                symbol_property,
+                symbol_type,
+                static,
+            ) in self.symbols
+        ]
+
+
+# pylint: disable-next=invalid-name
+def MakeSourceRecord(source: Source) -> SourceRecord:
+    """Makes the compact SourceRecord for a scanned Source.
+
+    Args:
+        source: A scanned Source.
+
+    Returns:
+        A SourceRecord with the source's path, namespaces and symbols.
+    """
+    # Sorted so records, like scans, do not depend on set iteration order.
+    symbols = sorted(source.symbols, key=lambda symbol: symbol.start)
+    for symbol in symbols:
+        if symbol.comment is not None:
+            # Records outlive the scan, and must not keep the whole script
+            # alive. They are made in scan workers, which parse the comments
+            # so that the parent does not.
+            symbol.comment.detach()
+            symbol.comment.parse()
+    return SourceRecord(
+        source.path,
+        source.provides,
+        source.requires,
+        [
+            (
+                symbol.identifier,
+                symbol.start,
+                symbol.end,
+                symbol.comment,
+                symbol.namespace,
+                symbol.property,
+                symbol.type,
+                symbol.static,
+            )
+            for symbol in symbols
+        ],
+    )
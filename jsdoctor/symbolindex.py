@@ -0,0 +1,225 @@
+"""Indexes of the symbols to document, by identifier and by namespace.
+
+Each identifier is documented by its first symbol, in the order of the files
+that define it. A SymbolIndex keeps both maps for a changing set of files,
+patching them as files are added, rescanned and removed.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+from collections.abc import Iterable, Mapping, Sequence
+
+from . import source, symboltable
+
+_IGNORED_IDENTIFIERS = frozenset(["goog.provide", "goog.require", "goog.setTestOnly"])
+
+
+# TODO(nanaze): Make this a flag
+_DUPLICATE_SYMBOL_IS_ERROR = False
+
+
+class DuplicateSymbolError(Exception):
+    """Exception raised when a duplicate symbol identifier is encountered."""
+
+
+def _describe_symbol(symbol: source.SymbolView, paths: Sequence[str] | None) -> str:
+    # Symbols rebuilt from records refer to their file by path_id only.
+    if symbol.source is None and paths is not None and symbol.path_id is not None:
+        return f"{symbol.identifier} {paths[symbol.path_id]}"
+    return str(symbol)
+
+
+# pylint: disable-next=invalid-name
+def MakeSymbolMap(
+    symbols: Iterable[source.SymbolView], paths: Sequence[str] | None = None
+) -> dict[str, source.SymbolView]:
+    """Picks the symbol to document for each identifier.
+
+    Args:
+        symbols: Symbols in file order.
+        paths: Optional paths by path_id, to name the files of duplicate
+            symbols that have no Source.
+
+    Returns:
+        Mapping from identifier to its first symbol.
+
+    Raises:
+        DuplicateSymbolError: If duplicate identifiers are errors.
+    """
+    symbol_map: dict[str, source.SymbolView] = {}
+
+    for symbol in symbols:
+        identifier = symbol.identifier
+
+        if identifier in _IGNORED_IDENTIFIERS:
+            continue
+
+        if identifier.startswith("this."):
+            logging.info('Skipping "this" identifier %s', identifier)
+            continue
+
+        if identifier in symbol_map:
+            duplicate_symbol = symbol_map[identifier]
+            msg = (
+                "Symbol duplicated\n"
+                f"{_describe_symbol(symbol, paths)}\n"
+                f"{_describe_symbol(duplicate_symbol, paths)}"
+            )
+
+            if _DUPLICATE_SYMBOL_IS_ERROR:
+                raise DuplicateSymbolError(msg)
+
+            logging.warning(msg)
+            continue
+
+        symbol_map[identifier] = symbol
+
+    return symbol_map
+
+
+# pylint: disable-next=invalid-name
+def MakeNamespaceMap(
+    symbols: Iterable[source.SymbolView],
+) -> dict[str, set[source.SymbolView]]:
+    """Groups symbols by namespace.
+
+    Args:
+        symbols: Symbols with namespaces.
+
+    Returns:
+        Mapping from namespace string to its symbols.
+    """
+    namespace_map: dict[str, set[source.SymbolView]] = collections.defaultdict(set)
+    for symbol in symbols:
+        assert symbol.namespace is not None
+        namespace_map[symbol.namespace].add(symbol)
+    return namespace_map
+
+
+class SymbolIndex:
+    """The symbols of a changing set of files, by identifier and by namespace.
+
+    Files keep the position they were first added in, even if they are
+    removed and added again, so each identifier is documented by the same
+    symbol that a full build over the files in that order would pick.
+
+    Not thread-safe.
+
+    Attributes:
+        symbol_map: Mapping from identifier to the symbol documented for it.
+        namespace_map: Mapping from namespace string to its symbols.
+    """
+
+    def __init__(self) -> None:
+        # Replaced rows stay in the table, but without their comments, until
+        # they outnumber the live rows and the table is compacted.
+        self._table = symboltable.SymbolTable()
+        self._live_rows = 0
+        self._path_ids: dict[str, int] = {}
+        self._paths: list[str] = []
+        self._rows_by_path: dict[str, list[symboltable.SymbolRow]] = {}
+        self._rows_by_identifier: dict[str, list[symboltable.SymbolRow]] = {}
+        self.symbol_map: dict[str, source.SymbolView] = {}
+        self.namespace_map: dict[str, set[source.SymbolView]] = {}
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._rows_by_path
+
+    def update(self, records: Mapping[str, source.SourceRecord | None]) -> set[str]:
+        """Adds, replaces or removes the symbols of files.
+
+        Args:
+            records: Scan record of each added or changed file by path, in
+                file order, or None for files to remove.
+
+        Returns:
+            The namespaces whose symbols changed.
+        """
+        changed_identifiers = set()
+        replaced_rows = []
+        for path, record in records.items():
+            for row in self._rows_by_path.pop(path, []):
+                changed_identifiers.add(row.identifier)
+                self._rows_by_identifier[row.identifier].remove(row)
+                replaced_rows.append(row)
+                self._live_rows -= 1
+
+            if record is None:
+                continue
+
+            path_id = self._path_ids.get(path)
+            if path_id is None:
+                path_id = self._path_ids[path] = len(self._paths)
+                self._paths.append(path)
+            first_index = len(self._table)
+            self._table.add_record(record, path_id)
+            rows = [self._table[i] for i in range(first_index, len(self._table))]
+            self._rows_by_path[path] = rows
+            self._live_rows += len(rows)
+            for row in rows:
+                changed_identifiers.add(row.identifier)
+                self._rows_by_identifier.setdefault(row.identifier, []).append(row)
+
+        changed_namespaces = set()
+        for identifier in changed_identifiers:
+            symbol = self.symbol_map.pop(identifier, None)
+            if symbol is not None:
+                assert symbol.namespace is not None
+                changed_namespaces.add(symbol.namespace)
+                self.namespace_map[symbol.namespace].discard(symbol)
+
+        candidates = []
+        for identifier in changed_identifiers:
+            rows = self._rows_by_identifier.get(identifier)
+            if rows:
+                candidates.extend(rows)
+            else:
+                self._rows_by_identifier.pop(identifier, None)
+        candidates.sort(key=lambda row: (row.path_id, row.start))
+
+        changed_symbols = MakeSymbolMap(candidates, self._paths)
+        self.symbol_map.update(changed_symbols)
+        for symbol in changed_symbols.values():
+            assert symbol.namespace is not None
+            changed_namespaces.add(symbol.namespace)
+            self.namespace_map.setdefault(symbol.namespace, set()).add(symbol)
+
+        for namespace in changed_namespaces:
+            if not self.namespace_map[namespace]:
+                del self.namespace_map[namespace]
+
+        for row in replaced_rows:
+            self._table.release_comment(row)
+        if len(self._table) > 2 * self._live_rows:
+            self._compact()
+
+        return changed_namespaces
+
+    def _compact(self) -> None:
+        # Copies the live rows to a new table, in file order, and points the
+        # maps at the copies. Strings only the dropped rows used go too.
+        table = symboltable.SymbolTable()
+        new_rows: dict[source.SymbolView, symboltable.SymbolRow] = {}
+        for rows in self._rows_by_path.values():
+            for row in rows:
+                new_rows[row] = table[table.add(row)]
+
+        self._table = table
+        self._rows_by_path = {
+            path: [new_rows[row] for row in rows]
+            for path, rows in self._rows_by_path.items()
+        }
+        self._rows_by_identifier = {
+            identifier: [new_rows[row] for row in rows]
+            for identifier, rows in self._rows_by_identifier.items()
+        }
+        self.symbol_map = {
+            identifier: new_rows[symbol]
+            for identifier, symbol in self.symbol_map.items()
+        }
+        self.namespace_map = {
+            namespace: {new_rows[symbol] for symbol in symbols}
+            for namespace, symbols in self.namespace_map.items()
+        }
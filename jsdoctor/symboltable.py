@@ -0,0 +1,252 @@
+"""Columnar storage for the symbols of very large corpora.
+
+A SymbolTable keeps each Symbol field in its own typed array, with strings
+such as identifiers and namespaces stored once in an interned string table.
+Rows are read through SymbolRow views, which have the same attributes as
+source.Symbol and can be used wherever a source.SymbolView is expected.
+"""
+
+from __future__ import annotations
+
+import array
+import sys
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from . import source, symboltypes
+
+if TYPE_CHECKING:
+    # SymbolRow's source property hides the module in its class body.
+    from .source import Comment, Source
+
+# Code 0 is a symbol with no type.
+_SYMBOL_TYPES = (None, *symboltypes.ALL_TYPES)
+_SYMBOL_TYPE_CODES = {
+    symbol_type: code for code, symbol_type in enumerate(_SYMBOL_TYPES)
+}
+
+# Static bits for static values of None, False and True.
+_STATIC_UNKNOWN = -1
+_STATIC_VALUES = {_STATIC_UNKNOWN: None, 0: False, 1: True}
+
+# String and path IDs standing for None.
+_NO_ID = -1
+
+
+class SymbolTable:
+    """Stores symbol fields in parallel typed arrays.
+
+    Symbols are added with add or add_record and read back as SymbolRow views.
+    The table owns every field; rows do not hold copies.
+    """
+
+    def __init__(self) -> None:
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+
+        self._identifier_ids = array.array("l")
+        self._starts = array.array("q")
+        self._ends = array.array("q")
+        self._namespace_ids = array.array("l")
+        self._property_ids = array.array("l")
+        self._type_codes = array.array("b")
+        self._static_bits = array.array("b")
+        self._path_ids = array.array("l")
+        self._comments: list[source.Comment | None] = []
+
+    def __len__(self) -> int:
+        return len(self._identifier_ids)
+
+    def __getitem__(self, index: int) -> SymbolRow:
+        if not 0 <= index < len(self):
+            raise IndexError(f"Symbol index out of range: {index}")
+        return SymbolRow(self, index)
+
+    def __iter__(self) -> Iterator[SymbolRow]:
+        for index in range(len(self)):
+            yield SymbolRow(self, index)
+
+    def _intern(self, string: str | None) -> int:
+        if string is None:
+            return _NO_ID
+
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(sys.intern(string))
+            self._string_ids[string] = string_id
+        return string_id
+
+    def _get_string(self, string_id: int) -> str | None:
+        if string_id == _NO_ID:
+            return None
+        return self._strings[string_id]
+
+    # pylint: disable-next=too-many-arguments
+    def _append(
+        self,
+        identifier: str,
+        start: int,
+        end: int,
+        comment: source.Comment | None,
+        namespace: str | None,
+        symbol_property: str | None,
+        symbol_type: str | None,
+        static: bool | None,
+        path_id: int | None,
+    ) -> int:
+        self._identifier_ids.append(self._intern(identifier))
+        self._starts.append(start)
+        self._ends.append(end)
+        self._namespace_ids.append(self._intern(namespace))
+        self._property_ids.append(self._intern(symbol_property))
+        self._type_codes.append(_SYMBOL_TYPE_CODES[symbol_type])
+        self._static_bits.append(_STATIC_UNKNOWN if static is None else int(static))
+        self._path_ids.append(_NO_ID if path_id is None else path_id)
+        self._comments.append(comment)
+        return len(self) - 1
+
+    def add(self, symbol: source.SymbolView) -> int:
+        """Adds a symbol to the table.
+
+        Args:
+            symbol: Symbol to add, e.g. a row of another table. Its Source, if
+                any, is not kept.
+
+        Returns:
+            The index of the symbol's row.
+        """
+        return self._append(
+            symbol.identifier,
+            symbol.start,
+            symbol.end,
+            symbol.comment,
+            symbol.namespace,
+            symbol.property,
+            symbol.type,
+            symbol.static,
+            symbol.path_id,
+        )
+
+    def add_record(self, record: source.SourceRecord, path_id: int) -> None:
+        """Adds the symbols of a scanned source without building Symbols.
+
+        Args:
+            record: The source's scan record.
+            path_id: Index of the source's path among the scanned paths.
+        """
+        for (
+            identifier,
+            start,
+            end,
+            comment,
+            namespace,
+            symbol_property,
+            symbol_type,
+            static,
+        ) in record.symbols:
+            self._append(
+                identifier,
+                start,
+                end,
+                comment,
+                namespace,
+                symbol_property,
+                symbol_type,
+                static,
+                path_id,
+            )
+
+    def release_comment(self, row: SymbolRow) -> None:
+        """Drops a row's comment, e.g. once its documentation is written.
+
+        Args:
+            row: A row of this table. Its comment is None from now on.
+        """
+        assert row._table is self
+        self._comments[row._index] = None
+
+
+# pylint: disable-next=invalid-name
+def MakeSymbolTable(records: Iterable[source.SourceRecord]) -> SymbolTable:
+    """Makes a SymbolTable holding the symbols of scanned sources.
+
+    Args:
+        records: Scan records, in the order of the scanned paths.
+
+    Returns:
+        A SymbolTable whose rows refer to each source by its index in records.
+    """
+    table = SymbolTable()
+    for path_id, record in enumerate(records):
+        table.add_record(record, path_id)
+    return table
+
+
+class SymbolRow:
+    """A read-only view of one row of a SymbolTable.
+
+    Rows have the attributes of source.Symbol, so they are source.SymbolViews.
+    Two rows are equal if they view the same row of the same table.
+    """
+
+    __slots__ = ("_index", "_table")
+
+    def __init__(self, table: SymbolTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SymbolRow):
+            return NotImplemented
+        return self._table is other._table and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._index))
+
+    def __repr__(self) -> str:
+        return f"SymbolRow({self.identifier!r}, {self.start}, {self.end})"
+
+    @property
+    def identifier(self) -> str:
+        identifier = self._table._get_string(self._table._identifier_ids[self._index])
+        assert identifier is not None
+        return identifier
+
+    @property
+    def start(self) -> int:
+        return self._table._starts[self._index]
+
+    @property
+    def end(self) -> int:
+        return self._table._ends[self._index]
+
+    @property
+    def comment(self) -> Comment | None:
+        return self._table._comments[self._index]
+
+    @property
+    def namespace(self) -> str | None:
+        return self._table._get_string(self._table._namespace_ids[self._index])
+
+    @property
+    def type(self) -> str | None:
+        return _SYMBOL_TYPES[self._table._type_codes[self._index]]
+
+    @property
+    def static(self) -> bool | None:
+        return _STATIC_VALUES[self._table._static_bits[self._index]]
+
+    @property
+    def path_id(self) -> int | None:
+        path_id = self._table._path_ids[self._index]
+        return None if path_id == _NO_ID else path_id
+
+    @property
+    def source(self) -> Source | None:
+        # Tables only refer to sources by path_id.
+        return None
+
+    @property
+    def property(self) -> str | None:
+        return self._table._get_string(self._table._property_ids[self._index])
@@ -13,13 +13,12 @@ ENUM = "enum"
 FUNCTION = "function"
 PROPERTY = "property"
 
+ALL_TYPES = (CONSTRUCTOR, INTERFACE, ENUM, FUNCTION, PROPERTY)
+
 
 def _comment_has_flag(comment: source.Comment, flag_name: str) -> bool:
     assert flag_name.startswith("@"), "flag name should start with @"
-    for flag in comment.flags:
-        if flag.name == flag_name:
-            return True
-    return False
+    return comment.has_flag(flag_name)
 
 
 # pylint: disable-next=invalid-name
@@ -0,0 +1,247 @@
+"""Compact binary encoding of scan records.
+
+Scan records are encoded in a fixed binary layout, which is decoded with
+struct rather than unpickling millions of small objects. The scan cache
+stores records this way.
+
+A result block is laid out as:
+
+    header    _HEADER
+    records   _RECORD per source
+    refs      int32 string IDs of every source's provides and requires
+    offsets   int64 character offsets of each string in the text, plus its end
+    symbols   _SYMBOL per symbol
+    text      UTF-8 text of every string, concatenated
+"""
+
+from __future__ import annotations
+
+import array
+import struct
+from collections.abc import Sequence
+
+from . import source, symboltypes
+
+# Record, ref, string and symbol counts, and the size of the text in bytes.
+_HEADER = struct.Struct("<5I")
+
+# Path string ID, then the start and count of the source's provides and
+# requires in the refs, and of its symbols.
+_RECORD = struct.Struct("<i6I")
+
+# Identifier, start, end, comment block, comment start, comment end, comment
+# flag mask, namespace, property, type code and static. Strings are string IDs.
+_SYMBOL = struct.Struct("<iqqiqqQiibb")
+
+# Code 0 is a symbol with no type.
+_SYMBOL_TYPES = (None, *symboltypes.ALL_TYPES)
+_SYMBOL_TYPE_CODES = {
+    symbol_type: code for code, symbol_type in enumerate(_SYMBOL_TYPES)
+}
+
+# Static codes for static values of None, False and True.
+_STATIC_VALUES = {-1: None, 0: False, 1: True}
+
+# String ID standing for None.
+_NO_ID = -1
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+
+    def add(self, string: str | None) -> int:
+        if string is None:
+            return _NO_ID
+
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+
+def _encode_symbol(symbol: source._SymbolRecord, strings: _StringTable) -> bytes:
+    identifier, start, end, comment, namespace, symbol_property, symbol_type, static = (
+        symbol
+    )
+    return _SYMBOL.pack(
+        strings.add(identifier),
+        start,
+        end,
+        _NO_ID if comment is None else strings.add(comment.raw),
+        -1 if comment is None else comment.start,
+        -1 if comment is None else comment.end,
+        0 if comment is None else comment.flag_mask,
+        strings.add(namespace),
+        strings.add(symbol_property),
+        _SYMBOL_TYPE_CODES[symbol_type],
+        -1 if static is None else int(static),
+    )
+
+
+# pylint: disable-next=invalid-name
+def EncodeRecords(records: Sequence[source.SourceRecord]) -> bytes:
+    """Encodes scan records in the result block layout.
+
+    Args:
+        records: Scan records.
+
+    Returns:
+        The encoded result block.
+    """
+    strings = _StringTable()
+    encoded_records = []
+    refs = array.array("i")
+    encoded_symbols = []
+    for record in records:
+        provides_start = len(refs)
+        refs.extend(strings.add(namespace) for namespace in sorted(record.provides))
+        requires_start = len(refs)
+        refs.extend(strings.add(namespace) for namespace in sorted(record.requires))
+        encoded_records.append(
+            _RECORD.pack(
+                strings.add(record.path),
+                provides_start,
+                requires_start - provides_start,
+                requires_start,
+                len(refs) - requires_start,
+                len(encoded_symbols),
+                len(record.symbols),
+            )
+        )
+        encoded_symbols.extend(
+            _encode_symbol(symbol, strings) for symbol in record.symbols
+        )
+
+    offsets = array.array("q", [0])
+    for string in strings.strings:
+        offsets.append(offsets[-1] + len(string))
+    text = "".join(strings.strings).encode("utf-8")
+
+    header = _HEADER.pack(
+        len(encoded_records),
+        len(refs),
+        len(strings.strings),
+        len(encoded_symbols),
+        len(text),
+    )
+    return b"".join(
+        [
+            header,
+            *encoded_records,
+            refs.tobytes(),
+            offsets.tobytes(),
+            *encoded_symbols,
+            text,
+        ]
+    )
+
+
+def _read_array(
+    typecode: str, buffer: memoryview, start: int, count: int
+) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(buffer[start : start + count * values.itemsize])
+    return values
+
+
+# pylint: disable-next=too-many-locals
+def _decode_records(buffer: memoryview) -> list[source.SourceRecord]:
+    record_count, ref_count, string_count, symbol_count, text_size = (
+        _HEADER.unpack_from(buffer)
+    )
+
+    position = _HEADER.size
+    encoded_records = list(
+        _RECORD.iter_unpack(buffer[position : position + record_count * _RECORD.size])
+    )
+    position += record_count * _RECORD.size
+    refs = _read_array("i", buffer, position, ref_count)
+    position += len(refs) * refs.itemsize
+    offsets = _read_array("q", buffer, position, string_count + 1)
+    position += len(offsets) * offsets.itemsize
+    encoded_symbols = _SYMBOL.iter_unpack(
+        buffer[position : position + symbol_count * _SYMBOL.size]
+    )
+    position += symbol_count * _SYMBOL.size
+
+    # The text is decoded once; strings are slices of it.
+    text = str(buffer[position : position + text_size], "utf-8")
+    texts = [text[offsets[index] : offsets[index + 1]] for index in range(string_count)]
+    strings: list[str | None] = [*texts, None]  # String ID -1 is None.
+
+    # One flat pass over every symbol; each record then takes its slice.
+    symbols: list[source._SymbolRecord] = [
+        (
+            texts[identifier_id],
+            start,
+            end,
+            None
+            if comment_id == _NO_ID
+            # The flag mask is kept rather than found from the block again.
+            else source.Comment(
+                None,
+                comment_start,
+                comment_end,
+                script=texts[comment_id],
+                script_offset=comment_start,
+                flag_mask=flag_mask,
+            ),
+            strings[namespace_id],
+            strings[property_id],
+            _SYMBOL_TYPES[type_code],
+            _STATIC_VALUES[static],
+        )
+        for (
+            identifier_id,
+            start,
+            end,
+            comment_id,
+            comment_start,
+            comment_end,
+            flag_mask,
+            namespace_id,
+            property_id,
+            type_code,
+            static,
+        ) in encoded_symbols
+    ]
+
+    records = []
+    for (
+        path_id,
+        provides_start,
+        provides_count,
+        requires_start,
+        requires_count,
+        symbols_start,
+        symbols_count,
+    ) in encoded_records:
+        provides_ids = refs[provides_start : provides_start + provides_count]
+        requires_ids = refs[requires_start : requires_start + requires_count]
+        records.append(
+            source.SourceRecord(
+                strings[path_id],
+                {texts[ref] for ref in provides_ids},
+                {texts[ref] for ref in requires_ids},
+                symbols[symbols_start : symbols_start + symbols_count],
+            )
+        )
+
+    return records
+
+
+# pylint: disable-next=invalid-name
+def DecodeRecords(buffer: bytes | memoryview) -> list[source.SourceRecord]:
+    """Decodes scan records from a result block.
+
+    Args:
+        buffer: A result block made by EncodeRecords.
+
+    Returns:
+        The scan records.
+    """
+    return _decode_records(memoryview(buffer))
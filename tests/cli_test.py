@@ -0,0 +1,257 @@
+"""Tests for the jsdoctor.cli module."""
+
+import logging
+import os
+import pathlib
+import tarfile
+
+import pytest
+
+from jsdoctor import cli, scancache, scanpool, source, symbolindex
+
+
+def _make_script(namespace: str, name: str = "Aaa") -> str:
+    return f"""goog.provide('{namespace}');
+
+/**
+ * A class.
+ * @constructor
+ */
+{namespace}.{name} = function() {{}};
+"""
+
+
+def _write_scripts(tmp_path: pathlib.Path, count: int = 3) -> list[str]:
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"f{index}.js"
+        path.write_text(_make_script(f"goog.n{index}"))
+        paths.append(str(path))
+    return paths
+
+
+def _build(*args: str) -> None:
+    cli._build(cli._parse_args(["--executor", "serial", *args]))
+
+
+def _read_tar(path: pathlib.Path) -> dict[str, bytes]:
+    with tarfile.open(path) as tar:
+        pages = {}
+        for member in tar.getmembers():
+            page = tar.extractfile(member)
+            assert page is not None
+            pages[member.name] = page.read()
+        return pages
+
+
+def _read_dir(path: pathlib.Path) -> dict[str, bytes]:
+    return {
+        page.name: page.read_bytes()
+        for page in path.iterdir()
+        if page.name != cli._DEFAULT_MANIFEST_FILENAME
+    }
+
+
+def test_streaming_matches_full_build(tmp_path: pathlib.Path) -> None:
+    """Tests that a streaming build writes the same pages in the same order."""
+    paths = _write_scripts(tmp_path)
+    _build("--tar", str(tmp_path / "full.tar"), *paths)
+    _build("--streaming", "--tar", str(tmp_path / "streaming.tar"), *paths)
+
+    pages = _read_tar(tmp_path / "full.tar")
+    assert list(pages) == ["goog.n0.html", "goog.n1.html", "goog.n2.html"]
+    assert list(_read_tar(tmp_path / "streaming.tar").items()) == list(pages.items())
+
+
+def test_check(tmp_path: pathlib.Path) -> None:
+    """Tests that --check passes buildable files and fails on broken ones."""
+    paths = _write_scripts(tmp_path)
+    _build("--check", *paths)
+
+    broken_path = tmp_path / "broken.js"
+    broken_path.write_text("goog.provide('goog.x');\n/** No target. */\n")
+    with pytest.raises(SystemExit) as exc_info:
+        _build("--check", *paths, str(broken_path))
+    assert exc_info.value.code == 1
+
+
+def test_manifest(tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Tests that a build with a manifest only renders changed pages."""
+    paths = _write_scripts(tmp_path)
+    tar_path = tmp_path / "out.tar"
+    manifest_args = ["--manifest", str(tmp_path / "manifest.json")]
+    _build(*manifest_args, "--tar", str(tar_path), *paths)
+
+    pathlib.Path(paths[1]).write_text(_make_script("goog.n1", "Bbb"))
+    caplog.set_level(logging.INFO)
+    _build(*manifest_args, "--tar", str(tar_path), *paths)
+    assert "Rendered 1 of 3 pages" in caplog.text
+
+    _build("--tar", str(tmp_path / "full.tar"), *paths)
+    assert _read_tar(tar_path) == _read_tar(tmp_path / "full.tar")
+
+
+def test_out_dir(tmp_path: pathlib.Path) -> None:
+    """Tests writing pages to a directory, and removing stale ones."""
+    paths = _write_scripts(tmp_path)
+    out_dir = tmp_path / "out"
+    _build("--out-dir", str(out_dir), *paths)
+    assert (out_dir / cli._DEFAULT_MANIFEST_FILENAME).exists()
+
+    _build("--tar", str(tmp_path / "full.tar"), *paths)
+    assert _read_dir(out_dir) == _read_tar(tmp_path / "full.tar")
+
+    _build("--out-dir", str(out_dir), *paths[:2])
+    assert sorted(_read_dir(out_dir)) == ["goog.n0.html", "goog.n1.html"]
+
+
+def test_watch(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that the watch loop rebuilds pages when files change."""
+    paths = _write_scripts(tmp_path)
+    out_dir = tmp_path / "out"
+    sleeps = 0
+
+    def sleep(_: float) -> None:
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 1:
+            pathlib.Path(paths[0]).write_text(_make_script("goog.n0", "Bbb"))
+            # Change the size and mtime, even on coarse-grained file systems.
+            os.utime(paths[0], ns=(0, 0))
+            os.remove(paths[2])
+        else:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli.time, "sleep", sleep)
+    _build("--watch", "--out-dir", str(out_dir), *paths)
+    assert sleeps == 2
+
+    pages = _read_dir(out_dir)
+    assert sorted(pages) == ["goog.n0.html", "goog.n1.html"]
+    assert b"goog.n0.Bbb" in pages["goog.n0.html"]
+
+
+def test_watch_tar(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests watching with a tar, and files that cannot be read."""
+    paths = _write_scripts(tmp_path)
+    tar_path = tmp_path / "out.tar"
+    sleeps = 0
+
+    def sleep(_: float) -> None:
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 1:
+            pathlib.Path(paths[0]).write_text(_make_script("goog.n0", "Bbb"))
+            os.utime(paths[0], ns=(0, 0))
+            # Reading a directory fails; its previous docs are kept.
+            os.remove(paths[1])
+            os.mkdir(paths[1])
+        elif sleeps == 2:
+            os.remove(paths[2])
+        else:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli.time, "sleep", sleep)
+    _build("--watch", "--tar", str(tar_path), *paths)
+    assert sleeps == 3
+
+    pages = _read_tar(tar_path)
+    assert sorted(pages) == ["goog.n0.html", "goog.n1.html"]
+    assert b"goog.n0.Bbb" in pages["goog.n0.html"]
+    assert b"goog.n1.Aaa" in pages["goog.n1.html"]
+
+
+def test_warm_state_keeps_latest_build(tmp_path: pathlib.Path) -> None:
+    """Tests that a daemon forgets the files and pages of earlier builds."""
+    paths = _write_scripts(tmp_path)
+    warm = cli._WarmState(scanpool.PoolConfig("serial"), 1)
+    tar_path = str(tmp_path / "out.tar")
+    cli._build(cli._parse_args(["--tar", tar_path, *paths]), warm)
+    assert sorted(warm.records) == paths
+    assert sorted(warm.page_cache) == ["goog.n0.html", "goog.n1.html", "goog.n2.html"]
+
+    cli._build(cli._parse_args(["--tar", tar_path, *paths[:1]]), warm)
+    assert list(warm.records) == paths[:1]
+    assert list(warm.page_cache) == ["goog.n0.html"]
+
+
+def _make_namespace_map(
+    scripts: dict[str, str],
+) -> dict[str, set[source.SymbolView]]:
+    index = symbolindex.SymbolIndex()
+    index.update(
+        {
+            path: source.MakeSourceRecord(source.ScanScript(script, path))
+            for path, script in scripts.items()
+        }
+    )
+    return index.namespace_map
+
+
+def _count_tar_members(path: pathlib.Path) -> int:
+    with tarfile.open(path) as tar:
+        return len(tar.getmembers())
+
+
+def test_output_appends_to_tar(tmp_path: pathlib.Path) -> None:
+    """Tests that changed pages are appended to a tar until it is rewritten."""
+    tar_path = tmp_path / "out.tar"
+    output = cli._Output(str(tar_path))
+    scripts = {f"f{index}.js": _make_script(f"goog.n{index}") for index in range(3)}
+    page_hashes = output.write(_make_namespace_map(scripts), {})
+    assert _count_tar_members(tar_path) == 3
+
+    # Only changed namespaces are rendered, and they are appended.
+    scripts["f0.js"] = _make_script("goog.n0", "Bbb")
+    page_hashes = output.write(_make_namespace_map(scripts), page_hashes, {"goog.n0"})
+    assert _count_tar_members(tar_path) == 4
+    assert b"goog.n0.Bbb" in _read_tar(tar_path)["goog.n0.html"]
+
+    # Once superseded copies would make up half of it, the tar is rewritten.
+    for name in ["Ccc", "Ddd", "Eee"]:
+        scripts["f0.js"] = _make_script("goog.n0", name)
+        page_hashes = output.write(
+            _make_namespace_map(scripts), page_hashes, {"goog.n0"}
+        )
+    assert _count_tar_members(tar_path) == 3
+    assert b"goog.n0.Eee" in _read_tar(tar_path)["goog.n0.html"]
+
+    # Removing a page rewrites the tar.
+    del scripts["f2.js"]
+    page_hashes = output.write(_make_namespace_map(scripts), page_hashes, {"goog.n2"})
+    assert _count_tar_members(tar_path) == 2
+    assert sorted(page_hashes) == ["goog.n0.html", "goog.n1.html"]
+
+
+def test_output_skips_unchanged_namespaces(tmp_path: pathlib.Path) -> None:
+    """Tests that pages of namespaces that did not change are not hashed."""
+    out_dir = tmp_path / "out"
+    output = cli._Output(out_dir=str(out_dir))
+    scripts = {f"f{index}.js": _make_script(f"goog.n{index}") for index in range(2)}
+    page_hashes = output.write(_make_namespace_map(scripts), {})
+
+    scripts["f0.js"] = _make_script("goog.n0", "Bbb")
+    scripts["f1.js"] = _make_script("goog.n1", "Bbb")
+    new_hashes = output.write(_make_namespace_map(scripts), page_hashes, {"goog.n0"})
+    assert new_hashes["goog.n0.html"] != page_hashes["goog.n0.html"]
+    assert new_hashes["goog.n1.html"] == page_hashes["goog.n1.html"]
+    assert b"goog.n1.Aaa" in (out_dir / "goog.n1.html").read_bytes()
+
+
+def test_scan_costs_leave_out_cache_hits(tmp_path: pathlib.Path) -> None:
+    """Tests that files loaded from the scan cache have no measured cost."""
+    paths = _write_scripts(tmp_path)
+    cache = scancache.ScanCache(str(tmp_path / "cache"), 1 << 20, "test")
+    content_map = dict.fromkeys(paths)
+    pool_config = scanpool.PoolConfig("serial")
+
+    _, timing = cli._scan_content_in_parallel(
+        content_map, pool_config=pool_config, cache=cache
+    )
+    assert sorted(timing.costs) == paths
+
+    pathlib.Path(paths[0]).write_text(_make_script("goog.n0", "Bbb"))
+    _, timing = cli._scan_content_in_parallel(
+        content_map, pool_config=pool_config, cache=cache
+    )
+    assert list(timing.costs) == paths[:1]
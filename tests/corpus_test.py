@@ -0,0 +1,63 @@
+"""Tests for the jsdoctor.corpus module."""
+
+import pytest
+
+from jsdoctor import corpus, scanner
+
+_SCRIPTS = {
+    "a.js": """\
+goog.provide('goog.aaa');
+goog.require('goog.bbb');
+
+/**
+ * Description.
+ * @param {string} a The a.
+ */
+goog.aaa.ccc = function(a) {};
+
+/** @fileoverview Overview. */
+""",
+    "b.js": "/**/ /***/ /** a */ /** b */ foo\n  goog.provide('goog.ddd')",
+    # Delimiters straddling the boundary between c.js and d.js.
+    "c.js": "goog.provide('goog.eee'); /** x */ y /*",
+    "d.js": "*/ goog.provide('goog.fff');\ngoog.",
+    "e.js": "require('goog.ggg');\n/** Unterminated.",
+    "f.js": "goog.provide('goog.é');\n/** Non-ASCII. */ goog.é.x;\n",
+}
+
+
+def test_pack_corpus() -> None:
+    """Tests packing sources into one buffer with an offset table."""
+    packed = corpus.PackCorpus(["ab", "é", ""])
+    assert packed.buffer == b"ab\xc3\xa9"
+    assert list(packed.offsets) == [0, 2, 4, 4]
+
+
+def test_index_delimiters() -> None:
+    """Tests finding every delimiter in a buffer."""
+    index = corpus.IndexDelimiters(b"/***/ /**/ */ goog.provide( goog.require(")
+    assert list(index.comment_openers) == [0, 6]
+    assert list(index.comment_closers) == [3, 8, 11]
+    assert list(index.provide_calls) == [14]
+    assert list(index.require_calls) == [28]
+
+
+def test_index_corpus_matches_sweep() -> None:
+    """Tests that sweeping from the batch index matches sweeping each file."""
+    results = corpus.IndexCorpus(_SCRIPTS)
+    assert list(results) == list(_SCRIPTS)
+    assert results["f.js"] is None
+
+    for path, script in _SCRIPTS.items():
+        delimiters = results[path]
+        if delimiters is not None:
+            assert delimiters.sweep(script) == scanner.SweepScript(script), path
+
+
+def test_index_corpus_no_identifier_found_error() -> None:
+    """Tests raising NoIdentifierFoundError when a comment has no target."""
+    script = "/** No target. */"
+    delimiters = corpus.IndexCorpus({"a.js": script})["a.js"]
+    assert delimiters is not None
+    with pytest.raises(scanner.NoIdentifierFoundError):
+        delimiters.sweep(script)
@@ -0,0 +1,120 @@
+"""Tests for the jsdoctor.daemon module."""
+
+import dataclasses
+import functools
+import logging
+import os
+import pathlib
+import socketserver
+import tarfile
+import threading
+
+import pytest
+
+from jsdoctor import cli, daemon, scanpool
+
+
+def test_run_on_daemon_without_daemon(tmp_path: pathlib.Path) -> None:
+    """Tests that builds fall back when no daemon is listening."""
+    assert daemon.RunOnDaemon(str(tmp_path / "socket"), []) is None
+
+
+def test_run_on_daemon(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Tests running builds on a daemon, with their logs and exit status."""
+    build_cwds = []
+
+    def build(args: list[str]) -> int:
+        build_cwds.append(os.getcwd())
+        logging.warning("Building %s", " ".join(args))
+        if args == ["--fail"]:
+            raise ValueError("Broken build")
+        return len(args)
+
+    socket_path = str(tmp_path / "socket")
+    handler = daemon._make_handler(build, logging.Formatter("%(message)s"))
+    with socketserver.UnixStreamServer(socket_path, handler) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            monkeypatch.chdir(tmp_path)
+            assert daemon.RunOnDaemon(socket_path, ["a.js", "b.js"]) == 2
+            assert daemon.RunOnDaemon(socket_path, ["--fail"]) == 1
+        finally:
+            server.shutdown()
+            thread.join()
+
+    assert build_cwds == [str(tmp_path)] * 2
+    stderr = capsys.readouterr().err
+    assert "Building a.js b.js\n" in stderr
+    assert "Broken build" in stderr
+
+
+class _DroppingHandler(socketserver.StreamRequestHandler):
+    """Goes away part way through a build."""
+
+    def handle(self) -> None:
+        self.rfile.readline()
+        self.wfile.write(b'{"log": "Building"}\n{"log": "Buil')
+
+
+def test_run_on_daemon_disconnected(tmp_path: pathlib.Path) -> None:
+    """Tests that a daemon going away mid-build is a failure, not a fallback."""
+    socket_path = str(tmp_path / "socket")
+    with socketserver.UnixStreamServer(socket_path, _DroppingHandler) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with pytest.raises(daemon.DaemonDisconnectedError):
+                daemon.RunOnDaemon(socket_path, [])
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def test_daemon_build_from_another_directory(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Tests a daemon build of relative paths with process workers."""
+    client_dir = tmp_path / "client"
+    client_dir.mkdir()
+    for index in range(cli._MIN_PARALLEL_SCAN_FILES):
+        (client_dir / f"f{index}.js").write_text(
+            f"goog.provide('goog.n{index}');\n\n"
+            f"/**\n * A class.\n * @constructor\n */\n"
+            f"goog.n{index}.Aaa = function() {{}};\n"
+        )
+    paths = sorted(path.name for path in client_dir.iterdir())
+
+    # The workers start in the daemon's directory, not the client's.
+    monkeypatch.chdir(tmp_path)
+    pool_config = scanpool.PoolConfig("process")
+    socket_path = str(tmp_path / "socket")
+    with pool_config.make_pool(2) as pool:
+        warm = cli._WarmState(dataclasses.replace(pool_config, pool=pool), 2)
+        handler = daemon._make_handler(
+            functools.partial(cli._build_on_daemon, warm),
+            logging.Formatter("%(message)s"),
+        )
+        with socketserver.UnixStreamServer(socket_path, handler) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                monkeypatch.chdir(client_dir)
+                assert (
+                    daemon.RunOnDaemon(socket_path, ["--tar", "out.tar", *paths]) == 0
+                )
+                # Usage errors are reported to the client.
+                assert daemon.RunOnDaemon(socket_path, ["a.js"]) == 2
+            finally:
+                server.shutdown()
+                thread.join()
+
+    with tarfile.open(client_dir / "out.tar") as tar:
+        assert len(tar.getnames()) == len(paths)
+    assert "--tar or --out-dir is required" in capsys.readouterr().err
@@ -1,5 +1,7 @@
 """Tests for the jsdoctor.flags module."""
 
+import pickle
+
 import pytest
 
 from jsdoctor import flags, source
@@ -98,3 +100,51 @@ abc.def;
     symbol = next(iter(test_source.symbols))
     assert symbol.comment is not None
     assert flags.GetVisibility(symbol.comment.flags) == flags.PUBLIC
+
+
+def test_get_flag_mask() -> None:
+    """Tests building flag bitmasks and reading visibility from them."""
+    assert flags.GetFlagMask([]) == 0
+    assert len(set(flags.FLAG_BITS.values())) == len(flags.ALL_FLAGS)
+
+    mask = flags.GetFlagMask(["@param", "@return", "@param"])
+    assert mask == flags.FLAG_BITS["@param"] | flags.FLAG_BITS["@return"]
+    assert flags.GetVisibilityFromMask(mask) == flags.PUBLIC
+
+    mask |= flags.FLAG_BITS["@protected"]
+    assert flags.GetVisibilityFromMask(mask) == flags.PROTECTED
+
+    mask |= flags.FLAG_BITS["@private"]
+    assert flags.GetVisibilityFromMask(mask) == flags.PRIVATE
+
+
+def test_parse_param_and_return() -> None:
+    """Tests parsing flag descriptions into shared Param and Return records."""
+    param = flags.ParseParam("{!Array<number>} aaa The desc.")
+    assert param.name == "aaa"
+    assert param.type.expression == "!Array<number>"
+    assert param.type.text == "{!Array<number>}"
+    assert param.text == "The desc."
+
+    return_ = flags.ParseReturn(" {!Array<number>} Other desc.")
+    assert return_.type is param.type
+    assert return_.text == "Other desc."
+
+    assert flags.MaybeParseParam("desc without type") is None
+    assert flags.MaybeParseReturn("desc without type") is None
+    with pytest.raises(ValueError):
+        flags.ParseParam("desc without type")
+
+
+def test_get_type() -> None:
+    """Tests that identical type expressions share one Type, even unpickled."""
+    string_type = flags.GetType("string")
+    assert flags.GetType("str" + "ing") is string_type
+    assert pickle.loads(pickle.dumps(string_type)) is string_type
+
+    flag = source.Flag("@param", "{string} aaa")
+    assert flag.param is not None
+    assert flag.param.type is string_type
+    assert pickle.loads(pickle.dumps(flag)).param.type is string_type
+    assert flag.returns is None
+    assert source.Flag("@param", "aaa").param is None
@@ -1,5 +1,7 @@
 """Tests for the jsdoctor.jsdoc module."""
 
+import pytest
+
 from jsdoctor import jsdoc
 
 
@@ -36,6 +38,50 @@ def test_match_flags() -> None:
     assert flags == ["@flag", "@flag2", "@flag3", "@flag4"]
 
 
+@pytest.mark.parametrize(
+    "section_text",
+    [
+        "",
+        "Only a description.",
+        "@flag",
+        "@flag1 One.@notaflag\n@flag2\n@flag3 Three\nand more.",
+        "Description.\n@param {string} a A.\n@param {number} b B.\n@return {T} T.",
+        "email@example.com @flag text",
+    ],
+)
+def test_process_comment_section(section_text: str) -> None:
+    """Tests the forward flag splitter against splitting from the end."""
+    remaining_text = section_text
+    expected_flags: list[tuple[str, str]] = []
+    # pylint: disable-next=protected-access
+    for flag_match in reversed(list(jsdoc._match_flags(section_text))):
+        flag_text = remaining_text[flag_match.end() :].strip()
+        expected_flags.insert(0, (flag_match.group("flag"), flag_text))
+        remaining_text = remaining_text[0 : flag_match.start()]
+
+    # pylint: disable-next=protected-access
+    description, flags = jsdoc._process_comment_section(section_text)
+    assert description == remaining_text
+    assert flags == expected_flags
+
+
+def _make_flag_comment(flag_count: int) -> str:
+    lines = ["Description of a generated API."]
+    lines.extend(
+        f"@param {{string}} arg{index} Argument." for index in range(flag_count)
+    )
+    return "\n".join(lines)
+
+
+def test_process_comment_many_flags() -> None:
+    """Tests parsing comments with 1 to 500 flags; benchscaling.py times them."""
+    for flag_count in (1, 10, 50, 100, 500):
+        descriptions, flags = jsdoc.ProcessComment(_make_flag_comment(flag_count))
+        assert descriptions == ["Description of a generated API."]
+        assert len(flags) == flag_count
+        assert flags[-1] == ("@param", f"{{string}} arg{flag_count - 1} Argument.")
+
+
 _SCRIPT = """\
 @flag Thing thing
 
@@ -0,0 +1,62 @@
+"""Tests for the jsdoctor.manifest module."""
+
+import json
+import pathlib
+
+from jsdoctor import manifest, source
+
+_TEST_SCRIPT = """goog.provide('goog.example');
+
+/**
+ * Does a thing.
+ * @param {string} name The name.
+ */
+goog.example.doThing = function(name) {};
+
+/**
+ * Does another thing.
+ */
+goog.example.doOtherThing = function() {};
+"""
+
+
+def _get_symbols(script: str) -> list[source.Symbol]:
+    return list(source.ScanScript(script, "a.js").symbols)
+
+
+def test_get_page_hash() -> None:
+    """Tests that page hashes change with the page's inputs only."""
+    symbols = _get_symbols(_TEST_SCRIPT)
+    page_hash = manifest.GetPageHash("goog.example", symbols, "1")
+    assert page_hash == manifest.GetPageHash("goog.example", symbols[::-1], "1")
+
+    # Moving the symbols within the file does not change the page.
+    moved_symbols = _get_symbols("\n\n" + _TEST_SCRIPT)
+    assert page_hash == manifest.GetPageHash("goog.example", moved_symbols, "1")
+
+    assert page_hash != manifest.GetPageHash("goog.example", symbols, "2")
+    assert page_hash != manifest.GetPageHash("goog.other", symbols, "1")
+    assert page_hash != manifest.GetPageHash("goog.example", symbols[:1], "1")
+
+    changed_symbols = _get_symbols(_TEST_SCRIPT.replace("another", "one more"))
+    assert page_hash != manifest.GetPageHash("goog.example", changed_symbols, "1")
+
+    assert manifest.GetGeneratorVersion() == manifest.GetGeneratorVersion()
+
+
+def test_read_and_write_manifest(tmp_path: pathlib.Path) -> None:
+    """Tests that written page hashes read back."""
+    path = str(tmp_path / "manifest.json")
+    assert not manifest.ReadManifest(path)
+
+    page_hashes = {"goog.a.html": "1", "goog.b.html": "2"}
+    manifest.WriteManifest(path, page_hashes)
+    assert manifest.ReadManifest(path) == page_hashes
+    assert [p.name for p in tmp_path.iterdir()] == ["manifest.json"]
+
+
+def test_read_manifest_other_format(tmp_path: pathlib.Path) -> None:
+    """Tests that a manifest in another format has no page hashes."""
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"format": 0, "pages": {"goog.a.html": "1"}}))
+    assert not manifest.ReadManifest(str(path))
@@ -63,3 +63,33 @@ def test_get_symbol_parts_in_namespace() -> None:
     assert namespace._get_symbol_parts_in_namespace(["aaa"], ["aaa", "bbb"]) == 0
     # pylint: disable-next=protected-access
     assert namespace._get_symbol_parts_in_namespace(["aaa", "bbb"], ["aaa", "ccc"]) == 1
+
+
+def test_namespace_index() -> None:
+    """Tests membership and closest-namespace lookups in the namespace trie."""
+    namespaces = {"aaa.bbb", "aaa.bbb.ccc.ddd", "goog.string", "goog.string.Unicode"}
+    index = namespace.NamespaceIndex(namespaces)
+
+    symbols = [
+        "aaa",
+        "aaa.bbb",
+        "aaa.bbb.ccc",
+        "aaa.bbb.ccc.ddd.eee",
+        "aaa.bbbb",
+        "goog.string.startsWith",
+        "goog.string.Unicode.NBSP",
+        "other",
+    ]
+    for symbol in symbols:
+        assert index.get_closest_namespace(
+            symbol
+        ) == namespace.GetClosestNamespaceForSymbol(symbol, namespaces)
+        assert index.is_symbol_part_of_namespaces(symbol) == any(
+            namespace.IsSymbolPartOfNamespace(symbol, ns) for ns in namespaces
+        )
+
+    assert namespace.GetClosestNamespaceForSymbol("aaa.bbb.ccc", index) == "aaa.bbb"
+    assert not namespace.NamespaceIndex().is_symbol_part_of_namespaces("aaa")
+
+    index.add("aaa")
+    assert index.get_closest_namespace("aaa.bbbb") == "aaa"
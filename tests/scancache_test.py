@@ -0,0 +1,154 @@
+"""Tests for the jsdoctor.scancache module."""
+
+import os
+import pathlib
+
+from jsdoctor import scancache, scanworker, source
+
+_TEST_SCRIPT = """goog.provide('goog.example');
+
+/**
+ * Does a thing.
+ * @param {string} name The name.
+ */
+goog.example.doThing = function(name) {};
+"""
+
+
+def _make_cache(
+    tmp_path: pathlib.Path, max_bytes: int = 1 << 20
+) -> scancache.ScanCache:
+    return scancache.ScanCache(str(tmp_path / "cache"), max_bytes, "test")
+
+
+def test_get_key() -> None:
+    """Tests that keys depend on the content and the version."""
+    cache = scancache.ScanCache("cache", 0, "1")
+    assert cache.get_key(b"a") == cache.get_key(b"a")
+    assert cache.get_key(b"a") != cache.get_key(b"b")
+    assert cache.get_key(b"a") != scancache.ScanCache("cache", 0, "2").get_key(b"a")
+    assert scancache.GetVersion() == scancache.GetVersion()
+
+
+def test_load_and_store(tmp_path: pathlib.Path) -> None:
+    """Tests caching a record and loading it for another path."""
+    cache = _make_cache(tmp_path)
+    key = cache.get_key(_TEST_SCRIPT.encode("utf-8"))
+    assert cache.load(key, "a.js") is None
+
+    record = source.MakeSourceRecord(source.ScanScript(_TEST_SCRIPT, "a.js"))
+    cache.store(key, record)
+
+    loaded_record = cache.load(key, "b.js")
+    assert loaded_record is not None
+    assert loaded_record.path == "b.js"
+    assert loaded_record.provides == record.provides
+    assert [symbol[:3] for symbol in loaded_record.symbols] == [
+        symbol[:3] for symbol in record.symbols
+    ]
+    (symbol,) = loaded_record.symbols
+    assert symbol[3] is not None
+    assert [flag.name for flag in symbol[3].flags] == ["@param"]
+
+
+def test_unreadable_entry(tmp_path: pathlib.Path) -> None:
+    """Tests that a damaged entry is a miss rather than an error."""
+    cache = _make_cache(tmp_path)
+    key = cache.get_key(b"")
+    cache.store(key, source.MakeSourceRecord(source.ScanScript("", "a.js")))
+
+    (entry_path,) = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(cache.directory)
+        for name in names
+        if name != "lock"
+    ]
+    with open(entry_path, "r+b") as f:
+        f.truncate(3)
+    assert cache.load(key, "a.js") is None
+
+    # An entry that is a directory cannot be read.
+    os.remove(entry_path)
+    os.mkdir(entry_path)
+    assert cache.load(key, "a.js") is None
+
+
+def test_evict(tmp_path: pathlib.Path) -> None:
+    """Tests evicting the least recently used entries beyond the cap."""
+    cache = _make_cache(tmp_path, max_bytes=0)
+    keys = []
+    for index in range(3):
+        script = f"goog.provide('goog.example{index}');\n"
+        key = cache.get_key(script.encode("utf-8"))
+        cache.store(key, source.MakeSourceRecord(source.ScanScript(script, "a.js")))
+        keys.append(key)
+
+    # Make the first entry the oldest, then use it, leaving the second oldest.
+    for age, key in enumerate(keys):
+        mtime = 1_000_000 + age
+        # pylint: disable-next=protected-access
+        os.utime(cache._get_entry_path(key), (mtime, mtime))
+    assert cache.load(keys[0], "a.js") is not None
+
+    # pylint: disable-next=protected-access
+    entry_size = os.path.getsize(cache._get_entry_path(keys[0]))
+    cache = scancache.ScanCache(cache.directory, 2 * entry_size, cache.version)
+    assert cache.evict() == 1
+    assert cache.load(keys[1], "a.js") is None
+    assert cache.load(keys[0], "a.js") is not None
+    assert cache.load(keys[2], "a.js") is not None
+
+
+def test_scan_cached_content(tmp_path: pathlib.Path) -> None:
+    """Tests that workers load unchanged files from the cache."""
+    path = tmp_path / "a.js"
+    path.write_text(_TEST_SCRIPT, encoding="utf-8")
+    cache = _make_cache(tmp_path)
+    stats = scancache.CacheStats()
+
+    for scan_item in [(str(path), None, None), ("b.js", _TEST_SCRIPT, None)]:
+        record, from_cache = scanworker.ScanCachedContent(scan_item, False, cache)
+        stats.add(from_cache)
+        assert record.path == scan_item[0]
+        assert record.provides == {"goog.example"}
+
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_unwritable_cache(tmp_path: pathlib.Path) -> None:
+    """Tests that a cache that cannot be written is skipped, not an error."""
+    # The cache directory cannot be made where a file is.
+    (tmp_path / "cache").write_bytes(b"")
+    cache = _make_cache(tmp_path)
+    key = cache.get_key(b"")
+    cache.store(key, source.MakeSourceRecord(source.ScanScript("", "a.js")))
+    assert cache.load(key, "a.js") is None
+    assert cache.evict() == 0
+
+
+def test_entry_mode(tmp_path: pathlib.Path) -> None:
+    """Tests that entries are made with the umask, like any other file."""
+    cache = _make_cache(tmp_path)
+    key = cache.get_key(b"")
+    old_umask = os.umask(0o022)
+    try:
+        cache.store(key, source.MakeSourceRecord(source.ScanScript("", "a.js")))
+    finally:
+        os.umask(old_umask)
+    # pylint: disable-next=protected-access
+    assert os.stat(cache._get_entry_path(key)).st_mode & 0o777 == 0o644
+
+
+def test_evict_stale_temp_files(tmp_path: pathlib.Path) -> None:
+    """Tests that eviction removes temporary files left by dead builds."""
+    cache = _make_cache(tmp_path)
+    entry_dir = pathlib.Path(cache.directory) / "ab"
+    entry_dir.mkdir(parents=True)
+    stale_path = entry_dir / ".tmpstale"
+    stale_path.write_bytes(b"")
+    os.utime(stale_path, (0, 0))
+    fresh_path = entry_dir / ".tmpfresh"
+    fresh_path.write_bytes(b"")
+
+    assert cache.evict() == 0
+    assert sorted(path.name for path in entry_dir.iterdir()) == [".tmpfresh"]
@@ -1,8 +1,13 @@
 """Tests for the jsdoctor.scanner module."""
 
+import pickle
+import random
+from collections.abc import Callable
+
 import pytest
 
-from jsdoctor import scanner
+import genadversarialjs
+from jsdoctor import jsdoc, scanner
 
 
 def test_provides() -> None:
@@ -63,6 +68,20 @@ def test_extract_text() -> None:
     assert text == "Slaughterhouse five.\n\n@return {string} The result, as a string."
 
 
+@pytest.mark.parametrize("alphabet", [" \t\x1f*@ab/\n", " *@a\n\r\x0b\u2028"])
+def test_yield_jsdoc_flag_names(alphabet: str) -> None:
+    """Tests finding flags in raw comments against finding them in the text."""
+    rng = random.Random(alphabet)
+    for _ in range(5000):
+        body = "".join(rng.choices(alphabet, k=rng.randrange(24)))
+        comment = f"/**{body}*/"
+        text = scanner.ExtractTextFromJsDocComment(comment)
+        script = f"x;{comment}y;"
+        assert list(scanner.YieldJsDocFlagNames(script, 2, len(script) - 2)) == list(
+            jsdoc.YieldFlagNames(text)
+        ), body
+
+
 def test_extract_documented_symbols() -> None:
     """Tests extracting comment-identifier pairs from source."""
     script = """
@@ -146,9 +165,149 @@ def test_file_overview_comment() -> None:
 
 def test_no_identifier_found_error() -> None:
     """Tests raising NoIdentifierFoundError when no target follows a comment."""
-    script = "/**\n * Comment with no target.\n */\n"
-    with pytest.raises(scanner.NoIdentifierFoundError):
+    script = "x;\n/**\n * Comment with no target.\n */\n"
+    with pytest.raises(scanner.NoIdentifierFoundError) as exc_info:
         list(scanner.ExtractDocumentedSymbols(script))
+    assert exc_info.value.offset == 3
+
+    # The offset survives being sent back from a pool worker.
+    error = pickle.loads(pickle.dumps(exc_info.value))
+    assert (str(error), error.offset) == (str(exc_info.value), 3)
+
+
+def test_sweep_script() -> None:
+    """Tests the single-pass scan of declarations and comment targets."""
+    result = scanner.SweepScript("""\
+goog.provide('goog.aaa');
+  goog.require("goog.bbb");
+x = 'goog.provide("not.a.provide")';
+
+/**
+ * @fileoverview Overview.
+ */
+
+/** Comment. */
+goog.aaa . ccc(3);
+""")
+    assert result.provides == ["goog.aaa"]
+    assert result.requires == ["goog.bbb"]
+    assert len(result.comments) == 2
+
+    overview, comment = result.comments
+    assert overview.target is None
+    assert comment.target == "goog.aaa . ccc"
+    assert comment.next_char == "("
+
+
+def test_sweep_script_matches_scanners() -> None:
+    """Tests that the sweep agrees with the per-question scanners."""
+    scripts = [
+        _TEST_SCRIPT,
+        "goog.provide('a');\r\ngoog.provide('b')\x0b goog.require('c');",
+        "/**/ /***/ /** a */ /** b */ foo",
+        "/** a */ (x) /** b */ y.z",
+        "\u2028goog.provide('a')\x1f goog.provide('b') /** x */ y\n/** z",
+    ]
+    for script in scripts:
+        result = scanner.SweepScript(script)
+        assert result.provides == list(scanner.YieldProvides(script))
+        assert result.requires == list(scanner.YieldRequires(script))
+
+        pairs = list(scanner.ExtractDocumentedSymbols(script))
+        assert len(result.comments) == len(pairs)
+        for comment, (comment_match, identifier_match) in zip(
+            result.comments, pairs, strict=True
+        ):
+            assert (comment.comment_start, comment.comment_end) == comment_match.span()
+            if identifier_match:
+                assert comment.target == identifier_match.group()
+                assert (comment.target_start, comment.target_end) == (
+                    identifier_match.span()
+                )
+            else:
+                assert comment.target is None
+
+
+def test_sweep_script_bytes() -> None:
+    """Tests that sweeping an ASCII buffer matches sweeping the decoded text."""
+    scripts = [
+        _TEST_SCRIPT,
+        "goog.provide('a');\r\ngoog.provide('b')\x0b goog.require('c');",
+        "\x1f goog.provide('a')\x1f\n/** x */ y\x1f.\x1cz\x1f(",
+        "/**/ /***/ /** a */ /** b */ foo",
+        "/** @fileoverview f */ /** a */ (x) /** b */ $y.z",
+    ]
+    for script in scripts:
+        assert scanner.SweepScript(script.encode("ascii")) == scanner.SweepScript(
+            script
+        )
+
+
+def test_sweep_script_no_identifier_found_error() -> None:
+    """Tests that the sweep raises NoIdentifierFoundError like the scanners."""
+    with pytest.raises(scanner.NoIdentifierFoundError) as exc_info:
+        scanner.SweepScript("x;\n/**\n * Comment with no target.\n */\n")
+    assert exc_info.value.offset == 3
+
+
+def _sweep_in_chunks(
+    script: scanner.ScriptBuffer, chunk_size: int
+) -> scanner.ScanResult:
+    sweeps = [
+        scanner.SweepChunk(chunk, offset)
+        for chunk, offset in scanner.YieldSweepChunks(script, chunk_size)
+    ]
+    return scanner.MergeChunkSweeps(script, sweeps)
+
+
+def test_sweep_chunks_match_sweep_script() -> None:
+    """Tests that sweeping a script in chunks matches sweeping it whole."""
+    scripts = [
+        _TEST_SCRIPT * 3,
+        "goog.provide('a');\r\ngoog.provide('b')\x0b goog.require('c');" * 5,
+        "/**/ /***/ /** a */ /** b */ foo " * 5,
+        "/** a */ (x) /** b */ y . /** c */ z\n" * 5,
+        "/** a */ y\n  goog.provide('a*/b') /** b */ y.z\n/**/**/ /* */** q */ x",
+        "/** @fileoverview f */ /** a */ x /** b */\n\n a\n.\n b /** c */ $y.z",
+    ]
+    scripts.extend(generate(300) for generate in genadversarialjs.GENERATORS.values())
+    for script in scripts:
+        try:
+            expected: object = scanner.SweepScript(script)
+        except scanner.NoIdentifierFoundError as error:
+            expected = error.offset
+
+        for chunk_size in range(1, 40):
+            for buffer in (script, script.encode("ascii")):
+                try:
+                    result: object = _sweep_in_chunks(buffer, chunk_size)
+                except scanner.NoIdentifierFoundError as error:
+                    result = error.offset
+                assert result == expected, (script, chunk_size)
+
+
+def test_sweep_chunks_no_identifier_found_error() -> None:
+    """Tests that the first comment with no target raises, as in SweepScript."""
+    script = "/** a */ x;\n/** b */ y;\n/** Comment with no target. */;\n/**/"
+    with pytest.raises(scanner.NoIdentifierFoundError) as exc_info:
+        _sweep_in_chunks(script, 5)
+    assert exc_info.value.offset == script.index("/** Comment")
+
+
+@pytest.mark.parametrize("name", sorted(genadversarialjs.GENERATORS))
+def test_scan_adversarial_input(name: str) -> None:
+    """Tests that adversarial inputs scan; benchscaling.py times them."""
+    script = genadversarialjs.GENERATORS[name](50_000)
+    scans: list[Callable[[str], object]] = [
+        scanner.SweepScript,
+        lambda script: list(scanner.ExtractDocumentedSymbols(script)),
+        lambda script: list(scanner.YieldProvides(script)),
+    ]
+    for scan in scans:
+        try:
+            scan(script)
+        except scanner.NoIdentifierFoundError:
+            pass
 
 
 _TEST_SCRIPT = """\
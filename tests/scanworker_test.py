@@ -0,0 +1,98 @@
+"""Tests for the jsdoctor.scanworker module."""
+
+import pathlib
+import pickle
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+from jsdoctor import scanworker
+
+_TEST_SCRIPT = """goog.provide('goog.example');
+
+/**
+ * Does a thing.
+ * @param {string} name The name.
+ */
+goog.example.doThing = function(name) {};
+"""
+
+
+def test_scan_batch(tmp_path: pathlib.Path) -> None:
+    """Tests scanning files that are read by the worker or given to it."""
+    path = tmp_path / "a.js"
+    path.write_text(_TEST_SCRIPT, encoding="utf-8")
+
+    for use_mmap in (False, True):
+        timed_records = scanworker.ScanBatch(
+            [(str(path), None, None), ("b.js", _TEST_SCRIPT, None)], use_mmap
+        )
+        assert [path for path, _, _, _ in timed_records] == [str(path), "b.js"]
+        for _, record, seconds, from_cache in timed_records:
+            assert not from_cache
+            assert record.provides == {"goog.example"}
+            assert [symbol[0] for symbol in record.symbols] == ["goog.example.doThing"]
+            assert seconds >= 0
+
+
+def test_check_content(tmp_path: pathlib.Path) -> None:
+    """Tests checking files, and the errors reported for them."""
+    scanworker.CheckBatch([("a.js", _TEST_SCRIPT, None)], use_mmap=False)
+
+    bad_param_script = _TEST_SCRIPT.replace("{string} name", "name")
+    with pytest.raises(scanworker.CheckError) as exc_info:
+        scanworker.CheckContent(("a.js", bad_param_script, None))
+    offset = bad_param_script.index("/**")
+    assert str(exc_info.value) == (
+        f"a.js:{offset}: Could not parse @param description: name The name."
+    )
+
+    orphan_script = "goog.provide('goog.example');\n/** Orphan. */\n"
+    with pytest.raises(scanworker.CheckError) as exc_info:
+        scanworker.CheckContent(("b.js", orphan_script, None))
+    assert (exc_info.value.path, exc_info.value.offset) == ("b.js", 30)
+
+    # Rendering would assert on these.
+    return_script = _TEST_SCRIPT.replace(" */", " * @return {string} Twice.\n */")
+    return_script = return_script.replace(" */", " * @return {number} Again.\n */")
+    with pytest.raises(scanworker.CheckError, match="More than 1 @return flag"):
+        scanworker.CheckContent(("c.js", return_script, None))
+
+    crlf_script = _TEST_SCRIPT.replace("\n", "\r\n")
+    with pytest.raises(scanworker.CheckError, match="carriage returns") as exc_info:
+        scanworker.CheckContent(("d.js", crlf_script, None))
+    assert exc_info.value.offset == crlf_script.index("/**")
+
+    bad_utf8_path = tmp_path / "e.js"
+    bad_utf8_path.write_bytes(b"// \xff\xfe bad\n")
+    with pytest.raises(scanworker.CheckError) as exc_info:
+        scanworker.CheckContent((str(bad_utf8_path), None, None))
+    assert (exc_info.value.path, exc_info.value.offset) == (str(bad_utf8_path), 3)
+
+    missing_path = str(tmp_path / "missing.js")
+    with pytest.raises(scanworker.CheckError, match="No such file") as exc_info:
+        scanworker.CheckContent((missing_path, None, None))
+    assert (exc_info.value.path, exc_info.value.offset) == (missing_path, None)
+
+    # Errors keep their location when sent back from a pool worker.
+    error = pickle.loads(pickle.dumps(exc_info.value))
+    assert str(error) == str(exc_info.value)
+
+
+def test_worker_imports() -> None:
+    """Tests that scan workers do not import rendering modules."""
+    code = (
+        "import sys\n"
+        "import jsdoctor.scanworker\n"
+        "print(sorted(name for name in sys.modules if name.startswith("
+        "('jsdoctor.generator', 'jsdoctor.cli', 'html5lib', 'xml.dom'))))\n"
+    )
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", code],
+        cwd=pathlib.Path(__file__).parent.parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "[]"
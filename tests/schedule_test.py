@@ -0,0 +1,59 @@
+"""Tests for the jsdoctor.schedule module."""
+
+import pathlib
+
+import pytest
+
+from jsdoctor import schedule
+
+
+def test_estimate_costs() -> None:
+    """Tests estimating costs from sizes and recorded costs."""
+    paths = ["a.js", "b.js", "c.js"]
+    assert schedule.EstimateCosts(paths, [10, 20, 30], {}) == [10, 20, 30]
+
+    # Unrecorded paths are scaled by the rate of the recorded ones.
+    costs = schedule.EstimateCosts(paths, [10, 20, 30], {"a.js": 2.0})
+    assert costs == pytest.approx([2.0, 4.0, 6.0])
+
+    costs = schedule.EstimateCosts(paths, [10, 20, 30], {"c.js": 0.5, "b.js": 1.0})
+    assert costs[1:] == [1.0, 0.5]
+
+
+def test_make_batches() -> None:
+    """Tests grouping work into batches of about equal cost, largest first."""
+    costs = [1, 50, 1, 1, 30, 1, 1, 1, 1, 1, 1, 1]
+    batches = schedule.MakeBatches(costs, 4)
+
+    assert sorted(index for batch in batches for index in batch) == list(
+        range(len(costs))
+    )
+    assert batches[:2] == [[1], [4]]
+    batch_costs = [sum(costs[index] for index in batch) for batch in batches]
+    assert batch_costs == sorted(batch_costs, reverse=True)
+
+    assert schedule.MakeBatches([], 4) == []
+    assert schedule.MakeBatches([1, 1, 1], 1) == [[0, 1, 2]]
+
+
+def test_scan_timing() -> None:
+    """Tests reporting the time lost to uneven work."""
+    timing = schedule.ScanTiming(2, 10.0, {"a.js": 9.0, "b.js": 1.0})
+    assert timing.lost_seconds == 5.0
+    assert timing.get_slowest() == ("a.js", 9.0)
+    assert schedule.ScanTiming(1, 0.0, {}).get_slowest() is None
+
+
+def test_read_and_write_costs(tmp_path: pathlib.Path) -> None:
+    """Tests recording costs for the next build."""
+    path = str(tmp_path / "costs.json")
+    assert not schedule.ReadCosts(path)
+
+    script_path = tmp_path / "a.js"
+    script_path.write_text("")
+    costs = {str(script_path): 1.5, str(tmp_path / "removed.js"): 2.0}
+    schedule.WriteCosts(path, costs)
+
+    # Paths that no longer exist are dropped.
+    assert schedule.ReadCosts(path) == {str(script_path): 1.5}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.js", "costs.json"]
@@ -0,0 +1,94 @@
+"""Tests for the jsdoctor.session module."""
+
+import pathlib
+import threading
+
+import pytest
+
+import jsdoctor
+from jsdoctor import scanner
+
+
+def _make_script(namespace: str, name: str = "Aaa") -> str:
+    return f"""goog.provide('{namespace}');
+
+/**
+ * A class.
+ * @constructor
+ */
+{namespace}.{name} = function() {{}};
+"""
+
+
+def test_session(tmp_path: pathlib.Path) -> None:
+    """Tests adding, updating and removing files, and rendering their pages."""
+    path = tmp_path / "a.js"
+    path.write_text(_make_script("goog.a"))
+    with jsdoctor.Session(
+        executor="serial", cache_dir=str(tmp_path / "cache")
+    ) as session:
+        session.add_or_update(str(path))
+        session.add_or_update("b.js", _make_script("goog.b"))
+        pages = session.render()
+        assert sorted(pages) == ["goog.a.html", "goog.b.html"]
+        assert b"goog.a.Aaa" in pages["goog.a.html"]
+        assert session.render(["goog.b"]) == {"goog.b.html": pages["goog.b.html"]}
+
+        session.add_or_update("b.js", _make_script("goog.b", "Bbb"))
+        page = session.render(["goog.b"])["goog.b.html"]
+        assert b"goog.b.Bbb" in page
+        assert b"goog.b.Aaa" not in page
+
+        session.remove("b.js")
+        session.remove("c.js")
+        assert sorted(session.render()) == ["goog.a.html"]
+        with pytest.raises(KeyError):
+            session.render(["goog.b"])
+
+        # A file that does not scan keeps its previous symbols.
+        with pytest.raises(scanner.NoIdentifierFoundError):
+            session.add_or_update(str(path), "goog.provide('goog.a');\n/** A. */\n")
+        assert session.render() == {"goog.a.html": pages["goog.a.html"]}
+
+
+def test_session_threads() -> None:
+    """Tests that requests from several threads may run at once."""
+    with jsdoctor.Session(executor="thread", jobs=2) as session:
+        threads = [
+            threading.Thread(
+                target=session.add_or_update,
+                args=(f"{i}.js", _make_script(f"goog.n{i}")),
+            )
+            for i in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(session.render()) == 16
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_session_add_or_update_many(tmp_path: pathlib.Path, executor: str) -> None:
+    """Tests adding a batch of files, some of which do not scan."""
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"{index}.js"
+        path.write_text(_make_script(f"goog.n{index}"))
+        paths.append(str(path))
+
+    with jsdoctor.Session(executor=executor, jobs=2) as session:
+        session.add_or_update_many(paths)
+        pages = session.render()
+        assert sorted(pages) == [f"goog.n{index}.html" for index in range(4)]
+
+        pathlib.Path(paths[0]).write_text(_make_script("goog.n0", "Bbb"))
+        pathlib.Path(paths[1]).write_text("goog.provide('goog.n1');\n/** A. */\n")
+        with pytest.raises(scanner.NoIdentifierFoundError):
+            session.add_or_update_many([*paths, str(tmp_path / "missing.js")])
+
+        # The others are still updated, and the broken file keeps its symbols.
+        new_pages = session.render()
+        assert b"goog.n0.Bbb" in new_pages["goog.n0.html"]
+        assert new_pages["goog.n1.html"] == pages["goog.n1.html"]
@@ -1,10 +1,15 @@
 """Tests for the jsdoctor.source module."""
 
+import multiprocessing
+import multiprocessing.pool
+import pathlib
+import pickle
+import random
 from unittest import mock
 
 import pytest
 
-from jsdoctor import scanner, source, symboltypes
+from jsdoctor import flags, namespace, scanner, source, symboltypes
 
 
 def test_scan_source() -> None:
@@ -34,6 +39,68 @@ def test_scan_source() -> None:
     assert flag.text == "{string} Dog."
 
 
+def test_comment_flag_index() -> None:
+    """Tests the flag bitmask and name index built on Comment."""
+    raw = (
+        "/** Description.\n"
+        " * @param {string} a A.\n"
+        " * @param {number} b B.\n"
+        " * @private */"
+    )
+    comment = source.Comment(None, 0, len(raw), script=raw)
+    assert comment.has_flag("@param")
+    assert comment.has_flag("@private")
+    assert not comment.has_flag("@return")
+    assert not comment.has_flag("@unknown")
+
+    assert [flag.text for flag in comment.get_flags("@param")] == [
+        "{string} a A.",
+        "{number} b B.",
+    ]
+    assert not comment.get_flags("@return")
+    assert comment.flag_mask == flags.GetFlagMask(flag.name for flag in comment.flags)
+
+
+def test_comment_from_text() -> None:
+    """Tests making a comment from its text, as callers did before spans."""
+    comment = source.Comment("Description.\n@param {string} a A.\n", 10, 60)
+    assert (comment.start, comment.end) == (10, 60)
+    assert comment.raw is None
+    assert comment.has_flag("@param")
+    assert comment.description_sections == ["Description."]
+    assert [flag.text for flag in comment.get_flags("@param")] == ["{string} a A."]
+
+
+def test_comment_parsed_lazily() -> None:
+    """Tests that comments are only stripped and parsed when text is read."""
+    script = (
+        "x;\n"
+        "/**\n"
+        " * Mail a@b.com.\n"
+        " *\n"
+        " * @param {string} a A.\n"
+        " *\n"
+        " *  @deprecated Old.\n"
+        " */"
+    )
+    comment = source.Comment(None, 3, len(script), script=script)
+    assert comment.has_flag("@deprecated")
+    assert not comment.get_flags("@return")
+    assert comment.script is script
+    assert "text" not in vars(comment)
+    assert "_parsed" not in vars(comment)
+
+    assert comment.description_sections == ["Mail a@b.com."]
+    assert "_parsed" in vars(comment)
+    assert comment.flag_mask == flags.GetFlagMask(flag.name for flag in comment.flags)
+
+    # Only the comment's own block is pickled.
+    unpickled_comment = pickle.loads(pickle.dumps(comment))
+    assert unpickled_comment.script == script[3:]
+    assert unpickled_comment.text == comment.text
+    assert (unpickled_comment.start, unpickled_comment.end) == (3, len(script))
+
+
 def test_is_ignorable_identifier() -> None:
     """Tests checking if an identifier match should be ignored."""
     match = scanner.FindCommentTarget("  aaa.bbb = 3")
@@ -77,10 +144,11 @@ def test_namespace_not_found_error() -> None:
         mock.patch.object(
             source.namespace, "GetClosestNamespaceForSymbol", return_value=None
         ),
-        pytest.raises(source.NamespaceNotFoundError),
+        pytest.raises(source.NamespaceNotFoundError) as exc_info,
     ):
         # pylint: disable-next=protected-access
         list(source._yield_symbols(match_pairs, {"goog.aaa"}))
+    assert exc_info.value.offset == 13
 
 
 def test_skip_symbol_not_part_of_provided_namespace() -> None:
@@ -179,6 +247,167 @@ def test_source_str() -> None:
     assert "path/to/file.js" in str(src)
 
 
+def _scan_script_legacy(script: str) -> source.Source:
+    """Scans a script with the per-question scanners ScanScript replaced."""
+    legacy_source = source.Source(script)
+    legacy_source.provides.update(scanner.YieldProvides(script))
+    legacy_source.requires.update(scanner.YieldRequires(script))
+    match_pairs = scanner.ExtractDocumentedSymbols(script)
+    # pylint: disable-next=protected-access
+    for symbol in source._yield_symbols(match_pairs, legacy_source.provides):
+        symbol.source = legacy_source
+        legacy_source.symbols.add(symbol)
+    return legacy_source
+
+
+def _summarize_source(scanned_source: source.Source) -> tuple:
+    symbols = []
+    for symbol in scanned_source.symbols:
+        assert symbol.comment is not None
+        symbols.append(
+            (
+                symbol.identifier,
+                symbol.start,
+                symbol.end,
+                symbol.namespace,
+                symbol.property,
+                symbol.type,
+                symbol.static,
+                symbol.comment.text,
+                symbol.comment.start,
+                symbol.comment.end,
+                symbol.comment.description_sections,
+                [(flag.name, flag.text) for flag in symbol.comment.flags],
+            )
+        )
+    return (
+        scanned_source.provides,
+        scanned_source.requires,
+        sorted(symbols, key=repr),
+    )
+
+
+_CORPUS_FRAGMENTS = [
+    "goog.provide('goog.aaa');\n",
+    "goog.provide('goog.aaa.Bbb');\n",
+    '  goog.require("goog.ccc");\n',
+    "x = 'goog.provide(\"goog.zzz\")';\n",
+    "/**\n * @fileoverview Overview.\n */\n",
+    "/**\n * Description.\n *\n * @param {string} a The a.\n"
+    " * @return {number} The number.\n */\n",
+    "/** @constructor */\n",
+    "/** @enum {string} */\n",
+    "/** @private {number} */\n",
+    "/** @type {!Array<number>} */ (",
+    "/**/",
+    "/***/",
+    "goog.aaa.bbb = function(a) {};\n",
+    "goog.aaa.Bbb.prototype.ccc = function() {};\n",
+    "goog.aaa\n  .ddd = 3;\n",
+    "goog.aaa.eee(3);\n",
+    "goog.aaa.fff[0] = 1;\n",
+    "this.ggg = 1;\n",
+    "other.hhh = 2;\n",
+    "$goog.aaa$ = 1;\n",
+    "\r\n",
+    "\u2028",
+    "\n\n",
+]
+
+
+def _generate_corpus() -> list[str]:
+    rng = random.Random(1234)
+    corpus = [_TEST_SCRIPT]
+    for _ in range(500):
+        fragments = rng.choices(_CORPUS_FRAGMENTS, k=rng.randint(1, 25))
+        corpus.append("".join(fragments) + "goog.aaa.end;\n")
+    return corpus
+
+
+def test_scan_script_matches_legacy_scan() -> None:
+    """Tests the single-pass ScanScript against the per-question scanners."""
+    for script in _generate_corpus():
+        try:
+            expected = _summarize_source(_scan_script_legacy(script))
+        except scanner.NoIdentifierFoundError:
+            with pytest.raises(scanner.NoIdentifierFoundError):
+                source.ScanScript(script)
+            continue
+
+        assert _summarize_source(source.ScanScript(script)) == expected, script
+
+
+def test_scan_script_in_parallel_matches_serial_scan() -> None:
+    """Tests that splitting a script across a pool matches a serial scan."""
+    script = "".join(_generate_corpus())
+    expected = _summarize_source(source.ScanScript(script))
+
+    with (
+        mock.patch.object(source, "PARALLEL_SCAN_THRESHOLD", 0),
+        mock.patch.object(source, "_PARALLEL_SCAN_CHUNK_SIZE", 1000),
+        multiprocessing.Pool(2) as pool,
+    ):
+        comment_targets = scanner.SweepScript(script).comments
+        # pylint: disable-next=protected-access
+        chunks = list(
+            source._yield_scan_chunks(
+                script, comment_targets, namespace.NamespaceIndex()
+            )
+        )
+        assert len(chunks) > 1
+        parallel_source = source.ScanScript(script, pool=pool)
+
+    assert _summarize_source(parallel_source) == expected
+    assert all(symbol.source is parallel_source for symbol in parallel_source.symbols)
+
+
+def _scan_and_parse(script: str) -> tuple:
+    scanned_source = source.ScanScript(script)
+    parsed_flags = [
+        (flag.name, flag.text, flag.param, flag.returns)
+        for symbol in scanned_source.symbols
+        if symbol.comment is not None
+        for flag in symbol.comment.flags
+    ]
+    return _summarize_source(scanned_source), sorted(parsed_flags, key=repr)
+
+
+def test_scan_script_on_threads_matches_serial_scan() -> None:
+    """Tests that scans sharing module state across threads match serial scans."""
+    scripts = []
+    for script in _generate_corpus():
+        try:
+            source.ScanScript(script)
+        except scanner.NoIdentifierFoundError:
+            continue
+        scripts.append(script)
+
+    expected = [_scan_and_parse(script) for script in scripts]
+    with multiprocessing.pool.ThreadPool(4) as pool:
+        assert pool.map(_scan_and_parse, scripts, chunksize=1) == expected
+
+
+def test_scan_file(tmp_path: pathlib.Path) -> None:
+    """Tests scanning memory-mapped files against scanning their text."""
+    scripts = {
+        "ascii.js": _TEST_SCRIPT,
+        "utf8.js": "goog.provide('goog.é');\n/** Ünicode. */\ngoog.é.x;\n",
+        "empty.js": "",
+    }
+    for filename, script in scripts.items():
+        path = tmp_path / filename
+        path.write_text(script, encoding="utf-8")
+
+        scanned_source = source.ScanFile(str(path))
+        assert scanned_source.path == str(path)
+        assert _summarize_source(scanned_source) == _summarize_source(
+            source.ScanScript(script)
+        )
+
+    assert source.ScanFile(str(tmp_path / "ascii.js")).script is None
+    assert source.ScanFile(str(tmp_path / "utf8.js")).script is not None
+
+
 _TEST_SCRIPT = """
 goog.provide('goog.aaa');
 goog.provide('goog.bbb');
@@ -192,3 +421,38 @@ goog.require('goog.ddd');
  */
 goog.aaa.bbb;
 """
+
+
+def test_source_record() -> None:
+    """Tests the compact scan record round trip, which drops the script."""
+    scanned_source = source.ScanScript(_TEST_SCRIPT, "a.js")
+    record = source.MakeSourceRecord(scanned_source)
+    assert record.path == "a.js"
+    assert record.provides == scanned_source.provides
+
+    # Record comments hold only their own block, not the script.
+    (record_symbol,) = record.symbols
+    record_comment = record_symbol[3]
+    assert record_comment is not None
+    assert record_comment.script == record_comment.raw
+
+    pickled_record = pickle.dumps(record)
+    assert _TEST_SCRIPT not in pickled_record.decode("utf-8", "replace")
+    assert len(pickled_record) < len(pickle.dumps(scanned_source))
+
+    (symbol,) = pickle.loads(pickled_record).make_symbols(3)
+    (scanned_symbol,) = scanned_source.symbols
+    assert symbol.source is None
+    assert symbol.path_id == 3
+    assert symbol.identifier == scanned_symbol.identifier
+    assert (symbol.start, symbol.end) == (scanned_symbol.start, scanned_symbol.end)
+    assert symbol.type == scanned_symbol.type
+    assert symbol.comment is not None
+    assert symbol.comment.flags == scanned_symbol.comment.flags
+
+    # Records carry parsed comments, so the parent does not parse them again.
+    with mock.patch.object(source.jsdoc, "ProcessComment") as process_comment:
+        (symbol,) = pickle.loads(pickled_record).make_symbols(3)
+        assert symbol.comment is not None
+        assert symbol.comment.flags == scanned_symbol.comment.flags
+    process_comment.assert_not_called()
@@ -0,0 +1,89 @@
+"""Tests for the jsdoctor.symbolindex module."""
+
+import pytest
+
+from jsdoctor import source, symbolindex
+
+
+def _make_record(namespace: str, *names: str) -> source.SourceRecord:
+    script = f"goog.provide('{namespace}');\n"
+    for name in names:
+        script += f"\n/** {name}. */\n{namespace}.{name} = 1;\n"
+    return source.MakeSourceRecord(source.ScanScript(script, "a.js"))
+
+
+def _get_documented(index: symbolindex.SymbolIndex) -> dict[str, int | None]:
+    return {
+        identifier: symbol.path_id for identifier, symbol in index.symbol_map.items()
+    }
+
+
+def test_make_symbol_map() -> None:
+    """Tests that each identifier is documented by its first symbol."""
+    first, second = _make_record("goog.a", "b", "b").make_symbols(0)
+    symbol_map = symbolindex.MakeSymbolMap([first, second])
+    assert symbol_map == {"goog.a.b": first}
+    assert symbolindex.MakeNamespaceMap(symbol_map.values()) == {"goog.a": {first}}
+
+
+def test_make_symbol_map_names_duplicate_files(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Tests that duplicate symbols without a Source are named by path."""
+    (first,) = _make_record("goog.a", "b").make_symbols(0)
+    (second,) = _make_record("goog.a", "b").make_symbols(1)
+    symbolindex.MakeSymbolMap([first, second], ["a.js", "b.js"])
+    assert "goog.a.b b.js\n" in caplog.text
+    assert caplog.text.rstrip().endswith("goog.a.b a.js")
+
+
+def test_symbol_index() -> None:
+    """Tests patching the maps as files are added, changed and removed."""
+    index = symbolindex.SymbolIndex()
+    changed = index.update(
+        {"a.js": _make_record("goog.a", "b", "c"), "b.js": _make_record("goog.a", "c")}
+    )
+    assert changed == {"goog.a"}
+    assert _get_documented(index) == {"goog.a.b": 0, "goog.a.c": 0}
+    assert "a.js" in index
+
+    # The duplicate in the later file takes over once the first one is gone.
+    assert index.update({"a.js": _make_record("goog.a", "b")}) == {"goog.a"}
+    assert _get_documented(index) == {"goog.a.b": 0, "goog.a.c": 1}
+
+    assert index.update({"c.js": _make_record("goog.d", "e")}) == {"goog.d"}
+    assert set(index.namespace_map) == {"goog.a", "goog.d"}
+
+    # Removed files drop their symbols and, once empty, their namespaces.
+    assert index.update({"c.js": None}) == {"goog.d"}
+    assert "c.js" not in index
+    assert set(index.namespace_map) == {"goog.a"}
+
+    # Files keep their position when added again.
+    index.update({"a.js": None})
+    index.update({"a.js": _make_record("goog.a", "c")})
+    assert _get_documented(index) == {"goog.a.c": 0}
+    (symbol,) = index.namespace_map["goog.a"]
+    assert symbol is index.symbol_map["goog.a.c"]
+
+
+def test_symbol_index_compacts_table() -> None:
+    """Tests that rows of replaced files do not pile up in the table."""
+    index = symbolindex.SymbolIndex()
+    index.update({"a.js": _make_record("goog.a", "b", "c")})
+    index.update({"b.js": _make_record("goog.d", "e")})
+    for name in ["f", "g"] * 500:
+        index.update({"a.js": _make_record("goog.a", "b", name)})
+
+    # pylint: disable-next=protected-access
+    assert len(index._table) <= 2 * 3
+    assert _get_documented(index) == {"goog.a.b": 0, "goog.a.g": 0, "goog.d.e": 1}
+    assert index.namespace_map["goog.a"] == {
+        index.symbol_map["goog.a.b"],
+        index.symbol_map["goog.a.g"],
+    }
+    (symbol,) = index.namespace_map["goog.d"]
+    assert symbol.comment is not None
+
+    index.update({"b.js": None})
+    assert set(index.namespace_map) == {"goog.a"}
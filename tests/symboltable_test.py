@@ -0,0 +1,75 @@
+"""Tests for the jsdoctor.symboltable module."""
+
+import pytest
+
+from jsdoctor import source, symboltable, symboltypes
+
+_SCRIPT = """goog.provide('goog.aaa');
+
+/**
+ * A function.
+ * @param {string} a A.
+ */
+goog.aaa.bbb = function(a) {};
+
+/** @type {number} */
+goog.aaa.Ccc.prototype.ddd;
+"""
+
+
+def test_symbol_table() -> None:
+    """Tests that table rows read back the fields of the symbols added."""
+    record = source.MakeSourceRecord(source.ScanScript(_SCRIPT, "a.js"))
+    table = symboltable.MakeSymbolTable(
+        [source.SourceRecord(None, set(), set(), []), record]
+    )
+    assert len(table) == 2
+
+    for row, symbol in zip(table, record.make_symbols(1), strict=True):
+        # Rows are slotted; they hold no fields of their own.
+        assert not hasattr(row, "__dict__")
+        assert row.identifier == symbol.identifier
+        assert (row.start, row.end) == (symbol.start, symbol.end)
+        assert row.comment is symbol.comment
+        assert row.namespace == symbol.namespace == "goog.aaa"
+        assert row.property == symbol.property
+        assert row.type == symbol.type
+        assert row.static == symbol.static
+        assert row.path_id == 1
+        assert row.source is None
+
+    function_row, property_row = table
+    assert function_row.type == symboltypes.FUNCTION
+    assert function_row.property is None
+    assert property_row.property == "ddd"
+    assert property_row.static is False
+
+    # Rows are views, equal to and hashed like other views of the same row.
+    assert table[0] == function_row
+    assert len({table[0], table[0], table[1]}) == 2
+    with pytest.raises(IndexError):
+        table[2]  # pylint: disable=pointless-statement
+
+
+def test_symbol_table_add() -> None:
+    """Tests adding Symbols directly, including fields left unset."""
+    table = symboltable.SymbolTable()
+    assert table.add(source.Symbol("goog.aaa", 1, 2)) == 0
+
+    row = table[0]
+    assert row.identifier == "goog.aaa"
+    assert row.namespace is None
+    assert row.type is None
+    assert row.static is None
+    assert row.path_id is None
+
+
+def test_release_comment() -> None:
+    """Tests dropping a row's comment once it is no longer needed."""
+    record = source.MakeSourceRecord(source.ScanScript(_SCRIPT, "a.js"))
+    table = symboltable.MakeSymbolTable([record])
+    assert table[0].comment is not None
+
+    table.release_comment(table[0])
+    assert table[0].comment is None
+    assert table[1].comment is not None
@@ -0,0 +1,53 @@
+"""Tests for the jsdoctor.transport module."""
+
+from jsdoctor import source, transport
+
+_TEST_SCRIPT = """goog.provide('goog.example');
+goog.require('goog.array');
+
+/**
+ * Makes a thing, é included.
+ * @param {string} name The name.
+ * @constructor
+ */
+goog.example.Thing = function(name) {};
+
+/** @const */
+goog.example.Thing.COUNT = 3;
+
+goog.example.undocumented = 1;
+"""
+
+
+def _get_symbol_fields(record: source.SourceRecord) -> list[tuple]:
+    return [
+        (*symbol[:3], symbol[3] and (symbol[3].raw, symbol[3].start), *symbol[4:])
+        for symbol in record.symbols
+    ]
+
+
+def test_encode_records() -> None:
+    """Tests the result block round trip."""
+    records = [
+        source.MakeSourceRecord(source.ScanScript(_TEST_SCRIPT, "a.js")),
+        source.MakeSourceRecord(source.ScanScript("goog.provide('b');\n", "b.js")),
+        source.MakeSourceRecord(source.ScanScript("", None)),
+    ]
+    decoded_records = transport.DecodeRecords(transport.EncodeRecords(records))
+
+    assert len(decoded_records) == len(records)
+    for decoded_record, record in zip(decoded_records, records, strict=True):
+        assert decoded_record.path == record.path
+        assert decoded_record.provides == record.provides
+        assert decoded_record.requires == record.requires
+        assert _get_symbol_fields(decoded_record) == _get_symbol_fields(record)
+
+    for decoded_symbol, symbol in zip(
+        decoded_records[0].symbols, records[0].symbols, strict=True
+    ):
+        decoded_comment = decoded_symbol[3]
+        comment = symbol[3]
+        assert decoded_comment is not None and comment is not None
+        assert decoded_comment.flag_mask == comment.flag_mask
+        assert decoded_comment.text == comment.text
+        assert decoded_comment.flags == comment.flags